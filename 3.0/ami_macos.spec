@@ -44,11 +44,24 @@ a = Analysis(
         "ami",
         "ami.core",
         "ami.core.config",
+        "ami.core.history",
         "ami.core.models",
         "ami.core.paths",
         "ami.services",
         "ami.services.network_monitor",
+        "ami.services.probe_engine",
+        "ami.services.icmp",
+        "ami.services.http_pool",
+        "ami.services.statistics",
         "ami.services.logger",
+        "ami.services.log_writer",
+        "ami.services.log_archive",
+        "ami.services.binlog",
+        "ami.services.metrics",
+        "ami.services.event_stream",
+        "ami.services.history_query",
+        "ami.services.load_latency",
+        "ami.services.history_store",
         "ami.services.notifier",
         "ami.services.api_server",
         "ami.services.updater",
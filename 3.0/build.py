@@ -173,11 +173,24 @@ def build_executable() -> bool:
         "--hidden-import=ami",
         "--hidden-import=ami.core",
         "--hidden-import=ami.core.config",
+        "--hidden-import=ami.core.history",
         "--hidden-import=ami.core.models",
         "--hidden-import=ami.core.paths",
         "--hidden-import=ami.services",
         "--hidden-import=ami.services.network_monitor",
+        "--hidden-import=ami.services.probe_engine",
+        "--hidden-import=ami.services.icmp",
+        "--hidden-import=ami.services.http_pool",
+        "--hidden-import=ami.services.statistics",
         "--hidden-import=ami.services.logger",
+        "--hidden-import=ami.services.log_writer",
+        "--hidden-import=ami.services.log_archive",
+        "--hidden-import=ami.services.binlog",
+        "--hidden-import=ami.services.metrics",
+        "--hidden-import=ami.services.event_stream",
+        "--hidden-import=ami.services.history_query",
+        "--hidden-import=ami.services.load_latency",
+        "--hidden-import=ami.services.history_store",
         "--hidden-import=ami.services.notifier",
         "--hidden-import=ami.services.api_server",
         "--hidden-import=ami.services.updater",
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark the binary status log (ami.services.binlog) against the CSV log: per-record write
+cost, file size and read-back of the whole file (csv.DictReader + float() vs numpy memmap).
+
+    cd 3.0 && python scripts/bench_binlog.py [--records 86400]
+
+Files are generated in a temporary directory and removed afterwards.
+"""
+
+import argparse
+import csv
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import numpy as np  # noqa: E402
+
+from ami.core.models import ConnectionStatus  # noqa: E402
+from ami.services.binlog import (  # noqa: E402
+    HEADER_SIZE,
+    RECORD_SIZE,
+    file_header,
+    convert_csv,
+    pack_status,
+    read_records,
+)
+
+_HEADER = [
+    "Timestamp", "Status", "Avg Latency (ms)", "Successful Pings", "Total Pings",
+    "Local Network", "Internet OK", "HTTP Test OK",
+]
+
+
+def _statuses(n: int) -> list:
+    t0 = time.monotonic() - n
+    w0 = time.time() - n
+    out = []
+    for i in range(n):
+        offline = i % 97 == 0
+        out.append(ConnectionStatus(
+            status="offline" if offline else "online",
+            avg_latency_ms=None if offline else 10.0 + (i % 17) * 0.37,
+            successful_pings=0 if offline else 3,
+            total_pings=3,
+            local_network_ok=True,
+            internet_ok=not offline,
+            http_test_ok=not offline,
+            ts=t0 + i,
+            wall=w0 + i,
+        ))
+    return out
+
+
+def _write_csv(path: str, statuses: list) -> float:
+    """Same formatting as EventLogger's buffered mode: one csv.writer row per status."""
+    buf = io.StringIO()
+    w = csv.writer(buf, lineterminator="\r\n")
+    start = time.perf_counter()
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerow(_HEADER)
+        for s in statuses:
+            w.writerow([
+                s.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+                s.status,
+                f"{s.avg_latency_ms:.2f}" if s.avg_latency_ms else "N/A",
+                s.successful_pings,
+                s.total_pings,
+                "Yes" if s.local_network_ok else "No",
+                "Yes" if s.internet_ok else "No",
+                "Yes" if s.http_test_ok else "No",
+            ])
+        f.write(buf.getvalue())
+    return time.perf_counter() - start
+
+
+def _write_bin(path: str, statuses: list) -> float:
+    start = time.perf_counter()
+    with open(path, "wb") as f:
+        f.write(file_header())
+        f.write(b"".join(pack_status(s) for s in statuses))
+    return time.perf_counter() - start
+
+
+def _read_csv(path: str) -> float:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        lat = [float(r["Avg Latency (ms)"]) for r in csv.DictReader(f) if r["Avg Latency (ms)"] != "N/A"]
+    return sum(lat) / len(lat)
+
+
+def _read_bin(path: str) -> float:
+    return float(np.nanmean(read_records(path)["latency_ms"]))
+
+
+def _best(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--records", type=int, default=86400, help="records (default: 1 day at 1 Hz)")
+    args = ap.parse_args()
+    statuses = _statuses(args.records)
+    with tempfile.TemporaryDirectory() as d:
+        csv_path = os.path.join(d, "ami_log.csv")
+        bin_path = os.path.join(d, "ami_log.amilog")
+        conv_path = os.path.join(d, "converted.amilog")
+        t_csv = min(_write_csv(csv_path, statuses) for _ in range(3))
+        t_bin = min(_write_bin(bin_path, statuses) for _ in range(3))
+        assert os.path.getsize(bin_path) == HEADER_SIZE + RECORD_SIZE * args.records
+        r_csv = _best(lambda: _read_csv(csv_path))
+        r_bin = _best(lambda: _read_bin(bin_path))
+        assert abs(_read_csv(csv_path) - _read_bin(bin_path)) < 0.01
+        t_conv = _best(lambda: convert_csv(csv_path, conv_path), 1)
+        n = args.records
+        s_csv, s_bin = os.path.getsize(csv_path), os.path.getsize(bin_path)
+        print(f"{n:,} records")
+        print(f"{'':14} {'CSV':>12} {'binary':>12} {'ratio':>8}")
+        print(f"{'write/record':14} {t_csv / n * 1e6:9.2f} us {t_bin / n * 1e6:9.2f} us {t_csv / t_bin:7.1f}x")
+        print(f"{'file size':14} {s_csv / 1e6:9.2f} MB {s_bin / 1e6:9.2f} MB {s_csv / s_bin:7.1f}x")
+        print(f"{'read + mean':14} {r_csv * 1000:9.1f} ms {r_bin * 1000:9.2f} ms {r_csv / r_bin:7.0f}x")
+        print(f"CSV -> binary conversion: {t_conv * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Memory / allocation benchmark for the status models: 24 h of history at 1 Hz.
+
+Compares the previous models (plain dataclasses stamped with datetime.now()) with the
+slotted models (monotonic ``ts`` + wall-clock ``wall`` floats) and with the numpy StatusHistory ring.
+
+    cd 3.0 && PYTHONPATH=src python scripts/bench_models.py [--samples 86400] [--hosts 5]
+"""
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from ami.core.history import StatusHistory  # noqa: E402
+from ami.core.models import ConnectionStatus, PingResult  # noqa: E402
+
+
+@dataclass
+class LegacyPingResult:
+    host: str
+    success: bool
+    latency_ms: Optional[float] = None
+    error: Optional[str] = None
+    timestamp: datetime = field(default_factory=datetime.now)
+
+
+@dataclass
+class LegacyConnectionStatus:
+    status: str
+    avg_latency_ms: Optional[float] = None
+    successful_pings: int = 0
+    total_pings: int = 0
+    local_network_ok: bool = False
+    internet_ok: bool = False
+    http_test_ok: bool = False
+    timestamp: datetime = field(default_factory=datetime.now)
+    public_ip: Optional[str] = None
+    isp: Optional[str] = None
+    vpn_connected: Optional[bool] = None
+    vpn_provider: Optional[str] = None
+    speed_mbps: Optional[float] = None
+    speed_tier: Optional[str] = None
+    http_connection_reused: Optional[bool] = None
+    stage_timings_ms: Optional[Dict[str, float]] = None
+
+
+def _sample(status_cls, ping_cls, hosts: List[str], i: int):
+    pings = [ping_cls(host=h, success=True, latency_ms=10.0 + (i % 7)) for h in hosts]
+    status = status_cls(
+        status="online",
+        avg_latency_ms=10.0 + (i % 7),
+        successful_pings=len(pings),
+        total_pings=len(pings),
+        local_network_ok=True,
+        internet_ok=True,
+        http_test_ok=True,
+    )
+    return status, pings
+
+
+def _measure(name: str, n: int, build: Callable[[int], object]) -> None:
+    gc.collect()
+    tracemalloc.start()
+    blocks0 = sys.getallocatedblocks()
+    t0 = time.perf_counter()
+    kept = [build(i) for i in range(n)]
+    elapsed = time.perf_counter() - t0
+    blocks = sys.getallocatedblocks() - blocks0
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{name:<34} {current / n:8.1f} B/sample  {current / 2**20:8.1f} MiB total  "
+        f"{blocks / n:6.1f} live blocks/sample  {n / elapsed / 1000:8.1f} k samples/s"
+    )
+    del kept
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--samples", type=int, default=86400, help="samples (default: 24 h at 1 Hz)")
+    ap.add_argument("--hosts", type=int, default=5, help="PingResults per sample")
+    args = ap.parse_args()
+    hosts = [f"192.0.2.{i + 1}" for i in range(args.hosts)]
+    n = args.samples
+    print(f"{n} samples, {args.hosts} PingResult + 1 ConnectionStatus each\n")
+
+    _measure("dataclass + datetime (before)", n,
+             lambda i: _sample(LegacyConnectionStatus, LegacyPingResult, hosts, i))
+    _measure("slots + ts, wall (after)", n,
+             lambda i: _sample(ConnectionStatus, PingResult, hosts, i))
+    _measure("ConnectionStatus only, before", n,
+             lambda i: _sample(LegacyConnectionStatus, LegacyPingResult, [], i)[0])
+    _measure("ConnectionStatus only, after", n,
+             lambda i: _sample(ConnectionStatus, PingResult, [], i)[0])
+
+    gc.collect()
+    tracemalloc.start()
+    ring = StatusHistory(n)
+    current, _ = tracemalloc.get_traced_memory()
+    status, _ = _sample(ConnectionStatus, PingResult, [], 0)
+    t0 = time.perf_counter()
+    for _ in range(n):
+        ring.append_status(status)
+    elapsed = time.perf_counter() - t0
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{'StatusHistory ring (columns)':<34} {current / n:8.1f} B/sample  {current / 2**20:8.1f} MiB total  "
+        f"{(after - current) / n:6.1f} B grown/append  {n / elapsed / 1000:8.1f} k appends/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
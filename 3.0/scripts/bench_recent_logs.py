@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark EventLogger.get_recent_logs: full csv.DictReader scan (previous implementation)
+vs reverse block reader (read_tail_rows) on synthetic AMI CSV logs.
+
+    cd 3.0 && python scripts/bench_recent_logs.py [--sizes 1 100 1024] [--count 100]
+
+Sizes are in MB; files are generated in a temporary directory and removed afterwards.
+"""
+
+import argparse
+import csv
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from ami.services.logger import read_tail_rows  # noqa: E402
+
+_HEADER = [
+    "Timestamp", "Status", "Avg Latency (ms)", "Successful Pings", "Total Pings",
+    "Local Network", "Internet OK", "HTTP Test OK",
+]
+
+
+def _write_log(path: str, size_mb: int) -> int:
+    target = size_mb * 1024 * 1024
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    w.writerow(_HEADER)
+    rows = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        written = 0
+        while written < target:
+            for _ in range(10_000):
+                w.writerow([
+                    f"2026-01-01 00:{rows // 60 % 60:02d}:{rows % 60:02d}", "online",
+                    f"{10 + rows % 17:.2f}", 3, 3, "Yes", "Yes", "Yes",
+                ])
+                rows += 1
+            chunk = buf.getvalue()
+            f.write(chunk)
+            written += len(chunk)
+            buf.seek(0)
+            buf.truncate()
+    return rows
+
+
+def _full_scan(path: str, count: int) -> list:
+    with open(path, "r", encoding="utf-8") as f:
+        logs = list(csv.DictReader(f))
+    return logs[-count:] if len(logs) > count else logs
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 1024], help="file sizes in MB")
+    ap.add_argument("--count", type=int, default=100, help="rows requested")
+    ap.add_argument("--full-scan-max-mb", type=int, default=1024,
+                    help="skip the full scan above this size (it can take minutes)")
+    args = ap.parse_args()
+
+    print(f"{'size':>8} {'rows':>11} {'full scan':>12} {'tail seek':>12} {'speedup':>9}")
+    with tempfile.TemporaryDirectory() as d:
+        for size in args.sizes:
+            path = os.path.join(d, f"ami_log_{size}mb.csv")
+            rows = _write_log(path, size)
+            tail = _time(lambda: read_tail_rows(path, args.count), 5)
+            if size <= args.full_scan_max_mb:
+                assert _full_scan(path, args.count) == read_tail_rows(path, args.count)
+                full = _time(lambda: _full_scan(path, args.count), 1 if size >= 100 else 3)
+                full_s, ratio = f"{full * 1000:9.1f} ms", f"{full / tail:8.0f}x"
+            else:
+                full_s, ratio = f"{'skipped':>12}", f"{'-':>9}"
+            print(f"{size:>5} MB {rows:>11,} {full_s:>12} {tail * 1000:9.3f} ms {ratio}")
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark the speed test receive path on loopback: ``iter_content`` (previous implementation,
+one new bytes object per chunk) vs ``readinto`` into one reusable buffer (``_download_stream``).
+With no rate cap the link is not the limit, so the result is the highest rate each path can
+measure, and the CPU seconds it spends per GB.
+
+    cd 3.0 && python scripts/bench_speed_test.py [--size-mb 2000] [--streams 1 4] [--repeat 3]
+
+The server (scripts/speed_test_server.py) runs in a subprocess so it does not share the GIL.
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_ROOT / "src"))
+
+from ami.services import speed_test  # noqa: E402
+from ami.services.speed_test import _CHUNK, _SPEED_HEADERS, _body_size  # noqa: E402
+
+_TIMEOUT = (5.0, 30.0)
+
+
+def _iter_content_stream(url, stream, offset, window, req_timeout, pool) -> None:
+    headers = _SPEED_HEADERS
+    if offset > 0:
+        headers = dict(_SPEED_HEADERS, Range=f"bytes={offset}-")
+    with requests.get(url, stream=True, timeout=req_timeout, headers=headers) as r:
+        r.raise_for_status()
+        window.set_file_size(_body_size(r))
+        for chunk in r.iter_content(chunk_size=_CHUNK):
+            if chunk and not window.add(stream, len(chunk)):
+                break
+
+
+def _measure(url: str, size_mb: int, streams: int, repeat: int) -> tuple:
+    """Best Mbps over ``repeat`` runs and CPU seconds per GB received in that run."""
+    best = (0.0, 0.0)
+    for _ in range(repeat):
+        cpu0 = time.process_time()
+        result = speed_test._run_speed_test_one_url(
+            url, size_mb * 1024 * 1024, 64 * 1024 * 1024, _TIMEOUT, None, streams
+        )
+        cpu = time.process_time() - cpu0
+        if result is None:
+            raise RuntimeError("nothing measured")
+        if result.download_mbps > best[0]:
+            gb = (result.bytes_measured + 64 * 1024 * 1024) / 1e9
+            best = (result.download_mbps, cpu / gb)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--size-mb", type=int, default=2000, help="timed bytes per run (after 64 MB warmup)")
+    ap.add_argument("--streams", type=int, nargs="+", default=[1, 4])
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    server = subprocess.Popen(
+        [sys.executable, str(_ROOT / "scripts" / "speed_test_server.py"), "--port", "0",
+         "--size-mb", str(args.size_mb + 128)],
+        stdout=subprocess.PIPE, text=True,
+    )
+    try:
+        line = server.stdout.readline()
+        url = line.split()[-4]  # "Serving N MB on http://127.0.0.1:P/file.bin (Ctrl+C to stop)"
+        print(f"{'streams':>7} {'iter_content':>14} {'cpu/GB':>8} {'readinto':>14} {'cpu/GB':>8} {'gain':>6}")
+        new_path = speed_test._download_stream
+        for streams in args.streams:
+            speed_test._download_stream = _iter_content_stream
+            try:
+                old, old_cpu = _measure(url, args.size_mb, streams, args.repeat)
+            finally:
+                speed_test._download_stream = new_path
+            new, new_cpu = _measure(url, args.size_mb, streams, args.repeat)
+            print(
+                f"{streams:>7} {old / 1000:>9.2f} Gbps {old_cpu:>6.2f} s {new / 1000:>9.2f} Gbps "
+                f"{new_cpu:>6.2f} s {new / old:>5.2f}x"
+            )
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Convert an AMI CSV log (and, with --archives, its rotated .bak/.bak.gz/.bak.zst archives) to the
+binary record format of ami.services.binlog.
+
+    cd 3.0 && python scripts/convert_log_to_binary.py ami_log.csv ami_log.amilog [--archives]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from ami.services.binlog import convert_csv, convert_csv_rows  # noqa: E402
+from ami.services.log_archive import iter_log_records  # noqa: E402
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("csv_log", help="live CSV log (e.g. ami_log.csv in the user data dir)")
+    ap.add_argument("output", help="binary log to create (overwritten)")
+    ap.add_argument("--archives", action="store_true", help="prepend the rotated archives, oldest first")
+    args = ap.parse_args()
+    if args.archives:
+        n = convert_csv_rows(iter_log_records(args.csv_log), args.output)
+    else:
+        n = convert_csv(args.csv_log, args.output)
+    print(f"{n} records -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
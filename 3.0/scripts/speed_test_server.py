@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for a speed test mirror: serves ``GET /<anything>`` as a fixed-size body of zeros,
+honours ``Range: bytes=N-`` (206), accepts ``POST`` bodies for upload tests (read and discarded)
+and can cap each connection's rate to mimic a link where one TCP stream cannot fill the pipe.
+With ``--cut-mb``, ``GET /cut/<anything>`` drops the connection after that many body bytes
+(a mirror or stream that fails mid-test).
+
+    cd 3.0 && python scripts/speed_test_server.py [--port 8765] [--size-mb 200] [--per-conn-mbps 200]
+
+Then point ``speed_test.test_url`` (or ``measure_speed``) at ``http://127.0.0.1:8765/file.bin``
+and ``speed_test.upload_url`` at ``http://127.0.0.1:8765/up``.
+Importable: ``start_server(...)`` returns a running server for scripted checks.
+"""
+
+import argparse
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_BLOCK = b"\0" * (256 * 1024)
+_RANGE = re.compile(r"bytes=(\d+)-(\d*)$")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        size = self.server.size
+        start, end = 0, size - 1
+        m = _RANGE.match(self.headers.get("Range") or "")
+        if m:
+            start = int(m.group(1))
+            if m.group(2):
+                end = min(end, int(m.group(2)))
+            if start > end:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+        length = end - start + 1
+        self.send_response(206 if m else 200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(length))
+        if m:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+        rate = self.server.per_conn_bps
+        if self.server.cut_bytes and self.path.startswith("/cut"):
+            length = min(length, self.server.cut_bytes)
+            self.close_connection = True
+        sent = 0
+        t0 = time.perf_counter()
+        try:
+            while sent < length:
+                n = min(len(_BLOCK), length - sent)
+                self.wfile.write(_BLOCK[:n] if n < len(_BLOCK) else _BLOCK)
+                sent += n
+                if rate:
+                    ahead = sent / rate - (time.perf_counter() - t0)
+                    if ahead > 0:
+                        time.sleep(ahead)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client stopped reading: normal end of a timed window
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        rate = self.server.per_conn_bps
+        received = 0
+        t0 = time.perf_counter()
+        try:
+            while received < length:
+                chunk = self.rfile.read(min(len(_BLOCK), length - received))
+                if not chunk:
+                    return
+                received += len(chunk)
+                if rate:
+                    ahead = received / rate - (time.perf_counter() - t0)
+                    if ahead > 0:
+                        time.sleep(ahead)
+        except ConnectionResetError:
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(
+    port: int = 0, size_mb: float = 200, per_conn_mbps: float = 0, cut_mb: float = 0
+) -> ThreadingHTTPServer:
+    """Serve in a daemon thread; ``server.server_address[1]`` is the bound port."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+    server.daemon_threads = True
+    server.size = int(size_mb * 1024 * 1024)
+    server.per_conn_bps = per_conn_mbps * 1_000_000 / 8
+    server.cut_bytes = int(cut_mb * 1024 * 1024)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--size-mb", type=float, default=200)
+    ap.add_argument("--per-conn-mbps", type=float, default=0, help="0 = unlimited")
+    ap.add_argument("--cut-mb", type=float, default=0, help="GET /cut/... stops after this many MB (0 = off)")
+    args = ap.parse_args()
+    server = start_server(args.port, args.size_mb, args.per_conn_mbps, args.cut_mb)
+    print(f"Serving {args.size_mb:g} MB on http://127.0.0.1:{server.server_address[1]}/file.bin (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
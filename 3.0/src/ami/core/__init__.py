@@ -1,7 +1,8 @@
-"""AMI core: config, paths, models."""
+"""AMI core: config, paths, models, history."""
 
 from .paths import get_base_path, get_user_data_dir, get_user_config_dir, get_config_path
 from .models import PingResult, ConnectionStatus
+from .history import ColumnarRing, HostHistory, StatusHistory
 from .config import load_config, save_config, get_config_path_for_ui
 
 __all__ = [
@@ -11,6 +12,9 @@ __all__ = [
     "get_config_path",
     "PingResult",
     "ConnectionStatus",
+    "ColumnarRing",
+    "HostHistory",
+    "StatusHistory",
     "load_config",
     "save_config",
     "get_config_path_for_ui",
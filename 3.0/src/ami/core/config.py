@@ -32,6 +32,10 @@ DEFAULT_CONFIG: Dict[str, Any] = {
         "retry_count": 2,
         "enable_http_test": True,
         "internal_test_mode": False,
+        "http_pool_size": 4,
+        "http_pool_sizes": {},
+        "history_size": 3600,
+        "host_history_size": 600,
     },
     "thresholds": {"unstable_latency_ms": 500, "unstable_loss_percent": 30},
     "notifications": {
@@ -41,8 +45,27 @@ DEFAULT_CONFIG: Dict[str, Any] = {
         "notify_on_reconnect": True,
         "notify_on_unstable": False,
     },
-    "logging": {"enabled": True, "log_file": "ami_log.csv", "max_log_size_mb": 1},
-    "api": {"enabled": False, "port": 7212, "auth_token": ""},
+    "logging": {
+        "enabled": True,
+        "log_file": "ami_log.csv",
+        "format": "csv",
+        "binary_file": "ami_log.amilog",
+        "max_log_size_mb": 1,
+        "compression": "gzip",
+        "max_archives": 10,
+        "max_archive_mb": 50,
+        "buffered": True,
+        "flush_interval_s": 5,
+        "flush_max_rows": 60,
+        "queue_size": 1000,
+        "overflow_policy": "drop_oldest",
+        "backend": "csv",
+        "sqlite_file": "ami_history.db",
+        "retention_raw_hours": 48,
+        "retention_1m_days": 30,
+        "retention_1h_days": 730,
+    },
+    "api": {"enabled": False, "port": 7212, "auth_token": "", "threaded": True, "max_stream_clients": 32},
     "startup": {"auto_start": False},
     "ui": {
         "theme": "auto",
@@ -66,6 +89,15 @@ DEFAULT_CONFIG: Dict[str, Any] = {
         "timeout_seconds": 30,
         "tier_low_mbps": 100,
         "tier_high_mbps": 1000,
+        "streams": 4,
+        "upload_url": "https://speed.cloudflare.com/__up",
+        "upload_size_mb": 5,
+        "latency_under_load": True,
+        "latency_probe_interval_ms": 100,
+        "adaptive": False,
+        "max_seconds": 10,
+        "max_mb": 80,
+        "ci_percent": 5,
     },
 }
 
@@ -138,6 +170,10 @@ def _migrate_from_2x(config: Dict[str, Any]) -> Dict[str, Any]:
     mon.setdefault("http_test_urls", [])
     api = out.setdefault("api", {})
     api.setdefault("auth_token", "")
+    lg = out.setdefault("logging", {})
+    # Earlier versions kept every rotated log: pruning is opt-in for existing installs.
+    lg.setdefault("max_archives", 0)
+    lg.setdefault("max_archive_mb", 0)
     ui = out.setdefault("ui", {})
     if ui.get("theme") not in ("auto", "light", "dark"):
         ui["theme"] = "auto"
@@ -152,6 +188,16 @@ def _migrate_from_2x(config: Dict[str, Any]) -> Dict[str, Any]:
         "tier_high_mbps": 1000,
     })
     st.setdefault("warmup_mb", 2)
+    st.setdefault("streams", 4)
+    st.setdefault("upload_url", "https://speed.cloudflare.com/__up")
+    # Existing installs opt in to the upload traffic; new ones get DEFAULT_CONFIG / config.json (5 MB).
+    st.setdefault("upload_size_mb", 0)
+    st.setdefault("latency_under_load", True)
+    st.setdefault("latency_probe_interval_ms", 100)
+    st.setdefault("adaptive", False)
+    st.setdefault("max_seconds", 10)
+    st.setdefault("max_mb", 80)
+    st.setdefault("ci_percent", 5)
     # Old 50 MB Cloudflare URL may be too small for max warmup (20) + download (50)
     _hetzner_fsn1 = "https://fsn1-speed.hetzner.com/100MB.bin"
     if st.get("test_url") == "https://speed.cloudflare.com/__down?bytes=52428800":
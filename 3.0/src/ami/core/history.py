@@ -0,0 +1,128 @@
+"""
+AMI 3.0 - Fixed-capacity columnar ring buffers for status history.
+Columns live in preallocated numpy arrays; each row is written twice (slot and slot+capacity)
+so the newest N rows are always one contiguous slice and can be handed out as zero-copy views.
+"""
+
+import math
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+
+# Same encoding the dashboard chart uses (Off / Unstable / On).
+STATUS_CODES: Dict[str, int] = {"offline": 0, "unstable": 1, "online": 2}
+STATUS_NAMES = ("offline", "unstable", "online")
+
+_STATUS_COLUMNS = {
+    "ts": np.float64,  # epoch seconds
+    "status": np.int8,  # STATUS_CODES
+    "latency_ms": np.float32,  # NaN = no successful ping
+    "successful_pings": np.int16,
+    "total_pings": np.int16,
+    "speed_mbps": np.float32,  # NaN = no speed result yet
+}
+
+_HOST_COLUMNS = {
+    "ts": np.float64,  # epoch seconds
+    "latency_ms": np.float32,  # NaN = probe failed
+    "success": np.int8,
+}
+
+
+class ColumnarRing:
+    """
+    Ring buffer of named numpy columns with O(1) append.
+    Views returned by ``view``/``views`` share memory with the buffer: they are read-only and
+    the oldest row of a full-capacity view may be overwritten by a later append — copy if a
+    stable snapshot is needed.
+    """
+
+    def __init__(self, capacity: int, columns: Dict[str, type]):
+        self.capacity = max(1, int(capacity))
+        self._cols = {name: np.zeros(2 * self.capacity, dtype=dt) for name, dt in columns.items()}
+        self._head = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def columns(self) -> tuple:
+        return tuple(self._cols)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, **values) -> None:
+        with self._lock:
+            i = self._head
+            j = i + self.capacity
+            for name, col in self._cols.items():
+                v = values.get(name)
+                col[i] = col[j] = v if v is not None else 0
+            self._head = (i + 1) % self.capacity
+            if self._size < self.capacity:
+                self._size += 1
+
+    def _window(self, last: Optional[int]) -> slice:
+        n = self._size if last is None else max(0, min(int(last), self._size))
+        end = self._head + self.capacity
+        return slice(end - n, end)
+
+    def view(self, name: str, last: Optional[int] = None) -> np.ndarray:
+        """Oldest→newest values of one column (optionally only the newest ``last`` rows)."""
+        with self._lock:
+            v = self._cols[name][self._window(last)]
+        v.flags.writeable = False
+        return v
+
+    def views(self, last: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """All columns over the same window (consistent row alignment)."""
+        with self._lock:
+            w = self._window(last)
+            out = {name: col[w] for name, col in self._cols.items()}
+        for v in out.values():
+            v.flags.writeable = False
+        return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self._head = 0
+            self._size = 0
+
+    @property
+    def nbytes(self) -> int:
+        return sum(col.nbytes for col in self._cols.values())
+
+
+class StatusHistory(ColumnarRing):
+    """Per-check history of NetworkMonitor (replaces the list of ConnectionStatus)."""
+
+    def __init__(self, capacity: int):
+        super().__init__(capacity, _STATUS_COLUMNS)
+
+    def append_status(self, status) -> None:
+        lat = status.avg_latency_ms
+        speed = getattr(status, "speed_mbps", None)
+        self.append(
+            ts=status.epoch,
+            status=STATUS_CODES.get(status.status, 0),
+            latency_ms=math.nan if lat is None else lat,
+            successful_pings=status.successful_pings,
+            total_pings=status.total_pings,
+            speed_mbps=math.nan if speed is None else speed,
+        )
+
+
+class HostHistory(ColumnarRing):
+    """Per-host probe history (one ring per ping target)."""
+
+    def __init__(self, capacity: int):
+        super().__init__(capacity, _HOST_COLUMNS)
+
+    def append_result(self, result) -> None:
+        ok = result.success and result.latency_ms is not None
+        self.append(
+            ts=result.epoch,
+            latency_ms=result.latency_ms if ok else math.nan,
+            success=1 if result.success else 0,
+        )
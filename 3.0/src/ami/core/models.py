@@ -1,13 +1,17 @@
 """
 AMI 3.0 - Data models for connection status and ping results.
+Slotted dataclasses stamped twice at creation: ``ts`` (``time.monotonic()``) for durations
+inside the process, ``wall`` (``time.time()``) for everything that leaves it (UI, CSV, binlog,
+history, API). The two are not convertible: the monotonic clock stops during suspend and does
+not follow NTP steps.
 """
 
+import time
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
 
-
-@dataclass
+@dataclass(slots=True)
 class PingResult:
     """Result of a single ping test."""
 
@@ -15,10 +19,19 @@ class PingResult:
     success: bool
     latency_ms: Optional[float] = None
     error: Optional[str] = None
-    timestamp: datetime = field(default_factory=datetime.now)
+    ts: float = field(default_factory=time.monotonic)
+    wall: float = field(default_factory=time.time)
+
+    @property
+    def epoch(self) -> float:
+        return self.wall
 
+    @property
+    def timestamp(self) -> datetime:
+        return datetime.fromtimestamp(self.epoch)
 
-@dataclass
+
+@dataclass(slots=True)
 class ConnectionStatus:
     """Overall connection status."""
 
@@ -29,10 +42,75 @@ class ConnectionStatus:
     local_network_ok: bool = False
     internet_ok: bool = False
     http_test_ok: bool = False
-    timestamp: datetime = field(default_factory=datetime.now)
+    ts: float = field(default_factory=time.monotonic)
+    wall: float = field(default_factory=time.time)
     public_ip: Optional[str] = None
     isp: Optional[str] = None
     vpn_connected: Optional[bool] = None
     vpn_provider: Optional[str] = None
     speed_mbps: Optional[float] = None
     speed_tier: Optional[str] = None  # 'slow' | 'medium' | 'fast'
+    upload_mbps: Optional[float] = None
+    loaded_latency_ms: Optional[float] = None  # worst median RTT during the last speed test
+    bufferbloat_grade: Optional[str] = None  # 'A+' .. 'F'
+    http_connection_reused: Optional[bool] = None  # False = probe paid a cold DNS/TCP/TLS handshake
+    stage_timings_ms: Optional[Dict[str, float]] = None  # 'ping' | 'http' | 'local' | 'network_info' | 'total'
+    ping_results: Optional[List[PingResult]] = None  # per-host results of this check (history store)
+
+    @property
+    def epoch(self) -> float:
+        return self.wall
+
+    @property
+    def timestamp(self) -> datetime:
+        return datetime.fromtimestamp(self.epoch)
+
+
+@dataclass(slots=True)
+class LoadedLatency:
+    """RTT to the ping hosts before (idle) and during the speed test windows (bufferbloat)."""
+
+    idle_ms: Optional[float] = None  # medians over all hosts
+    download_ms: Optional[float] = None
+    download_p95_ms: Optional[float] = None
+    upload_ms: Optional[float] = None
+    upload_p95_ms: Optional[float] = None
+    increase_ms: Optional[float] = None  # worst loaded median − idle median
+    grade: Optional[str] = None  # 'A+' | 'A' | 'B' | 'C' | 'D' | 'F'
+    samples: Dict[str, int] = field(default_factory=dict)  # RTTs per phase
+    lost: Dict[str, int] = field(default_factory=dict)  # failed probes per phase
+    method: Optional[str] = None  # 'icmp' | 'tcp' (TCP connect when no ICMP socket)
+
+    @property
+    def loaded_ms(self) -> Optional[float]:
+        loaded = [v for v in (self.download_ms, self.upload_ms) if v is not None]
+        return max(loaded) if loaded else None
+
+
+@dataclass(slots=True)
+class SpeedTestResult:
+    """
+    Outcome of one speed test: aggregate and per-stream download rate, optional upload rate.
+    ``download_mbps`` is None when every URL failed; ``bytes_consumed`` still counts the traffic.
+    """
+
+    download_mbps: Optional[float]
+    tier: Optional[str] = None  # 'slow' | 'medium' | 'fast'
+    url: str = ""
+    streams: int = 1
+    stream_mbps: List[Optional[float]] = field(default_factory=list)  # None = stream failed
+    stream_errors: Dict[int, str] = field(default_factory=dict)  # stream index -> error
+    bytes_measured: int = 0
+    bytes_consumed: int = 0  # all download + upload traffic, warmup and failed attempts included
+    window_s: float = 0.0
+    stop_reason: Optional[str] = None  # 'size' | 'converged' | 'time' | 'ended'
+    ci_percent: Optional[float] = None  # adaptive: 95% CI half-width of the slice rates, % of mean
+    upload_mbps: Optional[float] = None
+    upload_bytes: int = 0
+    latency: Optional[LoadedLatency] = None
+    ts: float = field(default_factory=time.monotonic)
+    wall: float = field(default_factory=time.time)
+
+    @property
+    def epoch(self) -> float:
+        return self.wall
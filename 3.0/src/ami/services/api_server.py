@@ -1,21 +1,179 @@
 """
 AMI 3.0 - Optional local HTTP API for status/stats.
-Supports optional auth_token in config.
+Supports optional auth_token in config. In threaded mode (``api.threaded``, default) each
+connection gets its own thread and HTTP/1.1 keep-alive; /status is serialized once per new
+ConnectionStatus and served from cached bytes with an ETag. /events and /events/stream push each
+published status to subscribers (long-poll / Server-Sent Events).
 """
 
+import gzip
+import hashlib
 import json
+import math
+import socket
 import threading
-from http.server import BaseHTTPRequestHandler, HTTPServer
-from typing import Optional
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, HTTPServer, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from ami.services.event_stream import EventHub
+from ami.services.history_query import (
+    DEFAULT_PAGE_BUCKETS,
+    MAX_PAGE_BUCKETS,
+    bucketize,
+    concat,
+    decode_cursor,
+    encode_cursor,
+    from_host_columns,
+    from_host_rows,
+    from_rollup_rows,
+    from_sample_rows,
+    from_status_columns,
+    parse_step,
+)
+from ami.services.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+
+ROUTES = (
+    "/status", "/health", "/stats", "/hosts", "/metrics",
+    "/history", "/history/periods", "/history/hosts", "/events", "/events/stream",
+)
+# Held open for a long time: counted, but kept out of the request latency figures.
+STREAM_ROUTES = ("/events", "/events/stream")
+_LATENCY_SAMPLES = 1024
+_SSE_HEARTBEAT_S = 15.0
+_LONG_POLL_MAX_S = 60.0
+_GZIP_MIN_BYTES = 1024
+
+
+def _accepts_gzip(header: Optional[str]) -> bool:
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "").lower() not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def status_payload(status) -> dict:
+    """JSON shape of a ConnectionStatus as served by /status."""
+    payload = {
+        "status": status.status,
+        "timestamp": status.timestamp.isoformat(),
+        "avg_latency_ms": status.avg_latency_ms,
+        "successful_pings": status.successful_pings,
+        "total_pings": status.total_pings,
+        "local_network_ok": status.local_network_ok,
+        "internet_ok": status.internet_ok,
+        "http_test_ok": status.http_test_ok,
+    }
+    if getattr(status, "speed_mbps", None) is not None:
+        payload["speed_mbps"] = status.speed_mbps
+    if getattr(status, "speed_tier", None) is not None:
+        payload["speed_tier"] = status.speed_tier
+    if getattr(status, "upload_mbps", None) is not None:
+        payload["upload_mbps"] = status.upload_mbps
+    if getattr(status, "bufferbloat_grade", None) is not None:
+        payload["loaded_latency_ms"] = status.loaded_latency_ms
+        payload["bufferbloat_grade"] = status.bufferbloat_grade
+    if getattr(status, "http_connection_reused", None) is not None:
+        payload["http_connection_reused"] = status.http_connection_reused
+    if getattr(status, "stage_timings_ms", None):
+        payload["stage_timings_ms"] = status.stage_timings_ms
+    return payload
+
+
+class StatusCache:
+    """Serialized /status body and its ETag, rebuilt only when a new ConnectionStatus appears."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._status = None
+        self._body = b""
+        self._etag = ""
+        self.builds = 0
+
+    def get(self, status) -> Tuple[bytes, str]:
+        with self._lock:
+            if status is not self._status:
+                self._body = json.dumps(status_payload(status), indent=2).encode()
+                self._etag = '"' + hashlib.blake2b(self._body, digest_size=8).hexdigest() + '"'
+                self._status = status
+                self.builds += 1
+            return self._body, self._etag
+
+
+class APIMetrics:
+    """Request counts per route and status code, latency percentiles over the last requests."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_route: Dict[str, int] = {}
+        self._by_code: Dict[int, int] = {}
+        self._latency_ms: deque = deque(maxlen=_LATENCY_SAMPLES)
+        self._total = 0
+        self._timed = 0
+        self._total_ms = 0.0
+        self._max_ms = 0.0
+        self._keepalive_reused = 0
+        self._not_modified = 0
+
+    def record(self, route: str, code: int, elapsed_ms: Optional[float], reused: bool) -> None:
+        """``elapsed_ms`` None: count the request without timing it (streams, long-polls)."""
+        with self._lock:
+            self._total += 1
+            self._by_route[route] = self._by_route.get(route, 0) + 1
+            self._by_code[code] = self._by_code.get(code, 0) + 1
+            if elapsed_ms is not None:
+                self._timed += 1
+                self._latency_ms.append(elapsed_ms)
+                self._total_ms += elapsed_ms
+                if elapsed_ms > self._max_ms:
+                    self._max_ms = elapsed_ms
+            if reused:
+                self._keepalive_reused += 1
+            if code == 304:
+                self._not_modified += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            recent = sorted(self._latency_ms)
+            out = {
+                "requests": self._total,
+                "by_route": dict(self._by_route),
+                "by_status": {str(k): v for k, v in sorted(self._by_code.items())},
+                "keepalive_reused": self._keepalive_reused,
+                "not_modified": self._not_modified,
+                "latency_ms": {
+                    "mean": round(self._total_ms / self._timed, 3) if self._timed else None,
+                    "max": round(self._max_ms, 3),
+                },
+            }
+        for name, q in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99)):
+            out["latency_ms"][name] = (
+                round(recent[min(len(recent) - 1, int(q * len(recent)))], 3) if recent else None
+            )
+        return out
 
 
 class APIHandler(BaseHTTPRequestHandler):
-    """GET /status, /health, /stats. Optional Authorization: Bearer <token>."""
+    """
+    GET /status, /health, /stats, /hosts, /metrics, /history, /history/periods, /history/hosts,
+    /events (long-poll), /events/stream (Server-Sent Events).
+    Optional Authorization: Bearer <token>.
+    """
 
     def _get_server_attrs(self):
         s = self.server
         return getattr(s, "monitor", None), getattr(s, "config", None), getattr(s, "auth_token", None)
 
+    _code = 0
+    _served = 0
+
+    def send_response(self, code, message=None):
+        self._code = code
+        super().send_response(code, message)
+
     def _check_auth(self) -> bool:
         token = self._get_server_attrs()[2]
         if not token or not token.strip():
@@ -27,42 +185,63 @@ class APIHandler(BaseHTTPRequestHandler):
         return len(parts) == 2 and parts[0].lower() == "bearer" and parts[1] == token
 
     def do_GET(self):
+        start = time.perf_counter()
+        self._code = 0
+        self._served += 1  # one handler per connection: >1 means a keep-alive reuse
+        path = urlsplit(self.path).path
+        try:
+            self._dispatch()
+        finally:
+            metrics = getattr(self.server, "metrics", None)
+            if metrics is not None:
+                metrics.record(
+                    path if path in ROUTES else "other",
+                    self._code,
+                    None if path in STREAM_ROUTES else (time.perf_counter() - start) * 1000,
+                    self._served > 1,
+                )
+
+    def _dispatch(self):
         if not self._check_auth():
-            self.send_response(401)
-            self.send_header("Content-Type", "application/json")
-            self.end_headers()
-            self.wfile.write(b'{"error":"Unauthorized"}')
+            self._send_bytes(b'{"error":"Unauthorized"}', 401)
             return
-        if self.path == "/status":
+        url = urlsplit(self.path)
+        path = url.path
+        if path == "/status":
             self.send_status()
-        elif self.path == "/health":
+        elif path == "/health":
             self.send_health()
-        elif self.path == "/stats":
+        elif path == "/stats":
             self.send_statistics()
+        elif path == "/hosts":
+            self.send_hosts()
+        elif path == "/metrics":
+            self.send_metrics()
+        elif path in ("/history", "/history/periods", "/history/hosts"):
+            self.send_history(path, parse_qs(url.query))
+        elif path == "/events":
+            self.send_events(parse_qs(url.query))
+        elif path == "/events/stream":
+            self.send_event_stream(parse_qs(url.query))
         else:
-            self.send_error(404, "Endpoint not found")
+            self.send_json_response({"error": "Endpoint not found"}, 404)
 
     def send_status(self):
         monitor, _, _ = self._get_server_attrs()
         if not monitor or not monitor.last_status:
             self.send_json_response({"error": "No status available yet"}, 503)
             return
-        status = monitor.last_status
-        payload = {
-            "status": status.status,
-            "timestamp": status.timestamp.isoformat(),
-            "avg_latency_ms": status.avg_latency_ms,
-            "successful_pings": status.successful_pings,
-            "total_pings": status.total_pings,
-            "local_network_ok": status.local_network_ok,
-            "internet_ok": status.internet_ok,
-            "http_test_ok": status.http_test_ok,
-        }
-        if getattr(status, "speed_mbps", None) is not None:
-            payload["speed_mbps"] = status.speed_mbps
-        if getattr(status, "speed_tier", None) is not None:
-            payload["speed_tier"] = status.speed_tier
-        self.send_json_response(payload)
+        cache = getattr(self.server, "status_cache", None)
+        if cache is None:
+            self.send_json_response(status_payload(monitor.last_status))
+            return
+        body, etag = cache.get(monitor.last_status)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        match = self.headers.get("If-None-Match")
+        if match and (match.strip() == "*" or etag in [t.strip() for t in match.split(",")]):
+            self._send_bytes(b"", 304, headers=headers)
+            return
+        self._send_bytes(body, headers=headers)
 
     def send_health(self):
         _, config, _ = self._get_server_attrs()
@@ -81,25 +260,299 @@ class APIHandler(BaseHTTPRequestHandler):
             self.send_json_response({"error": "Monitor not available"}, 503)
             return
         stats = monitor.get_statistics()
+        log_writer = getattr(self.server, "log_writer", None)
+        metrics = getattr(self.server, "metrics", None)
+        events = getattr(self.server, "events", None)
         self.send_json_response({
             "total_checks": stats["total_checks"],
             "successful_checks": stats["successful_checks"],
             "uptime_percentage": stats["uptime_percentage"],
             "uptime_duration": stats["uptime_duration"],
             "history_count": stats["history_count"],
+            "http_pool": stats.get("http_pool", {}),
+            "windows": stats.get("windows", {}),
+            "speed_test": stats.get("speed_test"),
+            "log_queue": log_writer.stats() if log_writer else None,
+            "api": metrics.snapshot() if metrics else None,
+            "events": events.stats() if events else None,
         })
 
-    def send_json_response(self, data: dict, status_code: int = 200):
+    def send_hosts(self):
+        monitor, _, _ = self._get_server_attrs()
+        if not monitor:
+            self.send_json_response({"error": "Monitor not available"}, 503)
+            return
+        self.send_json_response({"hosts": monitor.get_host_statistics()})
+
+    def send_metrics(self):
+        """Prometheus text exposition of the monitor counters plus log queue and API counters."""
+        monitor, _, _ = self._get_server_attrs()
+        registry = getattr(monitor, "metrics", None)
+        if registry is None:
+            self.send_json_response({"error": "Monitor not available"}, 503)
+            return
+        extra = []
+        log_writer = getattr(self.server, "log_writer", None)
+        if log_writer is not None:
+            q = log_writer.stats()
+            for name, kind, help_text, value in (
+                ("ami_log_queue_depth", "gauge", "Status rows waiting to be written.", q["depth"]),
+                ("ami_log_rows_written_total", "counter", "Status rows written.", q["written"]),
+                ("ami_log_rows_dropped_total", "counter", "Status rows dropped by the queue.", q["dropped"]),
+                ("ami_log_write_errors_total", "counter", "Failed log writes.", q["errors"]),
+            ):
+                extra.append((name, kind, help_text, [({}, value)]))
+        metrics = getattr(self.server, "metrics", None)
+        if metrics is not None:
+            api = metrics.snapshot()
+            extra.append((
+                "ami_api_requests_total", "counter", "API requests served, by route.",
+                [({"route": route}, n) for route, n in sorted(api["by_route"].items())],
+            ))
+        events = getattr(self.server, "events", None)
+        if events is not None:
+            extra.append((
+                "ami_api_stream_subscribers", "gauge", "Open /events/stream connections.",
+                [({}, events.stats()["subscribers"])],
+            ))
+        body, headers = self._maybe_gzip(registry.render(extra).encode())
+        self._send_bytes(body, content_type=METRICS_CONTENT_TYPE, headers=headers)
+
+    def send_history(self, path: str, query: dict):
+        """
+        Historical window from the SQLite history store. Query: ``from`` / ``to`` (epoch s) or
+        ``since`` (seconds back from now, default 3600), ``status``, ``host``, ``limit``;
+        ``resolution`` = ``raw`` (default) | ``1m`` | ``1h`` selects a retention tier for /history.
+        With ``step`` (or ``cursor``) /history returns buckets, see ``send_history_buckets``.
+        """
+        if path == "/history" and (query.get("step") or query.get("cursor")):
+            self.send_history_buckets(query)
+            return
+        store = getattr(self.server, "history_store", None)
+        if store is None:
+            self.send_json_response({"error": "History store not enabled (logging.backend)"}, 503)
+            return
+
+        def arg(name: str):
+            values = query.get(name)
+            return values[0] if values else None
+
+        try:
+            end = float(arg("to")) if arg("to") else time.time()
+            if arg("from"):
+                start = float(arg("from"))
+            else:
+                start = end - float(arg("since") or 3600)
+            if not (math.isfinite(start) and math.isfinite(end)):
+                raise ValueError("non-finite time")
+            limit = int(arg("limit")) if arg("limit") else None
+        except ValueError:
+            self.send_json_response({"error": "Invalid from/to/since/limit"}, 400)
+            return
+        payload = {"from": start, "to": end}
+        if path == "/history/periods":
+            payload["periods"] = store.periods(status=arg("status"), start=start, end=end)
+            payload["summary"] = store.summary(start=start, end=end)
+        elif path == "/history/hosts":
+            payload["results"] = store.host_results(host=arg("host"), start=start, end=end, limit=limit)
+        elif arg("resolution") in ("1m", "1h"):
+            payload["resolution"] = arg("resolution")
+            payload["buckets"] = store.rollups(arg("resolution"), start=start, end=end, limit=limit)
+        elif arg("resolution") in (None, "raw"):
+            payload["samples"] = store.samples(start=start, end=end, status=arg("status"), limit=limit)
+        else:
+            self.send_json_response({"error": "resolution must be raw, 1m or 1h"}, 400)
+            return
+        self.send_json_response(payload)
+
+    def send_history_buckets(self, query: dict):
+        """
+        ``/history?step=`` (seconds, or ``5m`` / ``1h`` / ``1d``) over ``from`` / ``to`` / ``since``,
+        optionally for one ``host``: buckets aggregated here on a grid aligned to ``step``.
+        ``limit`` bucket slots per page (default 1000, max 10000); pass ``next_cursor`` back as
+        ``cursor`` for the next page. Reads the SQLite history when enabled (raw samples, then
+        1m / 1h rollups for older ranges), otherwise the in-memory ring of recent checks.
+        """
+
+        def arg(name: str):
+            values = query.get(name)
+            return values[0] if values else None
+
+        try:
+            if arg("cursor"):
+                start, end, step, host = decode_cursor(arg("cursor"))
+            else:
+                end = float(arg("to")) if arg("to") else time.time()
+                start = float(arg("from")) if arg("from") else end - float(arg("since") or 3600)
+                step = parse_step(arg("step"))
+                host = arg("host")
+                if not (math.isfinite(start) and math.isfinite(end)):
+                    raise ValueError("from/to/since must be finite")
+                start = math.floor(start / step) * step
+            limit = int(arg("limit")) if arg("limit") else DEFAULT_PAGE_BUCKETS
+            if start >= end or limit < 1:
+                raise ValueError("Empty range")
+        except ValueError as e:
+            self.send_json_response({"error": f"Invalid history query: {e}"}, 400)
+            return
+        page_end = min(end, start + min(limit, MAX_PAGE_BUCKETS) * step)
+
+        store = getattr(self.server, "history_store", None)
+        monitor, _, _ = self._get_server_attrs()
+        if store is not None:
+            series = store.series(start, page_end, host, straddle=not arg("cursor"))
+            if host is not None:
+                partials = from_host_rows(series.get("raw", []))
+            else:
+                partials = concat([
+                    from_rollup_rows(series.get("1h", [])),
+                    from_rollup_rows(series.get("1m", [])),
+                    from_sample_rows(series.get("raw", [])),
+                ])
+            source = "sqlite"
+        elif monitor is not None:
+            if host is not None:
+                views = monitor.host_stats.history(host)
+                partials = concat([]) if views is None else from_host_columns(
+                    views["ts"], views["success"], views["latency_ms"].astype(float)
+                )
+            else:
+                partials = from_status_columns(monitor.status_history.views())
+            source = "memory"
+        else:
+            self.send_json_response({"error": "Monitor not available"}, 503)
+            return
+        self.send_json_response({
+            "from": start,
+            "to": end,
+            "step": step,
+            "host": host,
+            "source": source,
+            "buckets": bucketize(partials, start, page_end, step, with_status=host is None),
+            "next_cursor": encode_cursor(page_end, end, step, host) if page_end < end else None,
+        })
+
+    def _event_hub(self) -> Optional[EventHub]:
+        """The server's EventHub, or None (after a 503) when blocking reads are not possible."""
+        hub = getattr(self.server, "events", None)
+        if hub is None or not isinstance(self.server, ThreadingHTTPServer):
+            # A held request would block every other client of the single-threaded server.
+            self.send_json_response({"error": "Event stream requires api.threaded"}, 503)
+            return None
+        return hub
+
+    def send_events(self, query: dict):
+        """
+        Long-poll: ``since`` = last event id seen; waits up to ``timeout`` s (default 25) for newer
+        events. Without ``since`` the latest status event is returned at once.
+        """
+        hub = self._event_hub()
+        if hub is None:
+            return
+        try:
+            since = int(query["since"][0]) if query.get("since") else None
+            timeout = float(query["timeout"][0]) if query.get("timeout") else 25.0
+        except ValueError:
+            self.send_json_response({"error": "Invalid since/timeout"}, 400)
+            return
+        if since is None:
+            events, cursor = hub.latest("status")
+            lagged = False
+        else:
+            events, cursor, lagged = hub.wait(since, min(timeout, _LONG_POLL_MAX_S), hub.generation)
+        body = b"".join((
+            b'{"events":[', b",".join(ev.json for ev in events),
+            b'],"next":', str(cursor).encode(), b',"lagged":', b"true" if lagged else b"false", b"}",
+        ))
+        self._send_bytes(body, headers={"Cache-Control": "no-cache"})
+
+    def send_event_stream(self, query: dict):
+        """
+        Server-Sent Events: ``status`` for every new ConnectionStatus, ``transition`` on a state
+        change. Resumes after ``Last-Event-ID`` (or ``?since=``); otherwise starts with the latest
+        status. A comment line every 15 s keeps proxies open and detects dead clients.
+        """
+        hub = self._event_hub()
+        if hub is None:
+            return
+        last_id = self.headers.get("Last-Event-ID") or (query.get("since") or [None])[0]
+        try:
+            cursor = int(last_id) if last_id else None
+        except ValueError:
+            cursor = None
+        if not hub.subscribe():
+            self.send_json_response({"error": "Too many event stream clients"}, 503)
+            return
+        generation = hub.generation
+        disconnected = False
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            if cursor is None:
+                events, cursor = hub.latest("status")
+                self.wfile.write(b"retry: 3000\n\n" + b"".join(ev.sse for ev in events))
+            while hub.generation == generation:
+                events, cursor, _ = hub.wait(cursor, _SSE_HEARTBEAT_S, generation)
+                # One write per batch; a subscriber that stops reading hits the socket timeout.
+                self.wfile.write(b"".join(ev.sse for ev in events) if events else b": ping\n\n")
+        except (BrokenPipeError, ConnectionResetError, socket.timeout, OSError):
+            disconnected = True
+        finally:
+            hub.unsubscribe(disconnected)
+
+    def _send_bytes(
+        self,
+        body: bytes,
+        status_code: int = 200,
+        content_type: str = "application/json",
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        """Send a complete response; Content-Length is always set so keep-alive can work."""
         self.send_response(status_code)
-        self.send_header("Content-Type", "application/json")
+        if status_code != 304:
+            self.send_header("Content-Type", content_type)
         self.send_header("Access-Control-Allow-Origin", "*")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
         self.end_headers()
-        self.wfile.write(json.dumps(data, indent=2).encode())
+        if body:
+            self.wfile.write(body)
+
+    def _maybe_gzip(self, body: bytes) -> Tuple[bytes, Optional[Dict[str, str]]]:
+        """gzip ``body`` if it is worth it and the client sent ``Accept-Encoding: gzip``."""
+        if len(body) < _GZIP_MIN_BYTES or not _accepts_gzip(self.headers.get("Accept-Encoding")):
+            return body, None
+        return gzip.compress(body, compresslevel=5), {"Content-Encoding": "gzip", "Vary": "Accept-Encoding"}
+
+    def send_json_response(self, data: dict, status_code: int = 200):
+        body, headers = self._maybe_gzip(json.dumps(data, indent=2).encode())
+        self._send_bytes(body, status_code, headers=headers)
 
     def log_message(self, format, *args):
         pass
 
 
+class KeepAliveAPIHandler(APIHandler):
+    """HTTP/1.1 persistent connections; an idle connection is closed after ``timeout`` seconds."""
+
+    protocol_version = "HTTP/1.1"
+    timeout = 30
+    # Headers and body go out as separate writes; without TCP_NODELAY every keep-alive
+    # response after the first waits ~40 ms for the client's delayed ACK.
+    disable_nagle_algorithm = True
+
+
+class ThreadedAPIHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    block_on_close = False
+
+
 class APIServer:
     """HTTP API server in a background thread."""
 
@@ -109,6 +562,13 @@ class APIServer:
         self.enabled = config["api"]["enabled"]
         self.port = config["api"]["port"]
         self.auth_token = (config["api"].get("auth_token") or "").strip()
+        self.threaded = config["api"].get("threaded", True)
+        self.metrics = APIMetrics()
+        self.status_cache = StatusCache()
+        self.events = EventHub(max_subscribers=config["api"].get("max_stream_clients", 32))
+        self._last_state: Optional[str] = None
+        self.log_writer = None  # AsyncLogWriter, set by the tray app
+        self.history_store = None  # HistoryStore of the EventLogger, set by the tray app
         self.server: Optional[HTTPServer] = None
         self.thread: Optional[threading.Thread] = None
 
@@ -116,18 +576,41 @@ class APIServer:
         if not self.enabled:
             return
         try:
-            self.server = HTTPServer(("127.0.0.1", self.port), APIHandler)
+            if self.threaded:
+                self.server = ThreadedAPIHTTPServer(("127.0.0.1", self.port), KeepAliveAPIHandler)
+            else:
+                self.server = HTTPServer(("127.0.0.1", self.port), APIHandler)
+            self.server.metrics = self.metrics
+            self.server.status_cache = self.status_cache
+            self.server.events = self.events
             self.server.monitor = self.monitor
             self.server.config = self.config
             self.server.auth_token = self.auth_token
+            self.server.log_writer = self.log_writer
+            self.server.history_store = self.history_store
             self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
             self.thread.start()
             print(f"API server started on http://localhost:{self.port}")
         except Exception as e:
             print(f"Failed to start API server: {e}")
 
+    def publish(self, status) -> None:
+        """Push a new ConnectionStatus (and a transition, if the state changed) to subscribers."""
+        if not self.enabled:
+            return
+        if self._last_state is not None and status.status != self._last_state:
+            self.events.publish("transition", {
+                "from": self._last_state,
+                "to": status.status,
+                "timestamp": status.timestamp.isoformat(),
+            })
+        self._last_state = status.status
+        self.events.publish("status", status_payload(status))
+
     def stop(self) -> None:
+        self.events.close()
         if self.server:
             self.server.shutdown()
+            self.server.server_close()
             self.server = None
             print("API server stopped")
@@ -0,0 +1,276 @@
+"""
+AMI 3.0 - Append-only binary status log.
+A 32-byte header (magic, format version, record size) followed by fixed-width little-endian
+records. The file can be memory-mapped straight into a numpy structured array: no text parsing,
+no Yes/No strings, timestamps as epoch float64.
+"""
+
+import csv
+import math
+import os
+import struct
+import threading
+import time
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from ami.core.history import STATUS_CODES, STATUS_NAMES
+
+MAGIC = b"AMIB"
+VERSION = 1
+HEADER_SIZE = 32
+_HEADER = struct.Struct("<4sHHI20x")  # magic, version, record size, header size
+
+# Flag bits of the ``flags`` field.
+FLAG_LOCAL_OK = 1
+FLAG_INTERNET_OK = 2
+FLAG_HTTP_OK = 4
+
+RECORD_DTYPE = np.dtype([
+    ("ts", "<f8"),  # epoch seconds
+    ("latency_ms", "<f4"),  # NaN = no successful ping
+    ("speed_mbps", "<f4"),  # NaN = no speed result
+    ("successful_pings", "<u2"),
+    ("total_pings", "<u2"),
+    ("status", "u1"),  # STATUS_CODES
+    ("flags", "u1"),  # FLAG_*
+    ("reserved", "V2"),
+])
+_RECORD = struct.Struct("<dffHHBB2x")
+RECORD_SIZE = _RECORD.size
+assert RECORD_SIZE == RECORD_DTYPE.itemsize == 24
+
+
+class BinaryLogError(ValueError):
+    """File is not an AMI binary log or has an unsupported version."""
+
+
+def file_header() -> bytes:
+    return _HEADER.pack(MAGIC, VERSION, RECORD_SIZE, HEADER_SIZE)
+
+
+def _check_header(raw: bytes, path: str) -> None:
+    if len(raw) < HEADER_SIZE:
+        raise BinaryLogError(f"{path}: truncated header")
+    magic, version, rec_size, hdr_size = _HEADER.unpack(raw[:HEADER_SIZE])
+    if magic != MAGIC:
+        raise BinaryLogError(f"{path}: not an AMI binary log")
+    if version != VERSION or rec_size != RECORD_SIZE or hdr_size != HEADER_SIZE:
+        raise BinaryLogError(f"{path}: unsupported version {version} (record {rec_size} B)")
+
+
+def pack_record(
+    ts: float,
+    status: str,
+    latency_ms: Optional[float],
+    successful_pings: int,
+    total_pings: int,
+    local_ok: bool,
+    internet_ok: bool,
+    http_ok: bool,
+    speed_mbps: Optional[float] = None,
+) -> bytes:
+    flags = (
+        (FLAG_LOCAL_OK if local_ok else 0)
+        | (FLAG_INTERNET_OK if internet_ok else 0)
+        | (FLAG_HTTP_OK if http_ok else 0)
+    )
+    return _RECORD.pack(
+        ts,
+        math.nan if latency_ms is None else latency_ms,
+        math.nan if speed_mbps is None else speed_mbps,
+        successful_pings,
+        total_pings,
+        STATUS_CODES.get(status, 0),
+        flags,
+    )
+
+
+def pack_status(status) -> bytes:
+    return pack_record(
+        status.epoch,
+        status.status,
+        status.avg_latency_ms,
+        status.successful_pings,
+        status.total_pings,
+        status.local_network_ok,
+        status.internet_ok,
+        status.http_test_ok,
+        getattr(status, "speed_mbps", None),
+    )
+
+
+def read_records(path: str, last: Optional[int] = None) -> np.ndarray:
+    """
+    Records of ``path`` as a read-only structured array (``RECORD_DTYPE``), memory-mapped:
+    only the pages that are touched are read. ``last`` limits it to the newest records.
+    A trailing partial record (interrupted write) is ignored.
+    """
+    with open(path, "rb") as f:
+        _check_header(f.read(HEADER_SIZE), path)
+        size = os.fstat(f.fileno()).st_size
+    n = (size - HEADER_SIZE) // RECORD_SIZE
+    first = 0 if last is None else max(0, n - int(last))
+    if n - first <= 0:
+        return np.empty(0, dtype=RECORD_DTYPE)
+    return np.memmap(
+        path,
+        dtype=RECORD_DTYPE,
+        mode="r",
+        offset=HEADER_SIZE + first * RECORD_SIZE,
+        shape=(n - first,),
+    )
+
+
+def record_rows(records: np.ndarray) -> List[dict]:
+    """Records in the CSV row shape of EventLogger (same keys as the CSV header)."""
+    rows = []
+    for r in records.tolist():
+        ts, lat, _speed, ok, total, code, flags, _ = r
+        rows.append({
+            "Timestamp": datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S"),
+            "Status": STATUS_NAMES[code] if code < len(STATUS_NAMES) else "offline",
+            "Avg Latency (ms)": "N/A" if math.isnan(lat) or not lat else f"{lat:.2f}",
+            "Successful Pings": str(ok),
+            "Total Pings": str(total),
+            "Local Network": "Yes" if flags & FLAG_LOCAL_OK else "No",
+            "Internet OK": "Yes" if flags & FLAG_INTERNET_OK else "No",
+            "HTTP Test OK": "Yes" if flags & FLAG_HTTP_OK else "No",
+        })
+    return rows
+
+
+def _csv_record(row: dict) -> bytes:
+    lat = row.get("Avg Latency (ms)") or "N/A"
+    return pack_record(
+        datetime.strptime(row["Timestamp"], "%Y-%m-%d %H:%M:%S").timestamp(),
+        row.get("Status", "offline"),
+        None if lat == "N/A" else float(lat),
+        int(row.get("Successful Pings") or 0),
+        int(row.get("Total Pings") or 0),
+        row.get("Local Network") == "Yes",
+        row.get("Internet OK") == "Yes",
+        row.get("HTTP Test OK") == "Yes",
+    )
+
+
+def convert_csv_rows(rows: Iterable[dict], out_path: str, batch: int = 4096) -> int:
+    """Write CSV log records (dicts, e.g. from ``iter_log_records``) to a new binary log."""
+    count = 0
+    buf = bytearray()
+    with open(out_path, "wb") as out:
+        out.write(file_header())
+        for row in rows:
+            try:
+                buf += _csv_record(row)
+            except (KeyError, ValueError):
+                continue  # malformed row
+            count += 1
+            if count % batch == 0:
+                out.write(buf)
+                buf.clear()
+        out.write(buf)
+    return count
+
+
+def convert_csv(csv_path: str, out_path: str) -> int:
+    """Convert one CSV log file; returns the number of records written."""
+    with open(csv_path, "r", encoding="utf-8", newline="") as f:
+        return convert_csv_rows(csv.DictReader(f), out_path)
+
+
+class BinaryLogWriter:
+    """
+    Batched appender for the binary log, with the same size/time flush policy and size-based
+    rotation as the buffered CSV log. ``on_rotate(path)`` receives the live file's path and must
+    move it aside (EventLogger hands it to the archiver).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        flush_interval_s: float = 5.0,
+        flush_max_rows: int = 60,
+        max_bytes: int = 1024 * 1024,
+        on_rotate=None,
+    ):
+        self.path = path
+        self.flush_interval_s = float(flush_interval_s)
+        self.flush_max_rows = max(1, int(flush_max_rows))
+        self.max_bytes = max(HEADER_SIZE + RECORD_SIZE, int(max_bytes))
+        self._on_rotate = on_rotate
+        self._lock = threading.RLock()
+        self._fh = None
+        self._size = 0
+        self._pending = bytearray()
+        self._last_flush = time.monotonic()
+
+    def _open(self) -> None:
+        fh = open(self.path, "a+b")
+        fh.seek(0)
+        raw = fh.read(HEADER_SIZE)
+        if not raw:
+            fh.write(file_header())
+        else:
+            try:
+                _check_header(raw, self.path)
+            except BinaryLogError:
+                fh.close()
+                raise
+            size = os.fstat(fh.fileno()).st_size
+            tail = (size - HEADER_SIZE) % RECORD_SIZE
+            if tail:
+                fh.truncate(size - tail)  # drop a partial record from an interrupted write
+        fh.flush()
+        self._fh = fh
+        self._size = os.fstat(fh.fileno()).st_size
+
+    def _rotate(self) -> None:
+        self._fh.close()
+        self._fh = None
+        if self._on_rotate is not None:
+            self._on_rotate(self.path)
+        else:
+            os.remove(self.path)
+        self._open()
+
+    def add(self, status) -> None:
+        with self._lock:
+            self._pending += pack_status(status)
+            if (
+                len(self._pending) >= self.flush_max_rows * RECORD_SIZE
+                or time.monotonic() - self._last_flush >= self.flush_interval_s
+            ):
+                self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._pending:
+                return
+            try:
+                if self._fh is None:
+                    self._open()
+                if self._size + len(self._pending) > self.max_bytes and self._size > HEADER_SIZE:
+                    self._rotate()
+                self._fh.write(self._pending)
+                self._fh.flush()
+                self._size += len(self._pending)
+            except Exception as e:
+                print(f"Error writing binary log: {e}")
+                if self._fh is not None:
+                    try:
+                        self._fh.close()
+                    except Exception:
+                        pass
+                    self._fh = None
+            self._pending.clear()
+
+    def close(self) -> None:
+        with self._lock:
+            self.flush()
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
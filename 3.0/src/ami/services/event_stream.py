@@ -0,0 +1,121 @@
+"""
+AMI 3.0 - Push stream of status events for the local API (SSE and long-poll).
+Each event is serialized once into its SSE frame and its JSON object; every subscriber reads the
+same bytes from one bounded ring. Publishing never waits on a subscriber: a subscriber that falls
+behind the ring is conflated to the newest event of each kind instead of replaying the backlog.
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+class Event(NamedTuple):
+    seq: int
+    kind: str
+    sse: bytes  # complete "id/event/data" frame
+    json: bytes  # {"id":..,"event":..,"data":..}
+
+
+class EventHub:
+    """
+    Bounded event ring with blocking reads by cursor (the ``seq`` of the last event seen).
+    ``close()`` wakes every waiting reader so stream handlers can end on server stop.
+    """
+
+    def __init__(self, backlog: int = 256, max_subscribers: int = 32):
+        self.max_subscribers = max(1, int(max_subscribers))
+        self._cond = threading.Condition()
+        self._events: deque = deque(maxlen=max(1, int(backlog)))
+        self._seq = 0
+        self._generation = 0
+        self._subscribers = 0
+        self._counters = {"published": 0, "lagged": 0, "rejected": 0, "disconnected": 0}
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def publish(self, kind: str, data: dict) -> int:
+        body = json.dumps(data, separators=(",", ":"))
+        with self._cond:
+            self._seq += 1
+            seq = self._seq
+            self._events.append(Event(
+                seq,
+                kind,
+                f"id: {seq}\nevent: {kind}\ndata: {body}\n\n".encode(),
+                f'{{"id":{seq},"event":"{kind}","data":{body}}}'.encode(),
+            ))
+            self._counters["published"] += 1
+            self._cond.notify_all()
+        return seq
+
+    def latest(self, kind: Optional[str] = None) -> Tuple[List[Event], int]:
+        """Newest event (of ``kind``) as a one-item list, and the current cursor."""
+        with self._cond:
+            for ev in reversed(self._events):
+                if kind is None or ev.kind == kind:
+                    return [ev], self._seq
+            return [], self._seq
+
+    def wait(
+        self, cursor: int, timeout: float, generation: Optional[int] = None
+    ) -> Tuple[List[Event], int, bool]:
+        """
+        Events after ``cursor``, blocking up to ``timeout`` s for the first one.
+        Returns ``(events, new_cursor, lagged)``; ``lagged`` means events were skipped.
+        Returns at once (empty) after ``close()`` if ``generation`` was taken before it.
+        """
+        deadline = time.monotonic() + max(0.0, timeout)
+        with self._cond:
+            if cursor > self._seq:
+                cursor = 0  # id from before an app restart
+            while self._seq <= cursor and (generation is None or generation == self._generation):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            if self._seq <= cursor or not self._events:
+                return [], cursor, False
+            oldest = self._events[0].seq
+            if cursor >= oldest - 1:
+                events = [ev for ev in self._events if ev.seq > cursor]
+                return events, self._seq, False
+            # Fell behind the ring: keep only the newest event of each kind, in order.
+            self._counters["lagged"] += 1
+            newest: Dict[str, Event] = {}
+            for ev in self._events:
+                newest[ev.kind] = ev
+            return sorted(newest.values(), key=lambda ev: ev.seq), self._seq, True
+
+    def subscribe(self) -> bool:
+        """Reserve a stream slot; False when ``max_subscribers`` are connected."""
+        with self._cond:
+            if self._subscribers >= self.max_subscribers:
+                self._counters["rejected"] += 1
+                return False
+            self._subscribers += 1
+            return True
+
+    def unsubscribe(self, disconnected: bool = False) -> None:
+        with self._cond:
+            self._subscribers = max(0, self._subscribers - 1)
+            if disconnected:
+                self._counters["disconnected"] += 1
+
+    def close(self) -> None:
+        """Release every blocked reader (their ``generation`` no longer matches)."""
+        with self._cond:
+            self._generation += 1
+            self._cond.notify_all()
+
+    def stats(self) -> Dict:
+        with self._cond:
+            out = dict(self._counters)
+            out["subscribers"] = self._subscribers
+            out["last_id"] = self._seq
+        out["max_subscribers"] = self.max_subscribers
+        return out
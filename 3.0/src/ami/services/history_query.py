@@ -0,0 +1,206 @@
+"""
+AMI 3.0 - Server-side downsampling for GET /history?step=.
+Rows from any source (SQLite samples or rollups, the in-memory ring, per-host probes) are turned
+into the same partial aggregates — counts, sums, min/max — and bucketed with numpy in one pass
+(``reduceat`` over the bucket boundaries of the time-sorted rows). Pages are bounded in time:
+a cursor carries the next bucket start, so each page reads only its own slice of history.
+"""
+
+import base64
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ami.core.history import STATUS_CODES
+
+DEFAULT_PAGE_BUCKETS = 1000
+MAX_PAGE_BUCKETS = 10000
+_STEP_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+_CURSOR_VERSION = "1"
+
+# Partial-aggregate columns every source is converted to. State counts are in samples; rollups
+# spread their sample count over the states in proportion to the seconds spent in each.
+_PARTIALS = (
+    "samples", "latency_n", "latency_sum", "latency_min", "latency_max",
+    "pings_ok", "pings_total", "online", "unstable", "offline",
+)
+
+
+def parse_step(text: str) -> float:
+    """``"300"``, ``"5m"``, ``"1h"``, ``"1d"`` → seconds (ValueError if not positive)."""
+    text = text.strip().lower()
+    unit = _STEP_UNITS.get(text[-1:]) if text else None
+    step = float(text[:-1]) * unit if unit else float(text)
+    if not step > 0 or math.isinf(step):
+        raise ValueError(f"Invalid step {text!r}")
+    return step
+
+
+def encode_cursor(start: float, end: float, step: float, host: Optional[str]) -> str:
+    raw = "\n".join((_CURSOR_VERSION, repr(start), repr(end), repr(step), host or ""))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[float, float, float, Optional[str]]:
+    """Inverse of ``encode_cursor``; ValueError for anything it did not produce."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        version, start, end, step, host = raw.split("\n")
+        if version != _CURSOR_VERSION:
+            raise ValueError
+        start, end, step = float(start), float(end), float(step)
+        if not (math.isfinite(start) and math.isfinite(end) and math.isfinite(step) and step > 0):
+            raise ValueError
+        return start, end, step, host or None
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _empty() -> Dict[str, np.ndarray]:
+    out = {name: np.zeros(0) for name in _PARTIALS}
+    out["ts"] = np.zeros(0)
+    return out
+
+
+def _status_partials(ts, status, latency, ok, total) -> Dict[str, np.ndarray]:
+    has_lat = ~np.isnan(latency)
+    ones = np.ones(len(ts))
+    return {
+        "ts": ts,
+        "samples": ones,
+        "latency_n": has_lat.astype(np.float64),
+        "latency_sum": np.where(has_lat, latency, 0.0),
+        "latency_min": latency,
+        "latency_max": latency,
+        "pings_ok": ok.astype(np.float64),
+        "pings_total": total.astype(np.float64),
+        "online": (status == STATUS_CODES["online"]).astype(np.float64),
+        "unstable": (status == STATUS_CODES["unstable"]).astype(np.float64),
+        "offline": (status == STATUS_CODES["offline"]).astype(np.float64),
+    }
+
+
+def from_sample_rows(rows: Sequence[tuple]) -> Dict[str, np.ndarray]:
+    """``(ts, status, latency_ms, successful_pings, total_pings)`` rows (HistoryStore ``raw``)."""
+    if not rows:
+        return _empty()
+    a = np.array(rows, dtype=np.float64)  # None latency → NaN
+    return _status_partials(a[:, 0], a[:, 1], a[:, 2], a[:, 3], a[:, 4])
+
+
+def from_rollup_rows(rows: Sequence[tuple]) -> Dict[str, np.ndarray]:
+    """Rows of ``HistoryStore._ROLLUP_COLUMNS`` (``1m`` / ``1h``)."""
+    if not rows:
+        return _empty()
+    a = np.array(rows, dtype=np.float64)
+    (ts, samples, lat_n, lat_min, lat_avg, lat_max, _p95, ok, total, on_s, unst_s, off_s) = a.T
+    secs = on_s + unst_s + off_s
+    share = np.divide(samples, secs, out=np.zeros_like(secs), where=secs > 0)
+    return {
+        "ts": ts,
+        "samples": samples,
+        "latency_n": lat_n,
+        "latency_sum": np.where(lat_n > 0, np.nan_to_num(lat_avg) * lat_n, 0.0),
+        "latency_min": lat_min,
+        "latency_max": lat_max,
+        "pings_ok": ok,
+        "pings_total": total,
+        "online": on_s * share,
+        "unstable": unst_s * share,
+        "offline": off_s * share,
+    }
+
+
+def from_host_rows(rows: Sequence[tuple]) -> Dict[str, np.ndarray]:
+    """``(ts, success, latency_ms)`` probe rows: one ping each, no status columns."""
+    if not rows:
+        return _empty()
+    a = np.array(rows, dtype=np.float64)
+    return from_host_columns(a[:, 0], a[:, 1], a[:, 2])
+
+
+def from_host_columns(ts, success, latency) -> Dict[str, np.ndarray]:
+    ok = success > 0
+    lat = np.where(ok, latency, np.nan)
+    return _status_partials(ts, np.full(len(ts), -1), lat, ok, np.ones(len(ts)))
+
+
+def from_status_columns(views: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Column views of the in-memory ``StatusHistory``."""
+    return _status_partials(
+        views["ts"].astype(np.float64),
+        views["status"],
+        views["latency_ms"].astype(np.float64),
+        views["successful_pings"],
+        views["total_pings"],
+    )
+
+
+def concat(parts: Sequence[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    parts = [p for p in parts if len(p["ts"])]
+    if not parts:
+        return _empty()
+    out = {name: np.concatenate([p[name] for p in parts]) for name in ("ts",) + _PARTIALS}
+    if len(out["ts"]) > 1 and np.any(np.diff(out["ts"]) < 0):
+        order = np.argsort(out["ts"], kind="stable")
+        out = {name: col[order] for name, col in out.items()}
+    return out
+
+
+def _clean(values: np.ndarray, digits: int) -> List[Optional[float]]:
+    return [None if v != v else round(v, digits) for v in values.tolist()]
+
+
+def bucketize(
+    partials: Dict[str, np.ndarray],
+    start: float,
+    end: float,
+    step: float,
+    with_status: bool = True,
+) -> List[Dict]:
+    """
+    Non-empty ``step``-wide buckets on the grid anchored at ``start``, oldest first. Each bucket
+    has sample count, latency avg/min/max, loss and — for connection status — the sample count
+    per state and availability.
+    """
+    ts = partials["ts"]
+    keep = (ts >= start) & (ts < end)
+    if not keep.all():
+        partials = {name: col[keep] for name, col in partials.items()}
+        ts = partials["ts"]
+    if not len(ts):
+        return []
+    idx = np.floor((ts - start) / step).astype(np.int64)
+    # Rows are time-sorted, so each bucket is one contiguous run starting at ``first``.
+    buckets, first = np.unique(idx, return_index=True)
+
+    def total(name: str) -> np.ndarray:
+        return np.add.reduceat(partials[name], first)
+
+    samples = total("samples")
+    lat_n = total("latency_n")
+    pings_total = total("pings_total")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        lat_avg = np.where(lat_n > 0, total("latency_sum") / lat_n, np.nan)
+        loss = np.where(pings_total > 0, (1 - total("pings_ok") / pings_total) * 100, np.nan)
+        lat_min = np.fmin.reduceat(partials["latency_min"], first)
+        lat_max = np.fmax.reduceat(partials["latency_max"], first)
+    columns = {
+        "ts": (start + buckets * step).tolist(),
+        "samples": _clean(samples, 2),
+        "latency_avg": _clean(lat_avg, 2),
+        "latency_min": _clean(lat_min, 2),
+        "latency_max": _clean(lat_max, 2),
+        "loss_percent": _clean(loss, 2),
+    }
+    if with_status:
+        states = {name: total(name) for name in ("online", "unstable", "offline")}
+        counted = states["online"] + states["unstable"] + states["offline"]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            avail = np.where(counted > 0, (states["online"] + states["unstable"]) / counted * 100, np.nan)
+        for name, col in states.items():
+            columns[name] = _clean(col, 2)
+        columns["availability_percent"] = _clean(avail, 3)
+    names = list(columns)
+    return [dict(zip(names, row)) for row in zip(*columns.values())]
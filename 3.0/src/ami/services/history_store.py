@@ -0,0 +1,617 @@
+"""
+AMI 3.0 - SQLite time-series store for connection history.
+One row per check in ``samples``, one per probed target in ``host_results`` and one per run of
+equal status in ``periods`` (kept up to date on insert, so "offline periods last week" is an
+index range scan). WAL journal; inserts are batched on the same size/time policy as the CSV log.
+Retention: complete minutes are rolled into ``rollup_1m`` and complete hours into ``rollup_1h``
+(latency min/avg/max/p95, pings, seconds per status); each tier is pruned after its own window.
+"""
+
+import math
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ami.core.history import STATUS_CODES, STATUS_NAMES
+
+SCHEMA_VERSION = 2
+
+# Rollup tiers: name -> bucket width in seconds; each is built from the tier before it.
+TIERS = (("1m", 60), ("1h", 3600))
+# At most this many source buckets are rolled per compaction, so a large backlog
+# (first run on an old database) is worked off over several flushes.
+_COMPACT_MAX_BUCKETS = 1440
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    ts REAL NOT NULL,
+    status INTEGER NOT NULL,
+    latency_ms REAL,
+    successful_pings INTEGER NOT NULL,
+    total_pings INTEGER NOT NULL,
+    local_ok INTEGER NOT NULL,
+    internet_ok INTEGER NOT NULL,
+    http_ok INTEGER NOT NULL,
+    speed_mbps REAL
+);
+CREATE INDEX IF NOT EXISTS idx_samples_ts ON samples(ts);
+CREATE INDEX IF NOT EXISTS idx_samples_status_ts ON samples(status, ts);
+CREATE TABLE IF NOT EXISTS host_results (
+    ts REAL NOT NULL,
+    host TEXT NOT NULL,
+    success INTEGER NOT NULL,
+    latency_ms REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_host_results_ts ON host_results(ts);
+CREATE INDEX IF NOT EXISTS idx_host_results_host_ts ON host_results(host, ts);
+CREATE TABLE IF NOT EXISTS periods (
+    id INTEGER PRIMARY KEY,
+    status INTEGER NOT NULL,
+    start_ts REAL NOT NULL,
+    end_ts REAL NOT NULL,
+    samples INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_periods_end ON periods(end_ts);
+CREATE INDEX IF NOT EXISTS idx_periods_status_end ON periods(status, end_ts);
+"""
+
+_ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollup_{name} (
+    ts REAL PRIMARY KEY,
+    samples INTEGER NOT NULL,
+    latency_n INTEGER NOT NULL,
+    latency_min REAL,
+    latency_avg REAL,
+    latency_max REAL,
+    latency_p95 REAL,
+    pings_ok INTEGER NOT NULL,
+    pings_total INTEGER NOT NULL,
+    online_s REAL NOT NULL,
+    unstable_s REAL NOT NULL,
+    offline_s REAL NOT NULL
+);
+"""
+
+_ROLLUP_COLUMNS = (
+    "ts", "samples", "latency_n", "latency_min", "latency_avg", "latency_max", "latency_p95",
+    "pings_ok", "pings_total", "online_s", "unstable_s", "offline_s",
+)
+
+_SAMPLE_COLUMNS = (
+    "ts", "status", "latency_ms", "successful_pings", "total_pings",
+    "local_ok", "internet_ok", "http_ok", "speed_mbps",
+)
+
+
+def _weighted_quantile(pairs: Iterable[Tuple[float, float]], q: float) -> Optional[float]:
+    """Nearest-rank quantile of ``(value, weight)`` pairs; exact for unit weights."""
+    items = sorted((v, w) for v, w in pairs if v is not None and w > 0)
+    if not items:
+        return None
+    target = q * sum(w for _, w in items)
+    acc = 0.0
+    for v, w in items:
+        acc += w
+        if acc >= target:
+            return v
+    return items[-1][0]
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+    # Only takes effect on a new file; freed pages are then returned after each compaction.
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class HistoryStore:
+    """
+    Durable connection history in one SQLite file.
+    Writes come from the log writer thread, reads from the API / GUI threads: each side has its
+    own connection and lock, and WAL lets readers run while a batch is being committed.
+    Queries see committed batches only; flushing stays on the writer (size/time policy, close).
+    A status run is split when two samples are more than ``max_gap_s`` apart (app not running).
+    Retention windows are in seconds; ``None`` or 0 keeps that tier forever.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        flush_interval_s: float = 5.0,
+        flush_max_rows: int = 60,
+        max_gap_s: float = 60.0,
+        raw_retention_s: Optional[float] = 2 * 86400,
+        retention_s: Optional[Dict[str, Optional[float]]] = None,
+        compact_interval_s: float = 300.0,
+    ):
+        self.path = path
+        self.flush_interval_s = float(flush_interval_s)
+        self.flush_max_rows = max(1, int(flush_max_rows))
+        self.max_gap_s = float(max_gap_s)
+        self.raw_retention_s = raw_retention_s or None
+        retention = {"1m": 30 * 86400, "1h": 730 * 86400}
+        retention.update(retention_s or {})
+        self.retention_s = {name: (v or None) for name, v in retention.items()}
+        self.compact_interval_s = float(compact_interval_s)
+        self._last_compact = 0.0  # first flush compacts whatever backlog the file has
+        self._lock = threading.RLock()
+        self._read_lock = threading.Lock()
+        self._conn = _connect(path)
+        self._conn.executescript(_SCHEMA)
+        for name, _ in TIERS:
+            self._conn.executescript(_ROLLUP_SCHEMA.format(name=name))
+        self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        self._conn.commit()
+        self._reader = _connect(path)
+        self._samples: List[tuple] = []
+        self._hosts: List[tuple] = []
+        self._last_flush = time.monotonic()
+        # Open period: [id or None, status, start_ts, end_ts, samples]
+        self._period: Optional[list] = None
+        row = self._conn.execute(
+            "SELECT id, status, start_ts, end_ts, samples FROM periods ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+        if row:
+            self._period = list(row)
+        self._period_dirty = False
+        self._closed_periods: List[tuple] = []
+
+    # —— write side ——
+
+    def add(self, status) -> None:
+        """Queue one ConnectionStatus (and its per-host ``ping_results``) for the next batch."""
+        ts = status.epoch
+        code = STATUS_CODES.get(status.status, 0)
+        with self._lock:
+            self._samples.append((
+                ts,
+                code,
+                status.avg_latency_ms,
+                status.successful_pings,
+                status.total_pings,
+                int(bool(status.local_network_ok)),
+                int(bool(status.internet_ok)),
+                int(bool(status.http_test_ok)),
+                status.speed_mbps,
+            ))
+            for r in getattr(status, "ping_results", None) or ():
+                self._hosts.append((r.epoch, r.host, int(r.success), r.latency_ms, r.error))
+            self._track_period(code, ts)
+            if (
+                len(self._samples) >= self.flush_max_rows
+                or time.monotonic() - self._last_flush >= self.flush_interval_s
+            ):
+                self.flush()
+
+    def _track_period(self, code: int, ts: float) -> None:
+        p = self._period
+        if p is not None and ts - p[3] <= self.max_gap_s:
+            if p[1] == code:
+                p[3] = ts
+                p[4] += 1
+                self._period_dirty = True
+                return
+            p[3] = ts  # the previous run lasted until this transition
+            self._period_dirty = True
+        if p is not None and self._period_dirty:
+            self._closed_periods.append(tuple(p))
+        self._period = [None, code, ts, ts, 1]
+        self._period_dirty = True
+
+    def _write_period(self, p) -> Optional[int]:
+        if p[0] is None:
+            cur = self._conn.execute(
+                "INSERT INTO periods (status, start_ts, end_ts, samples) VALUES (?, ?, ?, ?)",
+                (p[1], p[2], p[3], p[4]),
+            )
+            return cur.lastrowid
+        self._conn.execute(
+            "UPDATE periods SET end_ts = ?, samples = ? WHERE id = ?", (p[3], p[4], p[0])
+        )
+        return p[0]
+
+    def flush(self) -> None:
+        """Commit queued rows in one transaction."""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._samples and not self._period_dirty:
+                return
+            try:
+                with self._conn:
+                    placeholders = ", ".join("?" * len(_SAMPLE_COLUMNS))
+                    self._conn.executemany(
+                        f"INSERT INTO samples ({', '.join(_SAMPLE_COLUMNS)}) VALUES ({placeholders})",
+                        self._samples,
+                    )
+                    self._conn.executemany(
+                        "INSERT INTO host_results (ts, host, success, latency_ms, error) VALUES (?, ?, ?, ?, ?)",
+                        self._hosts,
+                    )
+                    for p in self._closed_periods:
+                        self._write_period(p)
+                    if self._period is not None:
+                        self._period[0] = self._write_period(self._period)
+            except Exception as e:
+                print(f"Error writing history: {e}")
+            self._samples.clear()
+            self._hosts.clear()
+            self._closed_periods.clear()
+            self._period_dirty = False
+            if time.monotonic() - self._last_compact >= self.compact_interval_s:
+                self.compact()
+
+    # —— retention ——
+
+    def compact(self, now: Optional[float] = None) -> Dict[str, int]:
+        """
+        Roll complete buckets into the 1 m / 1 h tiers, then drop rows older than each tier's
+        window. Returns the number of buckets written per tier.
+        """
+        now = time.time() if now is None else now
+        written: Dict[str, int] = {}
+        with self._lock:
+            self._last_compact = time.monotonic()
+            try:
+                with self._conn:
+                    source = None
+                    for name, width in TIERS:
+                        # One bucket of slack so late rows from the writer queue still land in raw.
+                        cutoff = math.floor(now / width) * width - width
+                        if source is None:
+                            written[name] = self._rollup_raw(name, width, cutoff)
+                        else:
+                            written[name] = self._rollup_tier(name, width, source, cutoff)
+                        source = name
+                    self._prune(now)
+                # executescript runs the pragma to completion (a single step frees one page).
+                self._conn.executescript("PRAGMA incremental_vacuum;")
+            except Exception as e:
+                print(f"Error compacting history: {e}")
+        return written
+
+    def _watermark(self, name: str, width: int, source_table: str) -> Optional[float]:
+        """Start of the first bucket of tier ``name`` that has not been rolled yet."""
+        row = self._conn.execute(f"SELECT MAX(ts) FROM rollup_{name}").fetchone()
+        if row and row[0] is not None:
+            return row[0] + width
+        row = self._conn.execute(f"SELECT MIN(ts) FROM {source_table}").fetchone()
+        if not row or row[0] is None:
+            return None
+        return math.floor(row[0] / width) * width
+
+    def _write_rollups(self, name: str, rows: Sequence[tuple]) -> int:
+        if rows:
+            placeholders = ", ".join("?" * len(_ROLLUP_COLUMNS))
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO rollup_{name} ({', '.join(_ROLLUP_COLUMNS)}) VALUES ({placeholders})",
+                rows,
+            )
+        return len(rows)
+
+    def _rollup_raw(self, name: str, width: int, cutoff: float) -> int:
+        lo = self._watermark(name, width, "samples")
+        if lo is None or lo >= cutoff:
+            return 0
+        hi = min(cutoff, lo + _COMPACT_MAX_BUCKETS * width)
+        rows = self._conn.execute(
+            "SELECT ts, status, latency_ms, successful_pings, total_pings FROM samples "
+            "WHERE ts >= ? AND ts < ? ORDER BY ts",
+            (lo, hi),
+        ).fetchall()
+        nxt = self._conn.execute(
+            "SELECT ts FROM samples WHERE ts >= ? ORDER BY ts LIMIT 1", (hi,)
+        ).fetchone()
+        buckets: Dict[float, dict] = {}
+        for i, (ts, code, lat, ok, total) in enumerate(rows):
+            next_ts = rows[i + 1][0] if i + 1 < len(rows) else (nxt[0] if nxt else None)
+            # A sample stands for the time until the next one, unless the app was not running.
+            dt = min(next_ts - ts, self.max_gap_s) if next_ts is not None else 0.0
+            b = buckets.setdefault(math.floor(ts / width) * width, {
+                "samples": 0, "lat": [], "ok": 0, "total": 0, "secs": [0.0, 0.0, 0.0],
+            })
+            b["samples"] += 1
+            if lat is not None:
+                b["lat"].append(lat)
+            b["ok"] += ok
+            b["total"] += total
+            b["secs"][code] += dt
+        out = []
+        for ts, b in sorted(buckets.items()):
+            lat = b["lat"]
+            out.append((
+                ts, b["samples"], len(lat),
+                min(lat) if lat else None,
+                sum(lat) / len(lat) if lat else None,
+                max(lat) if lat else None,
+                _weighted_quantile(((v, 1) for v in lat), 0.95),
+                b["ok"], b["total"], b["secs"][2], b["secs"][1], b["secs"][0],
+            ))
+        self._write_rollups(name, out)
+        if not out:
+            # Empty span (gap in the data): record nothing, but move past it next time.
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO rollup_{name} ({', '.join(_ROLLUP_COLUMNS)}) "
+                f"VALUES (?, 0, 0, NULL, NULL, NULL, NULL, 0, 0, 0, 0, 0)",
+                (hi - width,),
+            )
+        return len(out)
+
+    def _rollup_tier(self, name: str, width: int, source: str, cutoff: float) -> int:
+        # While the source tier is still working off a backlog, only its complete buckets count.
+        row = self._conn.execute(f"SELECT MAX(ts) FROM rollup_{source}").fetchone()
+        if not row or row[0] is None:
+            return 0
+        cutoff = min(cutoff, math.floor((row[0] + dict(TIERS)[source]) / width) * width)
+        lo = self._watermark(name, width, f"rollup_{source}")
+        if lo is None or lo >= cutoff:
+            return 0
+        hi = min(cutoff, lo + _COMPACT_MAX_BUCKETS * width)
+        rows = self._conn.execute(
+            f"SELECT {', '.join(_ROLLUP_COLUMNS)} FROM rollup_{source} "
+            "WHERE ts >= ? AND ts < ? AND samples > 0 ORDER BY ts",
+            (lo, hi),
+        ).fetchall()
+        buckets: Dict[float, List[tuple]] = {}
+        for r in rows:
+            buckets.setdefault(math.floor(r[0] / width) * width, []).append(r)
+        out = []
+        for ts, parts in sorted(buckets.items()):
+            with_lat = [p for p in parts if p[2]]
+            n_lat = sum(p[2] for p in with_lat)
+            out.append((
+                ts,
+                sum(p[1] for p in parts),
+                n_lat,
+                min(p[3] for p in with_lat) if with_lat else None,
+                sum(p[4] * p[2] for p in with_lat) / n_lat if with_lat else None,
+                max(p[5] for p in with_lat) if with_lat else None,
+                # Approximation: quantile of the per-bucket p95s, weighted by their sample counts.
+                _weighted_quantile(((p[6], p[2]) for p in with_lat), 0.95),
+                sum(p[7] for p in parts),
+                sum(p[8] for p in parts),
+                sum(p[9] for p in parts),
+                sum(p[10] for p in parts),
+                sum(p[11] for p in parts),
+            ))
+        self._write_rollups(name, out)
+        if not out:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO rollup_{name} ({', '.join(_ROLLUP_COLUMNS)}) "
+                f"VALUES (?, 0, 0, NULL, NULL, NULL, NULL, 0, 0, 0, 0, 0)",
+                (hi - width,),
+            )
+        return len(out)
+
+    def _prune(self, now: float) -> None:
+        if self.raw_retention_s:
+            edge = now - self.raw_retention_s
+            # Never drop raw rows that have not been rolled into the first tier yet.
+            first = TIERS[0][0]
+            row = self._conn.execute(f"SELECT MAX(ts) FROM rollup_{first}").fetchone()
+            rolled = (row[0] + TIERS[0][1]) if row and row[0] is not None else float("-inf")
+            edge = min(edge, rolled)
+            self._conn.execute("DELETE FROM samples WHERE ts < ?", (edge,))
+            self._conn.execute("DELETE FROM host_results WHERE ts < ?", (edge,))
+        for i, (name, width) in enumerate(TIERS):
+            keep = self.retention_s.get(name)
+            if not keep:
+                continue
+            edge = now - keep
+            if i + 1 < len(TIERS):
+                parent, pwidth = TIERS[i + 1]
+                row = self._conn.execute(f"SELECT MAX(ts) FROM rollup_{parent}").fetchone()
+                rolled = (row[0] + pwidth) if row and row[0] is not None else float("-inf")
+                edge = min(edge, rolled)
+            self._conn.execute(f"DELETE FROM rollup_{name} WHERE ts < ?", (edge,))
+        last = TIERS[-1][0]
+        if self.retention_s.get(last):
+            self._conn.execute(
+                "DELETE FROM periods WHERE end_ts < ?", (now - self.retention_s[last],)
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self.flush()
+            self._conn.close()
+        with self._read_lock:
+            self._reader.close()
+
+    # —— read side ——
+
+    def _query(self, sql: str, args: tuple = ()) -> List[tuple]:
+        with self._read_lock:
+            return self._reader.execute(sql, args).fetchall()
+
+    @staticmethod
+    def _range(start: Optional[float], end: Optional[float]) -> Tuple[float, float]:
+        return (float("-inf") if start is None else start, float("inf") if end is None else end)
+
+    def samples(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        """Checks with ``start <= ts <= end`` (epoch seconds), oldest first; ``limit`` keeps the newest."""
+        lo, hi = self._range(start, end)
+        sql = f"SELECT {', '.join(_SAMPLE_COLUMNS)} FROM samples WHERE ts BETWEEN ? AND ?"
+        args: tuple = (lo, hi)
+        if status is not None:
+            sql += " AND status = ?"
+            args += (STATUS_CODES.get(status, -1),)
+        if limit is not None:
+            sql = f"SELECT * FROM ({sql} ORDER BY ts DESC LIMIT ?) ORDER BY ts"
+            args += (int(limit),)
+        else:
+            sql += " ORDER BY ts"
+        out = []
+        for row in self._query(sql, args):
+            d = dict(zip(_SAMPLE_COLUMNS, row))
+            d["status"] = STATUS_NAMES[d["status"]]
+            for k in ("local_ok", "internet_ok", "http_ok"):
+                d[k] = bool(d[k])
+            out.append(d)
+        return out
+
+    def host_results(
+        self,
+        host: Optional[str] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        """Per-target probe results in the range, oldest first; ``limit`` keeps the newest."""
+        lo, hi = self._range(start, end)
+        sql = "SELECT ts, host, success, latency_ms, error FROM host_results WHERE ts BETWEEN ? AND ?"
+        args: tuple = (lo, hi)
+        if host is not None:
+            sql += " AND host = ?"
+            args += (host,)
+        if limit is not None:
+            sql = f"SELECT * FROM ({sql} ORDER BY ts DESC LIMIT ?) ORDER BY ts"
+            args += (int(limit),)
+        else:
+            sql += " ORDER BY ts"
+        return [
+            {"ts": ts, "host": h, "success": bool(ok), "latency_ms": lat, "error": err}
+            for ts, h, ok, lat, err in self._query(sql, args)
+        ]
+
+    def rollups(
+        self,
+        resolution: str = "1m",
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        """
+        Aggregated buckets of tier ``resolution`` (``1m`` / ``1h``) whose start is in the range,
+        oldest first; ``loss_percent`` is derived from the ping counts.
+        """
+        if resolution not in dict(TIERS):
+            raise ValueError(f"Unknown resolution {resolution!r}")
+        lo, hi = self._range(start, end)
+        sql = (
+            f"SELECT {', '.join(_ROLLUP_COLUMNS)} FROM rollup_{resolution} "
+            "WHERE ts BETWEEN ? AND ? AND samples > 0"
+        )
+        args: tuple = (lo, hi)
+        if limit is not None:
+            sql = f"SELECT * FROM ({sql} ORDER BY ts DESC LIMIT ?) ORDER BY ts"
+            args += (int(limit),)
+        else:
+            sql += " ORDER BY ts"
+        out = []
+        for row in self._query(sql, args):
+            d = dict(zip(_ROLLUP_COLUMNS, row))
+            total = d["pings_total"]
+            d["loss_percent"] = round((1 - d["pings_ok"] / total) * 100, 2) if total else None
+            out.append(d)
+        return out
+
+    def series(
+        self,
+        start: float,
+        end: float,
+        host: Optional[str] = None,
+        straddle: bool = True,
+    ) -> Dict[str, List[tuple]]:
+        """
+        Rows covering ``[start, end)`` at the finest resolution still kept, for server-side
+        bucketing: ``raw`` samples (ts, status, latency_ms, successful_pings, total_pings) where
+        they exist, ``1m`` then ``1h`` rollups (``_ROLLUP_COLUMNS``) for the older part. Tiers
+        are split on whole buckets so nothing is counted twice. A rollup bucket that straddles
+        ``start`` cannot be split: with ``straddle`` it is included with its ``ts`` moved to
+        ``start``; pass False when ``start`` is the end of a previous page (that page has it).
+        With ``host``: raw ``host_results`` (ts, success, latency_ms) only, as targets have no
+        rollups.
+        """
+        if host is not None:
+            return {"raw": self._query(
+                "SELECT ts, success, latency_ms FROM host_results "
+                "WHERE host = ? AND ts >= ? AND ts < ? ORDER BY ts",
+                (host, start, end),
+            )}
+        levels = [("raw", "samples", None)] + [(name, f"rollup_{name}", width) for name, width in TIERS]
+        out: Dict[str, List[tuple]] = {}
+        hi = end
+        for i, (name, table, width) in enumerate(levels):
+            if hi <= start:
+                break
+            first = self._query(f"SELECT MIN(ts) FROM {table}")[0][0]
+            if first is None:
+                continue
+            lo = start
+            if first > start and i + 1 < len(levels):
+                # This tier starts after ``start``: the coarser tier takes over below its
+                # first complete coarser bucket (or where the coarser tier ends).
+                coarser, coarser_width = levels[i + 1][1], levels[i + 1][2]
+                covered = self._query(f"SELECT MAX(ts) FROM {coarser}")[0][0]
+                if covered is not None:
+                    lo = max(start, min(math.ceil(first / coarser_width) * coarser_width, covered + coarser_width))
+            if lo >= hi:
+                continue
+            columns = (
+                "ts, status, latency_ms, successful_pings, total_pings"
+                if name == "raw" else ", ".join(_ROLLUP_COLUMNS)
+            )
+            # Rollup rows are stamped with their bucket start; the one holding ``start`` is older.
+            from_ts = lo - width if width and straddle and lo == start else lo
+            rows = self._query(
+                f"SELECT {columns} FROM {table} WHERE ts > ? AND ts < ? ORDER BY ts"
+                if from_ts < lo else
+                f"SELECT {columns} FROM {table} WHERE ts >= ? AND ts < ? ORDER BY ts",
+                (from_ts, hi),
+            )
+            if rows and rows[0][0] < start:
+                rows[0] = (start,) + tuple(rows[0][1:])
+            out[name] = rows
+            hi = lo
+        return out
+
+    def periods(
+        self,
+        status: Optional[str] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> List[Dict]:
+        """Runs of equal status overlapping ``[start, end]``, oldest first (e.g. offline periods)."""
+        lo, hi = self._range(start, end)
+        sql = "SELECT status, start_ts, end_ts, samples FROM periods WHERE end_ts >= ? AND start_ts <= ?"
+        args: tuple = (lo, hi)
+        if status is not None:
+            sql += " AND status = ?"
+            args += (STATUS_CODES.get(status, -1),)
+        sql += " ORDER BY start_ts"
+        return [
+            {
+                "status": STATUS_NAMES[code],
+                "start": s,
+                "end": e,
+                "duration_s": round(e - s, 3),
+                "samples": n,
+            }
+            for code, s, e, n in self._query(sql, args)
+        ]
+
+    def summary(self, start: Optional[float] = None, end: Optional[float] = None) -> Dict:
+        """Seconds spent in each status within the range (periods clipped to it), outages, availability."""
+        lo, hi = self._range(start, end)
+        seconds = {name: 0.0 for name in STATUS_NAMES}
+        outages = 0
+        for p in self.periods(start=start, end=end):
+            seconds[p["status"]] += max(0.0, min(p["end"], hi) - max(p["start"], lo))
+            if p["status"] == "offline":
+                outages += 1
+        total = sum(seconds.values())
+        up = seconds["online"] + seconds["unstable"]
+        return {
+            "seconds": {k: round(v, 1) for k, v in seconds.items()},
+            "outages": outages,
+            "availability_percent": round(up / total * 100, 3) if total > 0 else None,
+        }
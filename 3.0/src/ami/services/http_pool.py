@@ -0,0 +1,100 @@
+"""
+AMI 3.0 - Shared keep-alive HTTP connection pool for the monitor.
+One requests.Session with per-endpoint pool sizes; every request reports whether it
+reused a warm connection or paid for a cold DNS/TCP/TLS handshake.
+"""
+
+import threading
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+_DEFAULT_POOL_SIZE = 4
+_MAX_HOST_POOLS = 16
+
+# connect() runs in the thread that issued the request, so a thread-local counter tells
+# that request apart from concurrent ones on the same pool.
+_handshakes = threading.local()
+
+
+def _count_handshake() -> None:
+    _handshakes.count = getattr(_handshakes, "count", 0) + 1
+
+
+class _CountingHTTPConnection(HTTPConnection):
+    def connect(self) -> None:
+        _count_handshake()
+        super().connect()
+
+
+class _CountingHTTPSConnection(HTTPSConnection):
+    def connect(self) -> None:
+        _count_handshake()
+        super().connect()
+
+
+class _CountingHTTPPool(HTTPConnectionPool):
+    ConnectionCls = _CountingHTTPConnection
+
+
+class _CountingHTTPSPool(HTTPSConnectionPool):
+    ConnectionCls = _CountingHTTPSConnection
+
+
+class _CountingAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPPool,
+            "https": _CountingHTTPSPool,
+        }
+
+
+def _endpoint(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class HttpPool:
+    """Keep-alive session shared by the HTTP probe, ISP lookup and speed test."""
+
+    def __init__(
+        self,
+        pool_sizes: Optional[Dict[str, int]] = None,
+        default_pool_size: int = _DEFAULT_POOL_SIZE,
+    ):
+        self.session = requests.Session()
+        default = _CountingAdapter(pool_connections=_MAX_HOST_POOLS, pool_maxsize=default_pool_size)
+        self.session.mount("http://", default)
+        self.session.mount("https://", default)
+        # requests picks the longest matching prefix, so per-endpoint adapters win.
+        for prefix, size in (pool_sizes or {}).items():
+            if prefix and int(size) > 0:
+                self.session.mount(prefix, _CountingAdapter(pool_connections=1, pool_maxsize=int(size)))
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def request(self, method: str, url: str, **kwargs) -> Tuple[requests.Response, bool]:
+        """Send a request; returns (response, reused) — reused=False means a new handshake."""
+        _handshakes.count = 0
+        response = self.session.request(method, url, **kwargs)
+        reused = getattr(_handshakes, "count", 0) == 0
+        with self._lock:
+            counters = self._stats.setdefault(_endpoint(url), {"warm": 0, "cold": 0})
+            counters["warm" if reused else "cold"] += 1
+        return response, reused
+
+    def get(self, url: str, **kwargs) -> Tuple[requests.Response, bool]:
+        return self.request("GET", url, **kwargs)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Warm/cold request counts per endpoint (scheme://host[:port])."""
+        with self._lock:
+            return {ep: dict(c) for ep, c in self._stats.items()}
+
+    def close(self) -> None:
+        self.session.close()
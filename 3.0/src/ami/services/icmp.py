@@ -0,0 +1,126 @@
+"""
+AMI 3.0 - In-process ICMP echo over one unprivileged datagram socket.
+Linux (net.ipv4.ping_group_range) and macOS allow SOCK_DGRAM/IPPROTO_ICMP without root.
+All hosts of a cycle share the socket; replies are matched by identifier/sequence.
+No fork+exec of /bin/ping, so the measured RTT carries no process-spawn jitter.
+"""
+
+import asyncio
+import itertools
+import os
+import socket
+import struct
+import sys
+import time
+from typing import Dict, Optional, Tuple
+
+_ECHO_REQUEST = 8
+_ECHO_REPLY = 0
+_HEADER = struct.Struct("!BBHHH")
+_PAYLOAD = b"AMI-ICMP-ECHO-PROBE-0123456789ab"  # 32 bytes, like a short ping(8) payload
+
+
+def _checksum(data: bytes) -> int:
+    if len(data) % 2:
+        data += b"\x00"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def _echo_packet(ident: int, seq: int) -> bytes:
+    header = _HEADER.pack(_ECHO_REQUEST, 0, 0, ident, seq)
+    csum = _checksum(header + _PAYLOAD)
+    return _HEADER.pack(_ECHO_REQUEST, 0, csum, ident, seq) + _PAYLOAD
+
+
+class IcmpEchoSocket:
+    """One non-blocking ICMP datagram socket bound to an asyncio loop."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, sock: socket.socket):
+        self._loop = loop
+        self._sock = sock
+        # Linux rewrites the identifier with the socket's own port and only delivers
+        # replies for it; elsewhere we set and check it ourselves.
+        self._kernel_ident = sys.platform.startswith("linux")
+        self._ident = os.getpid() & 0xFFFF
+        self._seq = itertools.count(1)
+        self._pending: Dict[int, Tuple[str, asyncio.Future]] = {}
+        loop.add_reader(sock.fileno(), self._on_readable)
+
+    @classmethod
+    def open(cls, loop: asyncio.AbstractEventLoop) -> Optional["IcmpEchoSocket"]:
+        """Socket on the given loop, or None if the OS refuses unprivileged ICMP."""
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+        except (OSError, AttributeError):
+            return None
+        sock.setblocking(False)
+        try:
+            return cls(loop, sock)
+        except (OSError, NotImplementedError):
+            sock.close()
+            return None
+
+    def close(self) -> None:
+        try:
+            self._loop.remove_reader(self._sock.fileno())
+        except (OSError, ValueError):
+            pass
+        self._sock.close()
+        for _, fut in self._pending.values():
+            if not fut.done():
+                fut.cancel()
+        self._pending.clear()
+
+    def _next_seq(self) -> int:
+        while True:
+            seq = next(self._seq) & 0xFFFF
+            if seq and seq not in self._pending:
+                return seq
+
+    async def echo(self, ip: str, timeout: float) -> Optional[float]:
+        """RTT in ms for one echo to an IPv4 address, or None on timeout/send error."""
+        seq = self._next_seq()
+        fut = self._loop.create_future()
+        self._pending[seq] = (ip, fut)
+        try:
+            sent_at = time.perf_counter()
+            try:
+                self._sock.sendto(_echo_packet(self._ident, seq), (ip, 0))
+            except OSError:
+                return None
+            try:
+                received_at = await asyncio.wait_for(fut, timeout)
+            except asyncio.TimeoutError:
+                return None
+            return (received_at - sent_at) * 1000
+        finally:
+            self._pending.pop(seq, None)
+
+    def _on_readable(self) -> None:
+        while True:
+            try:
+                data, addr = self._sock.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+            received_at = time.perf_counter()
+            # macOS delivers the IPv4 header too; Linux only the ICMP message.
+            if data and data[0] >> 4 == 4:
+                data = data[(data[0] & 0x0F) * 4:]
+            if len(data) < _HEADER.size:
+                continue
+            icmp_type, _, _, ident, seq = _HEADER.unpack_from(data)
+            if icmp_type != _ECHO_REPLY:
+                continue
+            if not self._kernel_ident and ident != self._ident:
+                continue
+            entry = self._pending.get(seq)
+            if entry is None:
+                continue
+            ip, fut = entry
+            if addr[0] == ip and not fut.done():
+                fut.set_result(received_at)
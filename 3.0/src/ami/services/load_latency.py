@@ -0,0 +1,138 @@
+"""
+AMI 3.0 - Latency under load (bufferbloat) during speed tests.
+While a speed test saturates the link, every ping host is probed every ``interval_s`` on the
+probe engine's loop. Probes use the in-process ICMP socket, or a TCP connect where it cannot be
+opened; never the system ping, whose process-spawn jitter would land in the measurement. Each RTT
+is tagged with the phase it was sent in: ``idle`` (short baseline before the download),
+``download`` or ``upload``. Probes do not wait for each other, so a queue that delays replies
+by seconds does not lower the sampling rate. The grade uses the common bufferbloat scale on
+the increase of the loaded median over the idle median (worst of download / upload).
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ami.core.models import LoadedLatency
+from ami.services.probe_engine import ProbeEngine
+
+PHASES = ("idle", "download", "upload")
+# (increase below ms, grade); anything higher is "F".
+GRADES = ((5, "A+"), (30, "A"), (60, "B"), (200, "C"), (400, "D"))
+_MAX_IN_FLIGHT = 8  # per host; a host that stops answering cannot pile up tasks
+
+
+def grade(increase_ms: float) -> str:
+    for limit, name in GRADES:
+        if increase_ms < limit:
+            return name
+    return "F"
+
+
+class LoadLatencyProbe:
+    """
+    ``start()`` samples the idle baseline and returns when it is complete; ``set_phase()``
+    follows the speed test (pass it as ``measure_speed(on_phase=...)``); ``stop()`` ends
+    sampling and returns the summary. Thread-safe: phases come from the speed test thread,
+    RTTs from the probe loop.
+    """
+
+    def __init__(
+        self,
+        engine: ProbeEngine,
+        hosts: Sequence[str],
+        interval_s: float = 0.1,
+        timeout_s: float = 1.0,
+    ):
+        self.hosts = list(hosts)
+        self.interval_s = max(0.02, float(interval_s))
+        self.timeout_s = max(0.1, float(timeout_s))
+        self._engine = engine
+        self._lock = threading.Lock()
+        self._phase: Optional[str] = None
+        self._running = False
+        self._future = None
+        self._rtts: Dict[str, List[float]] = {p: [] for p in PHASES}
+        self._lost: Dict[str, int] = dict.fromkeys(PHASES, 0)
+        self._method: Optional[str] = None
+
+    def start(self, idle_s: float = 1.0) -> None:
+        if self._future is not None or not self.hosts:
+            return
+        self._phase = "idle"
+        self._running = True
+        self._future = self._engine.submit(self._run())
+        time.sleep(max(0.0, idle_s))
+
+    def set_phase(self, phase: Optional[str]) -> None:
+        """``"download"`` / ``"upload"`` while that window runs; None pauses sampling."""
+        self._phase = phase if phase in PHASES else None
+
+    def stop(self) -> Optional[LoadedLatency]:
+        """Stop sampling (in-flight probes get up to ``timeout_s``); None if nothing was sent."""
+        self._running = False
+        self._phase = None
+        if self._future is not None:
+            try:
+                self._future.result(self.timeout_s + self.interval_s + 2)
+            except Exception as e:
+                print(f"Error stopping latency probe: {e}")
+        return self.summary()
+
+    def summary(self) -> Optional[LoadedLatency]:
+        with self._lock:
+            rtts = {p: np.array(v) for p, v in self._rtts.items()}
+            lost = dict(self._lost)
+        if not any(len(v) or lost[p] for p, v in rtts.items()):
+            return None
+
+        def pct(phase: str, q: float) -> Optional[float]:
+            v = rtts[phase]
+            return round(float(np.percentile(v, q)), 2) if len(v) else None
+
+        out = LoadedLatency(
+            idle_ms=pct("idle", 50),
+            download_ms=pct("download", 50),
+            download_p95_ms=pct("download", 95),
+            upload_ms=pct("upload", 50),
+            upload_p95_ms=pct("upload", 95),
+            samples={p: len(v) for p, v in rtts.items()},
+            lost=lost,
+            method=self._method,
+        )
+        loaded = out.loaded_ms
+        if out.idle_ms is not None and loaded is not None:
+            out.increase_ms = round(max(0.0, loaded - out.idle_ms), 2)
+            out.grade = grade(out.increase_ms)
+        return out
+
+    async def _probe(self, host: str, phase: str) -> None:
+        result, self._method = await self._engine.rtt(host, self.timeout_s)
+        with self._lock:
+            if result.success and result.latency_ms is not None:
+                self._rtts[phase].append(result.latency_ms)
+            else:
+                self._lost[phase] += 1
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        in_flight: set = set()
+        limit = _MAX_IN_FLIGHT * len(self.hosts)
+        next_t = loop.time()
+        while self._running:
+            phase = self._phase
+            if phase is not None and len(in_flight) < limit:
+                for host in self.hosts:
+                    task = loop.create_task(self._probe(host, phase))
+                    in_flight.add(task)
+                    task.add_done_callback(in_flight.discard)
+            next_t = max(next_t + self.interval_s, loop.time())
+            await asyncio.sleep(next_t - loop.time())
+        if in_flight:
+            # engine.rtt() honours its own timeout; this only bounds a stuck connect.
+            await asyncio.wait(set(in_flight), timeout=self.timeout_s + 0.5)
+            for task in in_flight:
+                task.cancel()
@@ -0,0 +1,211 @@
+"""
+AMI 3.0 - Compressed archives of rotated CSV logs.
+Rotation renames the live file to ``<log>.<YYYYmmdd_HHMMSS>.bak``; a background thread then
+streams it into ``.bak.gz`` (or ``.bak.zst`` when ``zstandard`` is installed) and trims the
+archive set to a count and a byte budget. ``iter_log_records`` reads every archive and the live
+file in time order, decompressing on the fly.
+"""
+
+import csv
+import gzip
+import io
+import os
+import shutil
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+COMPRESSIONS = ("gzip", "zstd", "none")
+_SUFFIXES = {"gzip": ".gz", "zstd": ".zst", "none": ""}
+_COPY_CHUNK = 1024 * 1024
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def resolve_compression(name: str) -> str:
+    """``name`` if usable here; ``zstd`` falls back to ``gzip`` without the zstandard package."""
+    if name not in COMPRESSIONS:
+        return "gzip"
+    if name == "zstd" and _zstd() is None:
+        return "gzip"
+    return name
+
+
+def archive_path(log_file: str, stamp: str) -> str:
+    """
+    Fresh ``<log>.<stamp>.bak`` name. Later rotations within the same second get ``-N`` past
+    any existing one, so names keep sorting in rotation order even after pruning.
+    """
+    live = Path(log_file)
+    used = [p.name for p in live.parent.glob(f"{live.name}.{stamp}*.bak*")]
+    if not used:
+        return f"{log_file}.{stamp}.bak"
+    counters = []
+    for name in used:
+        _, _, n = name[len(live.name) + 1 : name.index(".bak")].partition("-")
+        counters.append(int(n) if n.isdigit() else 0)
+    return f"{log_file}.{stamp}-{max(counters) + 1}.bak"
+
+
+def list_archives(log_file: str) -> List[Path]:
+    """Rotated archives of ``log_file``, oldest first (an uncompressed ``.bak`` wins over its copy)."""
+    live = Path(log_file)
+    by_stem: Dict[str, Path] = {}
+    for p in live.parent.glob(live.name + ".*.bak*"):
+        if p.name.endswith(".tmp"):
+            continue
+        stem = p.name[: p.name.index(".bak") + 4]
+        if stem not in by_stem or p.name == stem:
+            by_stem[stem] = p
+
+    def order(stem: str):
+        stamp, _, n = stem[len(live.name) + 1 : -4].partition("-")
+        return stamp, int(n) if n.isdigit() else 0
+
+    return [by_stem[k] for k in sorted(by_stem, key=order)]
+
+
+def _archive_forms(path: Path) -> List[Path]:
+    """Every file of one archive: the ``.bak``, its compressed copies and a leftover ``.tmp``."""
+    stem = path.name[: path.name.index(".bak") + 4]
+    names = [stem + s for s in ("", ".gz", ".zst")]
+    names += [n + ".tmp" for n in names[1:]]
+    return [p for p in (path.parent / n for n in names) if p.exists()]
+
+
+def _open_text(path: Path):
+    name = path.name
+    if name.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    if name.endswith(".zst"):
+        zstd = _zstd()
+        if zstd is None:
+            raise RuntimeError(f"zstandard is required to read {name}")
+        reader = zstd.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+        return io.TextIOWrapper(reader, encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def iter_log_records(log_file: str, include_live: bool = True) -> Iterator[dict]:
+    """
+    Every CSV record of the rotated archives and then the live file, oldest first.
+    Streams one file at a time; nothing is decompressed to disk.
+    """
+    paths = list_archives(log_file)
+    if include_live and os.path.exists(log_file):
+        paths.append(Path(log_file))
+    for path in paths:
+        try:
+            f = _open_text(path)
+        except FileNotFoundError:
+            continue  # compressed and removed since it was listed
+        with f:
+            yield from csv.DictReader(f)
+
+
+class LogArchiver:
+    """
+    Background compression and pruning of rotated logs.
+    ``max_archives`` / ``max_bytes`` of 0 disable that limit; the oldest archives go first, with
+    every form of each (a ``.bak`` and its compressed copy count and go together).
+    """
+
+    def __init__(
+        self,
+        log_file: str,
+        compression: str = "gzip",
+        max_archives: int = 10,
+        max_bytes: int = 50 * 1024 * 1024,
+        name: str = "ami-log-archiver",
+    ):
+        self.log_file = log_file
+        self.compression = resolve_compression(compression)
+        self.max_archives = max(0, int(max_archives))
+        self.max_bytes = max(0, int(max_bytes))
+        self._queue: deque = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        # Left uncompressed by a previous run that exited mid-way.
+        for p in list_archives(log_file):
+            if p.name.endswith(".bak"):
+                self.submit(str(p))
+        if not self._queue:
+            self.submit(None)  # apply the limits once at startup
+
+    def submit(self, path: Optional[str]) -> None:
+        """Queue a freshly rotated ``.bak`` for compression (``None``: only enforce limits)."""
+        with self._cond:
+            self._queue.append(path)
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue or self._closed)
+                if not self._queue:
+                    return
+                path = self._queue.popleft()
+            try:
+                if path and self.compression != "none":
+                    self._compress(Path(path))
+                self._prune()
+            except Exception as e:
+                print(f"Error archiving log: {e}")
+
+    def _compress(self, src: Path) -> None:
+        if not src.exists():
+            return
+        dst = Path(str(src) + _SUFFIXES[self.compression])
+        tmp = Path(str(dst) + ".tmp")
+        with open(src, "rb") as fin:
+            if self.compression == "zstd":
+                with open(tmp, "wb") as fout:
+                    _zstd().ZstdCompressor(level=3).copy_stream(fin, fout, read_size=_COPY_CHUNK)
+            else:
+                with gzip.open(tmp, "wb", compresslevel=6) as fout:
+                    shutil.copyfileobj(fin, fout, _COPY_CHUNK)
+        os.replace(tmp, dst)
+        os.remove(src)
+
+    def _prune(self) -> None:
+        if not (self.max_archives or self.max_bytes):
+            return
+        archives = [_archive_forms(p) for p in list_archives(self.log_file)]
+        sizes = []
+        for forms in archives:
+            size = 0
+            for p in forms:
+                try:
+                    size += p.stat().st_size
+                except FileNotFoundError:
+                    pass
+            sizes.append(size)
+        total = sum(sizes)
+        i = 0
+        while i < len(archives) and (
+            (self.max_archives and len(archives) - i > self.max_archives)
+            or (self.max_bytes and total > self.max_bytes)
+        ):
+            for p in archives[i]:
+                try:
+                    p.unlink()
+                except FileNotFoundError:
+                    pass
+            total -= sizes[i]
+            i += 1
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Compress what is queued, then stop the thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
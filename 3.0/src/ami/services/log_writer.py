@@ -0,0 +1,151 @@
+"""
+AMI 3.0 - Background writer thread for event logging.
+The GUI thread only enqueues records; a dedicated thread hands them to the (possibly slow)
+sink, e.g. EventLogger.log_status. The queue is bounded with a configurable overflow policy.
+``call(fn)`` queues work for the writer thread itself (e.g. closing a replaced logger once the
+record it may be writing is done), so the GUI thread never waits for it.
+"""
+
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+POLICIES = ("drop_oldest", "block", "coalesce")
+
+
+class _Call:
+    """Queued ``call()``; runs in order with the records and is never dropped or coalesced."""
+
+    __slots__ = ("fn",)
+
+    def __init__(self, fn: Callable[[], None]):
+        self.fn = fn
+
+
+class AsyncLogWriter:
+    """
+    Bounded queue + writer thread.
+    Overflow policies: ``drop_oldest`` discards the oldest queued record, ``block`` waits up to
+    ``block_timeout_s`` for room (then drops the new record), ``coalesce`` replaces the newest
+    queued record with the incoming one (latest status wins).
+    """
+
+    def __init__(
+        self,
+        sink: Callable[[Any], None],
+        max_queue: int = 1000,
+        policy: str = "drop_oldest",
+        block_timeout_s: float = 1.0,
+        name: str = "ami-log-writer",
+    ):
+        self._sink = sink
+        self.max_queue = max(1, int(max_queue))
+        self.policy = policy if policy in POLICIES else "drop_oldest"
+        self.block_timeout_s = block_timeout_s
+        self._queue: deque = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._exited = False  # set by the writer thread, under the lock, as it stops
+        self._busy = False
+        self._counters = {
+            "queued": 0,
+            "written": 0,
+            "dropped": 0,
+            "coalesced": 0,
+            "errors": 0,
+            "max_depth": 0,
+        }
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, record: Any) -> bool:
+        """Enqueue ``record``; False if it was dropped (queue full or writer closed)."""
+        with self._cond:
+            if self._closed:
+                self._counters["dropped"] += 1
+                return False
+            if len(self._queue) >= self.max_queue:
+                if self.policy == "coalesce" and not isinstance(self._queue[-1], _Call):
+                    self._queue[-1] = record
+                    self._counters["coalesced"] += 1
+                    return True
+                if self.policy == "block":
+                    room = self._cond.wait_for(
+                        lambda: len(self._queue) < self.max_queue or self._closed,
+                        self.block_timeout_s,
+                    )
+                    if not room or self._closed:
+                        self._counters["dropped"] += 1
+                        return False
+                elif self.policy == "drop_oldest":
+                    oldest = next((i for i, r in enumerate(self._queue) if not isinstance(r, _Call)), None)
+                    if oldest is not None:
+                        del self._queue[oldest]
+                        self._counters["dropped"] += 1
+            self._queue.append(record)
+            self._counters["queued"] += 1
+            if len(self._queue) > self._counters["max_depth"]:
+                self._counters["max_depth"] = len(self._queue)
+            self._cond.notify_all()
+            return True
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+                self._cond.wait_for(lambda: self._queue or self._closed)
+                if not self._queue and self._closed:
+                    self._exited = True
+                    return
+                batch = list(self._queue)
+                self._queue.clear()
+                self._busy = True
+                self._cond.notify_all()
+            for record in batch:
+                if isinstance(record, _Call):
+                    try:
+                        record.fn()
+                    except Exception as e:
+                        print(f"Error in log writer call: {e}")
+                    continue
+                try:
+                    self._sink(record)
+                    written = True
+                except Exception as e:
+                    written = False
+                    print(f"Error writing log record: {e}")
+                with self._cond:
+                    self._counters["written" if written else "errors"] += 1
+
+    def call(self, fn: Callable[[], None]) -> None:
+        """
+        Run ``fn()`` on the writer thread after every record queued before it (outside the
+        queue bound and overflow policy). Runs here at once if the writer thread has stopped.
+        """
+        with self._cond:
+            if not self._exited:
+                self._queue.append(_Call(fn))
+                self._cond.notify_all()
+                return
+        fn()
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued record has been handed to the sink."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._queue and not self._busy, timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write what is queued, then stop the thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            out: Dict[str, Any] = dict(self._counters)
+            out["depth"] = len(self._queue)
+        out["capacity"] = self.max_queue
+        out["policy"] = self.policy
+        return out
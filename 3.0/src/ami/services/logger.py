@@ -1,56 +1,174 @@
 """
 AMI 3.0 - Event logging to CSV with rotation.
-Log file in user data dir.
+Log file in user data dir. In buffered mode (default) the file stays open, rows are batched
+in memory and written on a size/time policy and at exit; rotation uses a tracked byte count.
+Rotated files are compressed and trimmed in the background (LogArchiver).
+``logging.format`` = ``binary`` writes fixed-width records (ami.services.binlog) instead of CSV.
+With ``logging.backend`` = ``sqlite`` / ``both`` statuses also go to a HistoryStore.
 """
 
+import atexit
 import csv
 import io
 import os
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
+from typing import List, Optional
 
 from ami.core.paths import get_user_data_dir
+from ami.services.binlog import BinaryLogWriter, read_records, record_rows
+from ami.services.history_store import HistoryStore
+from ami.services.log_archive import LogArchiver, archive_path
+
+_TAIL_BLOCK = 64 * 1024
+
+
+def read_tail_rows(path: str, count: int, block_size: int = _TAIL_BLOCK) -> List[dict]:
+    """
+    Last ``count`` CSV records of ``path`` as dicts, keyed by the header row.
+    Reads fixed-size blocks backwards from EOF until enough line breaks are seen, so the
+    cost depends on ``count``, not on the file size (rows never contain embedded newlines).
+    """
+    if count <= 0:
+        return []
+    with open(path, "rb") as f:
+        header = f.readline()
+        data_start = f.tell()
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        chunks: List[bytes] = []
+        newlines = 0
+        # count + 1 line breaks guarantee the first kept line is complete.
+        while pos > data_start and newlines <= count:
+            step = min(block_size, pos - data_start)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step)
+            chunks.append(chunk)
+            newlines += chunk.count(b"\n")
+    tail = b"".join(reversed(chunks))
+    lines = tail.splitlines()
+    if pos > data_start and lines:
+        lines = lines[1:]  # partial line at the block boundary
+    lines = [ln for ln in lines if ln.strip()][-count:]
+    text = b"\n".join([header.rstrip(b"\r\n")] + lines).decode("utf-8", errors="replace")
+    return list(csv.DictReader(io.StringIO(text)))
+
+
+BACKENDS = ("csv", "sqlite", "both")
+FORMATS = ("csv", "binary")
 
 
 class EventLogger:
-    """CSV event logger with size-based rotation."""
+    """Event logger (CSV or binary records) with size-based rotation and an optional SQLite store."""
 
     def __init__(self, config: dict):
         self.enabled = config["logging"]["enabled"]
+        backend = config["logging"].get("backend", "csv")
+        self.backend = backend if backend in BACKENDS else "csv"
+        fmt = config["logging"].get("format", "csv")
+        self.format = fmt if fmt in FORMATS else "csv"
+        file_enabled = self.backend in ("csv", "both")
+        self.csv_enabled = file_enabled and self.format == "csv"
         log_filename = config["logging"]["log_file"]
         self.log_file = str(get_user_data_dir() / log_filename)
         self.max_size_mb = config["logging"].get("max_log_size_mb", 1)
         self.max_size_bytes = int(self.max_size_mb * 1024 * 1024)
+        self.buffered = config["logging"].get("buffered", True)
+        self.flush_interval_s = float(config["logging"].get("flush_interval_s", 5))
+        self.flush_max_rows = max(1, int(config["logging"].get("flush_max_rows", 60)))
+        # Buffered-mode state
+        self._lock = threading.RLock()
+        self._fh = None
+        self._size = 0
+        self._pending: List[str] = []
+        self._pending_bytes = 0
+        self._last_flush = time.monotonic()
+        self._row_buf = io.StringIO()
+        self._row_writer = csv.writer(self._row_buf, lineterminator="\r\n")
         if self.enabled:
             Path(self.log_file).parent.mkdir(parents=True, exist_ok=True)
-        if self.enabled and not os.path.exists(self.log_file):
+        if self.enabled and self.csv_enabled and not os.path.exists(self.log_file):
             self._create_log_file()
+        self._archiver: Optional[LogArchiver] = None
+        self.binlog: Optional[BinaryLogWriter] = None
+        if self.enabled and file_enabled:
+            log_cfg = config["logging"]
+            binary = self.format == "binary"
+            archived = self.log_file
+            if binary:
+                archived = str(get_user_data_dir() / log_cfg.get("binary_file", "ami_log.amilog"))
+            self._archiver = LogArchiver(
+                archived,
+                # Binary archives stay uncompressed so they remain memory-mappable.
+                compression="none" if binary else log_cfg.get("compression", "gzip"),
+                max_archives=log_cfg.get("max_archives", 10),
+                max_bytes=int(log_cfg.get("max_archive_mb", 50) * 1024 * 1024),
+            )
+            if binary:
+                self.binlog = BinaryLogWriter(
+                    archived,
+                    flush_interval_s=self.flush_interval_s if self.buffered else 0,
+                    flush_max_rows=self.flush_max_rows if self.buffered else 1,
+                    max_bytes=self.max_size_bytes,
+                    on_rotate=self._archive_file,
+                )
+        self.store: Optional[HistoryStore] = None
+        if self.enabled and self.backend != "csv":
+            log_cfg = config["logging"]
+            db_file = log_cfg.get("sqlite_file", "ami_history.db")
+            try:
+                self.store = HistoryStore(
+                    str(get_user_data_dir() / db_file),
+                    flush_interval_s=self.flush_interval_s if self.buffered else 0,
+                    flush_max_rows=self.flush_max_rows if self.buffered else 1,
+                    raw_retention_s=log_cfg.get("retention_raw_hours", 48) * 3600,
+                    retention_s={
+                        "1m": log_cfg.get("retention_1m_days", 30) * 86400,
+                        "1h": log_cfg.get("retention_1h_days", 730) * 86400,
+                    },
+                )
+            except Exception as e:
+                print(f"Error opening history store: {e}")
+        if self.enabled:
+            atexit.register(self.close)
+
+    def _header(self) -> list:
+        return [
+            "Timestamp",
+            "Status",
+            "Avg Latency (ms)",
+            "Successful Pings",
+            "Total Pings",
+            "Local Network",
+            "Internet OK",
+            "HTTP Test OK",
+        ]
 
     def _create_log_file(self) -> None:
         with open(self.log_file, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(
-                [
-                    "Timestamp",
-                    "Status",
-                    "Avg Latency (ms)",
-                    "Successful Pings",
-                    "Total Pings",
-                    "Local Network",
-                    "Internet OK",
-                    "HTTP Test OK",
-                ]
-            )
+            csv.writer(f).writerow(self._header())
 
     def _check_log_size(self, next_bytes: int = 0) -> None:
         if not os.path.exists(self.log_file):
             return
         size = os.path.getsize(self.log_file)
         if size + max(0, next_bytes) > self.max_size_bytes:
-            ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-            os.rename(self.log_file, f"{self.log_file}.{ts}.bak")
+            self._archive_live_file()
             self._create_log_file()
 
+    def _archive_live_file(self) -> None:
+        self._archive_file(self.log_file)
+
+    def _archive_file(self, live: str) -> None:
+        """Move a live log aside and hand it to the archiver for compression."""
+        path = archive_path(live, datetime.now().strftime("%Y%m%d_%H%M%S"))
+        os.rename(live, path)
+        if self._archiver is not None:
+            self._archiver.submit(path)
+
     def _estimate_row_bytes(self, row: list) -> int:
         try:
             buf = io.StringIO()
@@ -60,33 +178,157 @@ class EventLogger:
         except Exception:
             return 256
 
+    def _format_row(self, row: list) -> str:
+        self._row_buf.seek(0)
+        self._row_buf.truncate()
+        self._row_writer.writerow(row)
+        return self._row_buf.getvalue()
+
+    def _open(self) -> None:
+        """Open the append handle; the only stat is here, afterwards the size is tracked."""
+        if not os.path.exists(self.log_file):
+            self._create_log_file()
+        self._fh = open(self.log_file, "a", newline="", encoding="utf-8")
+        self._size = os.fstat(self._fh.fileno()).st_size
+
+    def _rotate(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        self._archive_live_file()
+        self._create_log_file()
+        self._open()
+
+    def flush(self) -> None:
+        """Write batched rows (buffered mode); rotates first if they would overflow the file."""
+        with self._lock:
+            if not self._pending:
+                self._last_flush = time.monotonic()
+                return
+            try:
+                if self._fh is None:
+                    self._open()
+                if self._size + self._pending_bytes > self.max_size_bytes:
+                    self._rotate()
+                self._fh.write("".join(self._pending))
+                self._fh.flush()
+                self._size += self._pending_bytes
+            except Exception as e:
+                print(f"Error flushing log: {e}")
+                if self._fh is not None:
+                    try:
+                        self._fh.close()
+                    except Exception:
+                        pass
+                    self._fh = None
+            self._pending.clear()
+            self._pending_bytes = 0
+            self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        """
+        Flush pending rows, close the handle and history store and finish queued archive
+        compression (also registered with atexit).
+        """
+        with self._lock:
+            self.flush()
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+            if self.binlog is not None:
+                self.binlog.close()
+                self.binlog = None
+            if self._archiver is not None:
+                self._archiver.close()
+                self._archiver = None
+            if self.store is not None:
+                try:
+                    self.store.close()
+                except Exception as e:
+                    print(f"Error closing history store: {e}")
+                self.store = None
+
+    def _status_row(self, status) -> list:
+        return [
+            status.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+            status.status,
+            f"{status.avg_latency_ms:.2f}" if status.avg_latency_ms else "N/A",
+            status.successful_pings,
+            status.total_pings,
+            "Yes" if status.local_network_ok else "No",
+            "Yes" if status.internet_ok else "No",
+            "Yes" if status.http_test_ok else "No",
+        ]
+
     def log_status(self, status) -> None:
         if not self.enabled:
             return
         try:
-            row = [
-                status.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
-                status.status,
-                f"{status.avg_latency_ms:.2f}" if status.avg_latency_ms else "N/A",
-                status.successful_pings,
-                status.total_pings,
-                "Yes" if status.local_network_ok else "No",
-                "Yes" if status.internet_ok else "No",
-                "Yes" if status.http_test_ok else "No",
-            ]
+            if self.store is not None:
+                self.store.add(status)
+            if self.binlog is not None:
+                self.binlog.add(status)
+            if not self.csv_enabled:
+                return
+            row = self._status_row(status)
+            if self.buffered:
+                with self._lock:
+                    line = self._format_row(row)
+                    self._pending.append(line)
+                    self._pending_bytes += len(line.encode("utf-8", errors="ignore"))
+                    if (
+                        len(self._pending) >= self.flush_max_rows
+                        or time.monotonic() - self._last_flush >= self.flush_interval_s
+                    ):
+                        self.flush()
+                return
             self._check_log_size(self._estimate_row_bytes(row))
             with open(self.log_file, "a", newline="", encoding="utf-8") as f:
                 csv.writer(f).writerow(row)
         except Exception as e:
             print(f"Error logging status: {e}")
 
+    def _sample_row(self, sample: dict) -> dict:
+        """History-store sample in the CSV row shape (same keys as the header)."""
+        lat = sample["latency_ms"]
+        values = [
+            datetime.fromtimestamp(sample["ts"]).strftime("%Y-%m-%d %H:%M:%S"),
+            sample["status"],
+            f"{lat:.2f}" if lat else "N/A",
+            str(sample["successful_pings"]),
+            str(sample["total_pings"]),
+            "Yes" if sample["local_ok"] else "No",
+            "Yes" if sample["internet_ok"] else "No",
+            "Yes" if sample["http_ok"] else "No",
+        ]
+        return dict(zip(self._header(), values))
+
     def get_recent_logs(self, count: int = 100) -> list:
+        if self.binlog is not None:
+            if count <= 0:
+                return []
+            self.binlog.flush()
+            try:
+                return record_rows(read_records(self.binlog.path, last=count))
+            except FileNotFoundError:
+                return []
+            except Exception as e:
+                print(f"Error reading logs: {e}")
+                return []
+        if not self.csv_enabled:
+            if self.store is None or count <= 0:
+                return []
+            try:
+                return [self._sample_row(s) for s in self.store.samples(limit=count)]
+            except Exception as e:
+                print(f"Error reading history: {e}")
+                return []
+        if self.buffered:
+            self.flush()
         if not os.path.exists(self.log_file):
             return []
         try:
-            with open(self.log_file, "r", encoding="utf-8") as f:
-                logs = list(csv.DictReader(f))
-            return logs[-count:] if len(logs) > count else logs
+            return read_tail_rows(self.log_file, count)
         except Exception as e:
             print(f"Error reading logs: {e}")
             return []
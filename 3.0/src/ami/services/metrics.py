@@ -0,0 +1,275 @@
+"""
+AMI 3.0 - Prometheus text exposition (format 0.0.4) for the local API.
+MonitorMetrics keeps cumulative counters, gauges and fixed-bucket histograms that are updated in
+O(1) per check, so a /metrics scrape costs O(number of series), never O(history).
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ami.core.models import ConnectionStatus, LoadedLatency, PingResult
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS_S = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+DURATION_BUCKETS_S = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+STATES = ("online", "unstable", "offline")
+HOST_LOSS_WINDOW = 60  # probes behind ami_host_loss_ratio
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + "}"
+
+
+def _num(v: float) -> str:
+    if v != v:
+        return "NaN"
+    if v == int(v) and abs(v) < 1e15:
+        return str(int(v))
+    return repr(float(v))
+
+
+class Histogram:
+    """Cumulative fixed-bucket histogram (Prometheus semantics)."""
+
+    __slots__ = ("bounds", "counts", "total", "sum")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * len(self.bounds)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        for i, b in enumerate(self.bounds):
+            if value <= b:
+                self.counts[i] += 1
+                break
+        self.total += 1
+        self.sum += value
+
+    def lines(self, name: str, labels: Dict[str, str]) -> List[str]:
+        out = []
+        acc = 0
+        for b, c in zip(self.bounds, self.counts):
+            acc += c
+            out.append(f"{name}_bucket{_labels({**labels, 'le': _num(b)})} {acc}")
+        out.append(f"{name}_bucket{_labels({**labels, 'le': '+Inf'})} {self.total}")
+        out.append(f"{name}_sum{_labels(labels)} {_num(self.sum)}")
+        out.append(f"{name}_count{_labels(labels)} {self.total}")
+        return out
+
+
+class _HostSeries:
+    __slots__ = ("rtt", "probes", "failures", "last_rtt_s", "consecutive_failures", "recent", "recent_failed")
+
+    def __init__(self):
+        self.rtt = Histogram(LATENCY_BUCKETS_S)
+        self.probes = 0
+        self.failures = 0
+        self.last_rtt_s: Optional[float] = None
+        self.consecutive_failures = 0
+        self.recent: deque = deque(maxlen=HOST_LOSS_WINDOW)
+        self.recent_failed = 0
+
+
+class MonitorMetrics:
+    """Thread-safe: ``record*`` run on monitor / speed-test threads, ``render`` on the API thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self) -> None:
+        """Zero every counter, gauge and histogram; callers hold the lock (or own the object)."""
+        self._checks_by_state = {s: 0 for s in STATES}
+        self._outages = 0
+        self._state: Optional[str] = None
+        self._flags = {"local_network_ok": 0, "internet_ok": 0, "http_test_ok": 0}
+        self._latency = Histogram(LATENCY_BUCKETS_S)
+        self._stages: Dict[str, Histogram] = {}
+        self._hosts: Dict[str, _HostSeries] = {}
+        self._last_check_ts: Optional[float] = None
+        self._speed_tests = 0
+        self._speed_bytes = 0
+        self._speed_failures = 0
+        self._speed_mbps: Optional[float] = None
+        self._speed_ts: Optional[float] = None
+        self._upload_mbps: Optional[float] = None
+        self._loaded_latency: Optional[LoadedLatency] = None
+
+    def record(self, status: ConnectionStatus, ping_results: Sequence[PingResult] = ()) -> None:
+        with self._lock:
+            if status.status in self._checks_by_state:
+                self._checks_by_state[status.status] += 1
+            if status.status == "offline" and self._state != "offline":
+                self._outages += 1
+            self._state = status.status
+            self._flags["local_network_ok"] = int(bool(status.local_network_ok))
+            self._flags["internet_ok"] = int(bool(status.internet_ok))
+            self._flags["http_test_ok"] = int(bool(status.http_test_ok))
+            self._last_check_ts = status.epoch
+            if status.avg_latency_ms is not None:
+                self._latency.observe(status.avg_latency_ms / 1000)
+            for stage, ms in (status.stage_timings_ms or {}).items():
+                h = self._stages.get(stage)
+                if h is None:
+                    h = self._stages[stage] = Histogram(DURATION_BUCKETS_S)
+                h.observe(ms / 1000)
+            for r in ping_results:
+                hs = self._hosts.get(r.host)
+                if hs is None:
+                    hs = self._hosts[r.host] = _HostSeries()
+                hs.probes += 1
+                failed = not r.success
+                if failed:
+                    hs.failures += 1
+                    hs.consecutive_failures += 1
+                else:
+                    hs.consecutive_failures = 0
+                    if r.latency_ms is not None:
+                        hs.last_rtt_s = r.latency_ms / 1000
+                        hs.rtt.observe(hs.last_rtt_s)
+                if len(hs.recent) == hs.recent.maxlen and hs.recent[0]:
+                    hs.recent_failed -= 1
+                hs.recent.append(failed)
+                hs.recent_failed += failed
+
+    def record_speed(self, speed_mbps: Optional[float]) -> None:
+        with self._lock:
+            self._speed_tests += 1
+            if speed_mbps is None:
+                self._speed_failures += 1
+                return
+            self._speed_mbps = speed_mbps
+            self._speed_ts = time.time()
+
+    def record_speed_bytes(self, n: int) -> None:
+        with self._lock:
+            self._speed_bytes += n
+
+    def record_upload(self, upload_mbps: Optional[float]) -> None:
+        with self._lock:
+            if upload_mbps is not None:
+                self._upload_mbps = upload_mbps
+
+    def record_loaded_latency(self, latency: Optional[LoadedLatency]) -> None:
+        with self._lock:
+            if latency is not None:
+                self._loaded_latency = latency
+
+    def retain(self, hosts) -> None:
+        """Drop series of targets no longer in the config."""
+        keep = set(hosts)
+        with self._lock:
+            for host in [h for h in self._hosts if h not in keep]:
+                del self._hosts[host]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def render(self, extra: Sequence[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]] = ()) -> str:
+        """
+        Exposition text. ``extra`` adds families owned elsewhere (log queue, API counters):
+        ``(name, type, help, [(labels, value), ...])``.
+        """
+        out: List[str] = []
+
+        def family(name: str, kind: str, help_text: str) -> None:
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+
+        def sample(name: str, value: float, labels: Optional[Dict[str, str]] = None) -> None:
+            out.append(f"{name}{_labels(labels or {})} {_num(value)}")
+
+        with self._lock:
+            family("ami_checks_total", "counter", "Connection checks run, by resulting state.")
+            for state, n in self._checks_by_state.items():
+                sample("ami_checks_total", n, {"state": state})
+            family("ami_outages_total", "counter", "Runs of offline checks started (including at startup).")
+            sample("ami_outages_total", self._outages)
+            family("ami_state", "gauge", "1 for the current connection state.")
+            for state in STATES:
+                sample("ami_state", 1 if self._state == state else 0, {"state": state})
+            family("ami_check_ok", "gauge", "Result of the last check, per stage.")
+            for flag, v in self._flags.items():
+                sample("ami_check_ok", v, {"check": flag.replace("_ok", "")})
+            if self._last_check_ts is not None:
+                family("ami_last_check_timestamp_seconds", "gauge", "Unix time of the last check.")
+                sample("ami_last_check_timestamp_seconds", round(self._last_check_ts, 3))
+
+            family("ami_latency_seconds", "histogram", "Average ping RTT of each check.")
+            out.extend(self._latency.lines("ami_latency_seconds", {}))
+            family("ami_check_duration_seconds", "histogram", "Duration of each check stage.")
+            for stage in sorted(self._stages):
+                out.extend(self._stages[stage].lines("ami_check_duration_seconds", {"stage": stage}))
+
+            hosts = sorted(self._hosts.items())
+            family("ami_host_rtt_seconds", "histogram", "Successful probe RTT per target.")
+            for host, hs in hosts:
+                out.extend(hs.rtt.lines("ami_host_rtt_seconds", {"host": host}))
+            family("ami_host_probes_total", "counter", "Probes sent per target.")
+            for host, hs in hosts:
+                sample("ami_host_probes_total", hs.probes, {"host": host})
+            family("ami_host_probe_errors_total", "counter", "Failed probes per target.")
+            for host, hs in hosts:
+                sample("ami_host_probe_errors_total", hs.failures, {"host": host})
+            family(
+                "ami_host_loss_ratio", "gauge",
+                f"Share of failed probes over the last {HOST_LOSS_WINDOW} probes per target.",
+            )
+            for host, hs in hosts:
+                if hs.recent:
+                    sample("ami_host_loss_ratio", round(hs.recent_failed / len(hs.recent), 4), {"host": host})
+            family("ami_host_last_rtt_seconds", "gauge", "Last successful probe RTT per target.")
+            for host, hs in hosts:
+                if hs.last_rtt_s is not None:
+                    sample("ami_host_last_rtt_seconds", hs.last_rtt_s, {"host": host})
+            family("ami_host_consecutive_failures", "gauge", "Failed probes in a row per target.")
+            for host, hs in hosts:
+                sample("ami_host_consecutive_failures", hs.consecutive_failures, {"host": host})
+
+            family("ami_speed_tests_total", "counter", "Speed tests run.")
+            sample("ami_speed_tests_total", self._speed_tests)
+            family("ami_speed_test_bytes_total", "counter", "Traffic spent by speed tests (bytes).")
+            sample("ami_speed_test_bytes_total", self._speed_bytes)
+            family("ami_speed_test_failures_total", "counter", "Speed tests without a result.")
+            sample("ami_speed_test_failures_total", self._speed_failures)
+            if self._speed_mbps is not None:
+                family("ami_speed_download_mbps", "gauge", "Last download speed test result.")
+                sample("ami_speed_download_mbps", round(self._speed_mbps, 3))
+                family("ami_speed_test_timestamp_seconds", "gauge", "Unix time of the last speed result.")
+                sample("ami_speed_test_timestamp_seconds", round(self._speed_ts, 3))
+            if self._upload_mbps is not None:
+                family("ami_speed_upload_mbps", "gauge", "Last upload speed test result.")
+                sample("ami_speed_upload_mbps", round(self._upload_mbps, 3))
+            ll = self._loaded_latency
+            if ll is not None:
+                phases = [
+                    (phase, value)
+                    for phase, value in (("idle", ll.idle_ms), ("download", ll.download_ms), ("upload", ll.upload_ms))
+                    if value is not None
+                ]
+                if phases:
+                    family("ami_speed_latency_seconds", "gauge", "Median RTT to ping hosts per speed test phase.")
+                for phase, value in phases:
+                    sample("ami_speed_latency_seconds", value / 1000, {"phase": phase})
+                if ll.increase_ms is not None:
+                    family("ami_speed_latency_increase_seconds", "gauge", "Loaded minus idle median RTT (bufferbloat).")
+                    sample("ami_speed_latency_increase_seconds", ll.increase_ms / 1000)
+
+        for name, kind, help_text, samples in extra:
+            family(name, kind, help_text)
+            for labels, value in samples:
+                sample(name, value, labels)
+        out.append("")
+        return "\n".join(out)
@@ -1,22 +1,29 @@
 """
 AMI 3.0 - Network monitoring engine.
-Multi-host ping (parallel threads), HTTP test(s), connection status, statistics.
+Multi-host ping (asyncio probe engine), HTTP test(s), connection status, statistics.
+Ping, HTTP, local-network and network-info stages of a check run concurrently under one shared
+deadline; a network-info lookup that outlives it finishes in the background and fills the cache.
 Optional multiple http_test_urls; runs in thread (call check_connection from MonitorThread).
 """
 
+import asyncio
 import re
 import socket
 import subprocess
 import sys
-import threading
 import time
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 
 import psutil
-import requests
 
-from ami.core.models import ConnectionStatus, PingResult
+from ami.core.history import StatusHistory
+from ami.core.models import ConnectionStatus, LoadedLatency, PingResult, SpeedTestResult
+from ami.services.http_pool import HttpPool
+from ami.services.load_latency import LoadLatencyProbe
+from ami.services.metrics import MonitorMetrics
+from ami.services.probe_engine import ProbeEngine
+from ami.services.statistics import HostStatistics, RollingStatistics
 
 
 class NetworkMonitor:
@@ -42,90 +49,107 @@ class NetworkMonitor:
         self.successful_checks = 0
         self.uptime_start = datetime.now()
         self.last_status: Optional[ConnectionStatus] = None
-        self.status_history: List[ConnectionStatus] = []
-        self.max_history = 100
+        self.status_history = StatusHistory(mon.get("history_size", 3600))
+        self.max_history = self.status_history.capacity
+        self.rolling_stats = RollingStatistics()
+        self.host_stats = HostStatistics(mon.get("host_history_size", 600))
+        self.metrics = MonitorMetrics()
 
         self._last_public_ip: Optional[str] = None
         self._last_isp_info: Optional[Dict] = None
         self._last_isp_check_ts: float = 0.0
         self._last_vpn_status: Optional[Tuple[bool, str]] = None
         self._last_vpn_check_ts: float = 0.0
+        self._net_info_job: Optional[asyncio.Future] = None  # on the probe loop; one at a time
         self._last_speed_mbps: Optional[float] = None
         self._last_speed_tier: Optional[str] = None
+        self._last_upload_mbps: Optional[float] = None
+        self._last_loaded_latency: Optional[LoadedLatency] = None
+        self.last_speed_test: Optional[SpeedTestResult] = None
+        self.http_pool = HttpPool(
+            pool_sizes=mon.get("http_pool_sizes") or {},
+            default_pool_size=mon.get("http_pool_size", 4),
+        )
+        self._probes = ProbeEngine(http_pool=self.http_pool)
+
+    def close(self) -> None:
+        """Stop the probe loop thread and drop pooled connections (call on app exit)."""
+        self._probes.stop()
+        self.http_pool.close()
 
     def set_speed_result(self, speed_mbps: Optional[float], tier: Optional[str]) -> None:
         """Update last speed test result (called from speed test thread)."""
         self._last_speed_mbps = speed_mbps
         self._last_speed_tier = tier
+        self.metrics.record_speed(speed_mbps)
+
+    def set_speed_test(self, result: Optional[SpeedTestResult]) -> None:
+        """
+        Store a full speed test result (None or ``download_mbps`` None = every URL failed; its
+        ``bytes_consumed`` still counts); called from the speed test thread.
+        """
+        ok = result is not None and result.download_mbps is not None
+        if ok:
+            self.last_speed_test = result
+        self._last_upload_mbps = result.upload_mbps if ok else None
+        self._last_loaded_latency = result.latency if ok else None
+        self.metrics.record_upload(self._last_upload_mbps)
+        self.metrics.record_speed_bytes(result.bytes_consumed if result else 0)
+        self.metrics.record_loaded_latency(self._last_loaded_latency)
+        self.set_speed_result(result.download_mbps if ok else None, result.tier if ok else None)
+
+    def speed_test_summary(self) -> Optional[Dict]:
+        """Last successful speed test as a JSON-ready dict, or None."""
+        r = self.last_speed_test
+        if r is None:
+            return None
+        return {
+            "download_mbps": r.download_mbps,
+            "tier": r.tier,
+            "streams": r.streams,
+            "stream_mbps": r.stream_mbps,
+            "stream_errors": {str(i): e for i, e in r.stream_errors.items()},
+            "bytes_measured": r.bytes_measured,
+            "bytes_consumed": r.bytes_consumed,
+            "window_s": r.window_s,
+            "stop_reason": r.stop_reason,
+            "ci_percent": r.ci_percent,
+            "upload_mbps": r.upload_mbps,
+            "upload_bytes": r.upload_bytes,
+            "latency": {
+                "idle_ms": r.latency.idle_ms,
+                "download_ms": r.latency.download_ms,
+                "download_p95_ms": r.latency.download_p95_ms,
+                "upload_ms": r.latency.upload_ms,
+                "upload_p95_ms": r.latency.upload_p95_ms,
+                "increase_ms": r.latency.increase_ms,
+                "grade": r.latency.grade,
+                "samples": r.latency.samples,
+                "lost": r.latency.lost,
+                "method": r.latency.method,
+            } if r.latency is not None else None,
+            "url": r.url,
+            "timestamp": datetime.fromtimestamp(r.epoch).isoformat(),
+        }
+
+    def load_latency_probe(self, interval_ms: float = 100) -> LoadLatencyProbe:
+        """Latency-under-load sampler over ``ping_hosts`` on this monitor's probe loop."""
+        return LoadLatencyProbe(self._probes, self.hosts, interval_ms / 1000, min(self.timeout, 2))
 
     def ping_host(self, host: str, timeout: int = 5) -> PingResult:
         """Ping a single host (ICMP or TCP fallback)."""
-        try:
-            if sys.platform in ["darwin", "linux"]:
-                try:
-                    param = "-n" if sys.platform == "win32" else "-c"
-                    timeout_param = "-W"
-                    timeout_seconds = str(timeout)
-                    kwargs = {"capture_output": True, "text": True}
-                    if sys.platform == "win32":
-                        kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
-                    result = subprocess.run(
-                        ["ping", param, "1", timeout_param, timeout_seconds, host],
-                        **kwargs,
-                        timeout=timeout + 1,
-                    )
-                    if result.returncode == 0 and "time=" in result.stdout:
-                        time_str = result.stdout.split("time=")[1].split()[0]
-                        latency = float(time_str.replace("ms", ""))
-                        return PingResult(host=host, success=True, latency_ms=latency)
-                except (subprocess.TimeoutExpired, subprocess.SubprocessError, ValueError):
-                    pass
-
-            try:
-                import ping3
-                ping3.EXCEPTIONS = True
-                delay = ping3.ping(host, timeout=timeout, unit="ms")
-                if delay is not None and delay is not False:
-                    return PingResult(host=host, success=True, latency_ms=delay)
-            except Exception:
-                pass
+        return self._probes.run(self._probes.ping(host, timeout))
 
-            tcp_start = time.time()
-            port = 443 if "https" in host or not any(c.isdigit() for c in host) else 80
-            try:
-                ip = socket.gethostbyname(
-                    host.replace("https://", "").replace("http://", "").split("/")[0]
-                )
-            except socket.gaierror:
-                return PingResult(host=host, success=False, error="DNS resolution failed")
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(timeout)
-            try:
-                sock.connect((ip, port))
-                latency = (time.time() - tcp_start) * 1000
-                return PingResult(host=host, success=True, latency_ms=latency)
-            except (socket.timeout, socket.error) as e:
-                return PingResult(host=host, success=False, error=f"Connection failed: {str(e)}")
-            finally:
-                sock.close()
-        except Exception as e:
-            return PingResult(host=host, success=False, error=str(e))
+    def _http_urls(self) -> List[str]:
+        urls = [self.http_test_url] + list(self.http_test_urls)[:5]
+        return [u.strip() for u in urls if u and u.strip()]
 
     def test_http_connectivity(self) -> bool:
-        """Test HTTP connectivity (primary URL + optional http_test_urls)."""
+        """Test HTTP connectivity (primary URL + optional http_test_urls, probed concurrently)."""
         if not self.enable_http_test:
             return True
-        urls = [self.http_test_url] + list(self.http_test_urls)[:5]
-        for url in urls:
-            if not url or not url.strip():
-                continue
-            try:
-                r = requests.get(url.strip(), timeout=self.timeout, allow_redirects=False)
-                if r.status_code in (200, 204):
-                    return True
-            except Exception:
-                continue
-        return False
+        ok, _ = self._probes.run(self._probes.http_any_ok(self._http_urls(), self.timeout))
+        return ok
 
     def check_local_network(self) -> bool:
         """Check if local network is available."""
@@ -152,18 +176,88 @@ class NetworkMonitor:
             return False
 
     def ping_all_hosts(self) -> List[PingResult]:
-        """Ping all configured hosts in parallel."""
-        results: List[PingResult] = []
+        """Ping all configured hosts concurrently; the whole cycle is bounded by ``timeout``."""
+        return self._probes.run(self._probes.ping_all(list(self.hosts), self.timeout))
 
-        def worker(h: str) -> None:
-            results.append(self.ping_host(h, self.timeout))
+    def _refresh_network_info(self) -> Tuple[Optional[Dict], Optional[Tuple[bool, str]]]:
+        """Blocking ISP lookup (HTTP) then VPN detection (subprocesses); both keep their caches."""
+        isp_info = vpn = None
+        try:
+            isp_info = self._get_public_network_info()
+        except Exception:
+            pass
+        try:
+            vpn = self._detect_vpn((isp_info or {}).get("isp"))
+        except Exception:
+            pass
+        return isp_info, vpn
+
+    async def _network_info_stage(
+        self, deadline: float
+    ) -> Tuple[Optional[Dict], Optional[Tuple[bool, str]]]:
+        """
+        ISP / VPN info by ``deadline`` (probe loop time). A lookup still running then is not
+        cancelled: it completes on its worker thread and the cached values are used meanwhile.
+        """
+        loop = asyncio.get_running_loop()
+        if self._net_info_job is None or self._net_info_job.done():
+            self._net_info_job = loop.run_in_executor(None, self._refresh_network_info)
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(self._net_info_job), max(0.0, deadline - loop.time())
+            )
+        except Exception:
+            return self._last_isp_info, self._last_vpn_status
+
+    async def _check_pipeline(
+        self, network_info: bool = True
+    ) -> Tuple[
+        List[PingResult],
+        Tuple[bool, Optional[bool]],
+        bool,
+        Optional[Tuple[Optional[Dict], Optional[Tuple[bool, str]]]],
+        Dict[str, float],
+    ]:
+        """Ping, HTTP, local and (optional) network-info stages concurrently; one deadline of ``timeout``."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        timings: Dict[str, float] = {}
+
+        async def timed(name: str, coro):
+            start = loop.time()
+            try:
+                return await coro
+            finally:
+                timings[name] = round((loop.time() - start) * 1000, 2)
 
-        threads = [threading.Thread(target=worker, args=(h,)) for h in self.hosts]
-        for t in threads:
-            t.start()
-        for t in threads:
-            t.join(timeout=self.timeout + 1)
-        return results
+        async def http_stage() -> Tuple[bool, Optional[bool]]:
+            if not self.enable_http_test:
+                return True, None
+            return await self._probes.http_any_ok(self._http_urls(), deadline - loop.time())
+
+        async def local_stage() -> bool:
+            try:
+                return await asyncio.wait_for(
+                    loop.run_in_executor(None, self.check_local_network),
+                    max(0.0, deadline - loop.time()),
+                )
+            except asyncio.TimeoutError:
+                return False
+
+        async def no_info() -> None:
+            return None
+
+        ping_results, http, local_ok, net = await asyncio.gather(
+            timed("ping", self._probes.ping_all(list(self.hosts), self.timeout)),
+            timed("http", http_stage()),
+            timed("local", local_stage()),
+            timed("network_info", self._network_info_stage(deadline)) if network_info else no_info(),
+        )
+        return ping_results, http, local_ok, net, timings
+
+    async def _network_info_only(self) -> Tuple[Optional[Dict], Optional[Tuple[bool, str]]]:
+        loop = asyncio.get_running_loop()
+        return await self._network_info_stage(loop.time() + self.timeout)
 
     def analyze_connection(
         self, ping_results: List[PingResult], http_ok: bool, local_ok: bool
@@ -200,37 +294,48 @@ class NetworkMonitor:
     def check_connection(self) -> ConnectionStatus:
         """Perform full connection check (run from worker thread)."""
         self.total_checks += 1
+        check_start = time.perf_counter()
+        timings: Dict[str, float] = {}
+        ping_results: List[PingResult] = []
+        network_info = self.total_checks > 1
+        net = None
         if self.internal_test_mode:
             status = self._simulate_connection()
+            if network_info:
+                info_start = time.perf_counter()
+                net = self._probes.run(self._network_info_only())
+                timings["network_info"] = round((time.perf_counter() - info_start) * 1000, 2)
         else:
-            ping_results = self.ping_all_hosts()
-            http_ok = self.test_http_connectivity()
-            local_ok = self.check_local_network()
+            ping_results, (http_ok, http_reused), local_ok, net, timings = self._probes.run(
+                self._check_pipeline(network_info)
+            )
             status = self.analyze_connection(ping_results, http_ok, local_ok)
-
-        if self.total_checks > 1:
-            try:
-                isp_info = self._get_public_network_info()
-                if isp_info:
-                    status.public_ip = isp_info.get("ip")
-                    status.isp = isp_info.get("isp")
-            except Exception:
-                pass
-            try:
-                vpn_connected, vpn_hint = self._detect_vpn(status.isp)
-                status.vpn_connected = vpn_connected
-                status.vpn_provider = vpn_hint
-            except Exception:
-                pass
+            status.http_connection_reused = http_reused
+            status.ping_results = ping_results
+
+        if net is not None:
+            isp_info, vpn = net
+            if isp_info:
+                status.public_ip = isp_info.get("ip")
+                status.isp = isp_info.get("isp")
+            if vpn:
+                status.vpn_connected, status.vpn_provider = vpn
+        timings["total"] = round((time.perf_counter() - check_start) * 1000, 2)
+        status.stage_timings_ms = timings
 
         status.speed_mbps = self._last_speed_mbps
         status.speed_tier = self._last_speed_tier
+        status.upload_mbps = self._last_upload_mbps
+        if self._last_loaded_latency is not None:
+            status.loaded_latency_ms = self._last_loaded_latency.loaded_ms
+            status.bufferbloat_grade = self._last_loaded_latency.grade
 
         if status.status in ("online", "unstable"):
             self.successful_checks += 1
-        self.status_history.append(status)
-        if len(self.status_history) > self.max_history:
-            self.status_history.pop(0)
+        self.status_history.append_status(status)
+        self.rolling_stats.record(status, ping_results)
+        self.host_stats.record(ping_results)
+        self.metrics.record(status, ping_results)
         self.last_status = status
         return status
 
@@ -288,7 +393,7 @@ class NetworkMonitor:
         ]
         for url, parser in endpoints:
             try:
-                r = requests.get(url, timeout=3)
+                r, _ = self.http_pool.get(url, timeout=3)
                 if r.status_code == 200:
                     data = parser(r.json())
                     self._last_isp_info = data
@@ -401,10 +506,20 @@ class NetworkMonitor:
             "uptime_duration": self.get_uptime_duration(),
             "last_status": self.last_status,
             "history_count": len(self.status_history),
+            "http_pool": self.http_pool.stats(),
+            "windows": self.rolling_stats.snapshot(),
+            "speed_test": self.speed_test_summary(),
         }
 
+    def get_host_statistics(self) -> List[Dict]:
+        """Per-target counters and recent latency, slowest / failing hosts first."""
+        return self.host_stats.summary()
+
     def reset_statistics(self) -> None:
         self.total_checks = 0
         self.successful_checks = 0
         self.uptime_start = datetime.now()
         self.status_history.clear()
+        self.rolling_stats.reset()
+        self.host_stats.reset()
+        self.metrics.reset()
@@ -0,0 +1,333 @@
+"""
+AMI 3.0 - Asyncio probe engine.
+One long-lived event loop thread runs all ICMP/TCP/HTTP probes of a monitoring cycle
+concurrently, instead of spawning a new OS thread per host on every poll.
+ICMP uses one in-process datagram socket when the OS allows it (see icmp.py), otherwise
+system ping; blocking fallbacks (ping3, requests) run on a small bounded executor.
+HTTP probes go through the shared keep-alive HttpPool (http_pool.py).
+"""
+
+import asyncio
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Coroutine, Dict, List, Optional, Sequence, Tuple
+
+from ami.core.models import PingResult
+from ami.services.http_pool import HttpPool
+from ami.services.icmp import IcmpEchoSocket
+
+_BLOCKING_WORKERS = 8
+_DNS_TTL_S = 60.0
+_ICMP_SHARE = 0.5  # fraction of a host's budget ICMP may use before the TCP fallback
+_MIN_STAGE_S = 0.05
+_HTTP_HEDGE_S = 0.25  # start the next HTTP test URL if the current ones have not answered by then
+
+
+def _tcp_target(host: str) -> tuple[str, int]:
+    """Hostname and port for the TCP connect fallback (same rules as the old ping_host)."""
+    port = 443 if "https" in host or not any(c.isdigit() for c in host) else 80
+    name = host.replace("https://", "").replace("http://", "").split("/")[0]
+    return name, port
+
+
+def _ping3_ms(host: str, timeout: float) -> Optional[float]:
+    try:
+        import ping3
+
+        ping3.EXCEPTIONS = True
+        delay = ping3.ping(host, timeout=timeout, unit="ms")
+        if delay is not None and delay is not False:
+            return float(delay)
+    except Exception:
+        pass
+    return None
+
+
+class ProbeEngine:
+    """Background asyncio loop; ``run()`` is thread-safe and blocks the caller until done."""
+
+    def __init__(self, blocking_workers: int = _BLOCKING_WORKERS, http_pool: Optional[HttpPool] = None):
+        self._blocking_workers = blocking_workers
+        self.http_pool = http_pool or HttpPool()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # Loop-thread state (only touched from coroutines)
+        self._icmp: Optional[IcmpEchoSocket] = None
+        self._icmp_tried = False
+        self._dns_cache: Dict[str, Tuple[str, float]] = {}
+
+    @property
+    def icmp_socket_available(self) -> bool:
+        """True once the in-process ICMP socket has been opened successfully."""
+        return self._icmp is not None
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            loop = asyncio.new_event_loop()
+            loop.set_default_executor(
+                ThreadPoolExecutor(
+                    max_workers=self._blocking_workers, thread_name_prefix="ami-probe"
+                )
+            )
+            ready = threading.Event()
+
+            def serve() -> None:
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                try:
+                    loop.run_forever()
+                finally:
+                    if self._icmp is not None:
+                        self._icmp.close()
+                    self._icmp = None
+                    self._icmp_tried = False
+                    try:
+                        loop.run_until_complete(loop.shutdown_default_executor())
+                    except Exception:
+                        pass
+                    loop.close()
+
+            thread = threading.Thread(target=serve, name="ami-probe-loop", daemon=True)
+            thread.start()
+            ready.wait()
+            self._loop = loop
+            self._thread = thread
+
+    def stop(self) -> None:
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = None
+            self._thread = None
+        if loop is None or thread is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=2)
+
+    def run(self, coro: Coroutine[Any, Any, Any], timeout: Optional[float] = None) -> Any:
+        """Run ``coro`` on the probe loop from another thread and return its result."""
+        self.start()
+        fut = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        return fut.result(timeout)
+
+    def submit(self, coro: Coroutine[Any, Any, Any]) -> Future:
+        """Schedule ``coro`` on the probe loop without waiting for it."""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    # ===== Probes (coroutines, executed on the probe loop) =====
+
+    async def ping(self, host: str, timeout: float = 5) -> PingResult:
+        """
+        ICMP (in-process socket, else system ping, then ping3), then TCP connect fallback.
+        All stages share one ``timeout`` budget; ICMP may use at most half of it so hosts
+        that drop ICMP still get a TCP attempt inside the same budget.
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        deadline = start + timeout
+        icmp_deadline = start + timeout * _ICMP_SHARE
+
+        def left(until: float) -> float:
+            return max(0.0, until - loop.time())
+
+        try:
+            icmp = self._icmp_socket()
+            if icmp is not None:
+                ip = await self._resolve(_tcp_target(host)[0])
+                if ip is None:
+                    return PingResult(host=host, success=False, error="DNS resolution failed")
+                latency = await icmp.echo(ip, left(icmp_deadline))
+                if latency is not None:
+                    return PingResult(host=host, success=True, latency_ms=latency)
+            else:
+                if sys.platform in ("darwin", "linux"):
+                    latency = await self._system_ping(host, left(icmp_deadline))
+                    if latency is not None:
+                        return PingResult(host=host, success=True, latency_ms=latency)
+
+                budget = left(icmp_deadline)
+                if budget >= _MIN_STAGE_S:
+                    try:
+                        latency = await asyncio.wait_for(
+                            loop.run_in_executor(None, _ping3_ms, host, budget), budget
+                        )
+                    except asyncio.TimeoutError:
+                        latency = None
+                    if latency is not None:
+                        return PingResult(host=host, success=True, latency_ms=latency)
+
+            return await self._tcp_ping(host, left(deadline))
+        except Exception as e:
+            return PingResult(host=host, success=False, error=str(e))
+
+    async def rtt(self, host: str, timeout: float) -> Tuple[PingResult, str]:
+        """
+        One RTT sample that never starts a process, for high-rate sampling: echo on the
+        in-process ICMP socket when it is open, else a TCP connect. Returns the result and the
+        method used (``"icmp"`` / ``"tcp"``); a lost echo is not retried over TCP.
+        """
+        try:
+            icmp = self._icmp_socket()
+            if icmp is None:
+                return await self._tcp_ping(host, timeout), "tcp"
+            ip = await self._resolve(_tcp_target(host)[0])
+            if ip is None:
+                return PingResult(host=host, success=False, error="DNS resolution failed"), "icmp"
+            latency = await icmp.echo(ip, timeout)
+            if latency is None:
+                return PingResult(host=host, success=False, error=f"No echo reply within {timeout:g}s"), "icmp"
+            return PingResult(host=host, success=True, latency_ms=latency), "icmp"
+        except Exception as e:
+            return PingResult(host=host, success=False, error=str(e)), "tcp" if self._icmp is None else "icmp"
+
+    async def ping_all(self, hosts: Sequence[str], timeout: float) -> List[PingResult]:
+        """
+        Probe every host concurrently under one cycle deadline of ``timeout`` seconds.
+        Each host has a preallocated slot (same order as ``hosts``); probes still running
+        at the deadline are cancelled and their slot gets an explicit timeout result.
+        """
+        if not hosts:
+            return []
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        slots: List[Optional[PingResult]] = [None] * len(hosts)
+
+        async def probe(i: int, host: str) -> None:
+            slots[i] = await self.ping(host, max(0.0, deadline - loop.time()))
+
+        tasks = [loop.create_task(probe(i, h)) for i, h in enumerate(hosts)]
+        _, pending = await asyncio.wait(tasks, timeout=max(0.0, deadline - loop.time()))
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        return [
+            r if r is not None
+            else PingResult(host=h, success=False, error=f"Timed out after {timeout:g}s")
+            for h, r in zip(hosts, slots)
+        ]
+
+    def _http_get(self, url: str, timeout: float) -> Tuple[bool, bool]:
+        r, reused = self.http_pool.get(url, timeout=timeout, allow_redirects=False)
+        return r.status_code in (200, 204), reused
+
+    async def http_check(self, url: str, timeout: float) -> Tuple[bool, Optional[bool]]:
+        """(ok, reused): ok if GET ``url`` answers 200/204; reused=False means a cold handshake."""
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(None, self._http_get, url, timeout)
+        except Exception:
+            return False, None
+
+    async def http_ok(self, url: str, timeout: float) -> bool:
+        """True if GET ``url`` answers 200/204 (blocking client on the probe executor)."""
+        ok, _ = await self.http_check(url, timeout)
+        return ok
+
+    async def http_any_ok(self, urls: Sequence[str], timeout: float) -> Tuple[bool, Optional[bool]]:
+        """
+        Hedged probe of ``urls`` in order: (True, reused) as soon as one answers 200/204. The next
+        URL starts only when every running one has failed or ``_HTTP_HEDGE_S`` passed without an
+        answer, so a healthy primary costs one GET per poll.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        waiting = list(urls)
+        running: set = set()
+        try:
+            while True:
+                if waiting:
+                    url = waiting.pop(0)
+                    running.add(loop.create_task(self.http_check(url, max(0.0, deadline - loop.time()))))
+                left = deadline - loop.time()
+                if not running or left <= 0:
+                    return False, None
+                done, running = await asyncio.wait(
+                    running,
+                    timeout=min(left, _HTTP_HEDGE_S) if waiting else left,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    ok, reused = task.result()
+                    if ok:
+                        return True, reused
+        finally:
+            for task in running:
+                task.cancel()
+
+    def _icmp_socket(self) -> Optional[IcmpEchoSocket]:
+        if not self._icmp_tried:
+            self._icmp_tried = True
+            self._icmp = IcmpEchoSocket.open(asyncio.get_running_loop())
+        return self._icmp
+
+    async def _resolve(self, name: str) -> Optional[str]:
+        """IPv4 address for ``name``, cached for a minute so 50+ targets do not hit DNS every poll."""
+        now = time.monotonic()
+        cached = self._dns_cache.get(name)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+        loop = asyncio.get_running_loop()
+        try:
+            infos = await loop.getaddrinfo(name, None, family=socket.AF_INET, type=socket.SOCK_STREAM)
+            ip = infos[0][4][0]
+        except (socket.gaierror, IndexError, UnicodeError):
+            return None
+        self._dns_cache[name] = (ip, now + _DNS_TTL_S)
+        return ip
+
+    async def _system_ping(self, host: str, timeout: float) -> Optional[float]:
+        if timeout < _MIN_STAGE_S:
+            return None
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                "ping", "-c", "1", "-W", str(max(1, int(timeout))), host,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except (OSError, ValueError):
+            return None
+        try:
+            out, _ = await asyncio.wait_for(proc.communicate(), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
+            await proc.wait()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            return None
+        text = out.decode(errors="ignore")
+        if proc.returncode != 0 or "time=" not in text:
+            return None
+        try:
+            return float(text.split("time=")[1].split()[0].replace("ms", ""))
+        except (IndexError, ValueError):
+            return None
+
+    async def _tcp_ping(self, host: str, timeout: float) -> PingResult:
+        tcp_start = time.time()
+        name, port = _tcp_target(host)
+        ip = await self._resolve(name)
+        if ip is None:
+            return PingResult(host=host, success=False, error="DNS resolution failed")
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), timeout)
+        except (asyncio.TimeoutError, OSError) as e:
+            reason = "timed out" if isinstance(e, asyncio.TimeoutError) else str(e)
+            return PingResult(host=host, success=False, error=f"Connection failed: {reason}")
+        latency = (time.time() - tcp_start) * 1000
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return PingResult(host=host, success=True, latency_ms=latency)
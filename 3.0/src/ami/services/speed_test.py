@@ -4,14 +4,54 @@ Runs in a separate thread; no PyQt dependency.
 
 Timing excludes DNS/TLS/connect: the clock starts at the first byte of the *measured*
 window (after optional TCP warmup). Total bytes read = warmup_mb + download_size_mb.
+With ``streams`` > 1 that budget is shared by N concurrent ranged downloads: warmup and the
+timed window are counted over all of them together, so one fast link is not capped by a
+single TCP stream.
+
+Receive path: each stream reads the body with ``readinto`` into one reusable buffer and only
+counts bytes, so a multi-gigabit window is not capped by per-chunk allocation in Python.
+Bodies with a content encoding fall back to ``iter_content``.
+
+Adaptive mode (``adaptive=True``): the timed window is cut into 250 ms slices and ends as soon
+as the recent slice rates agree (95% confidence interval within ``ci_percent`` of their mean),
+or at ``max_seconds`` / ``max_mb``, whichever comes first; warmup also ends after 1 s. Slow links
+stop after a few seconds instead of draining the full size, fast links may read more than
+``download_size_mb`` to get a stable figure. ``bytes_consumed`` reports the traffic spent,
+including URL attempts that failed and streams that died mid-test.
+
+Upload: one streamed POST of ``warmup + upload`` bytes to ``upload_url``, sent as memoryview
+slices of a single preallocated buffer. The window opens when the warmup bytes have been handed
+to the socket and closes when the server answers (i.e. has received the whole body).
 """
 
+import math
+import os
+import statistics
+import threading
 import time
-from typing import List, Optional, Tuple
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
 
 import requests
 
+from ami.core.models import SpeedTestResult
+
+if TYPE_CHECKING:
+    from ami.services.http_pool import HttpPool
+
+MAX_STREAMS = 16
+
 _CHUNK = 524288  # 512 KiB
+# Adaptive mode: smaller reads so slice boundaries stay close to 250 ms on slow links.
+_ADAPTIVE_CHUNK = 65536
+_ADAPTIVE_INTERVAL_S = 0.25
+_ADAPTIVE_MAX_WARMUP_S = 1.0
+_CI_MIN_SLICES = 6
+_CI_WINDOW = 8
+# Two-sided 95% Student t by slice count (df = n - 1).
+_T95 = {6: 2.571, 7: 2.447, 8: 2.365}
+# Upload payload: random (incompressible) bytes, allocated once per process and reused.
+_upload_buffer: Optional[memoryview] = None
+_upload_buffer_lock = threading.Lock()
 # Cloudflare and some CDNs block non-browser clients (403). Try fallbacks if primary fails.
 _BROWSER_UA = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
@@ -38,51 +78,333 @@ _DEFAULT_FALLBACK_URLS: List[str] = [
 ]
 
 
+class _Convergence:
+    """Adaptive stop rule over the slice rates of one timed window (see module docstring)."""
+
+    def __init__(self, max_seconds: float, ci_percent: float):
+        self.max_seconds = max(1.0, float(max_seconds))
+        self.ci = max(0.1, float(ci_percent)) / 100
+        self.rates: List[float] = []
+        self._t0 = 0.0
+        self._last_t = 0.0
+        self._last_bytes = 0
+
+    def start(self, t0: float) -> None:
+        self._t0 = self._last_t = t0
+
+    def update(self, now: float, measured: int) -> Optional[str]:
+        """Stop reason (``"converged"`` / ``"time"``) or None to keep reading."""
+        if now - self._last_t >= _ADAPTIVE_INTERVAL_S:
+            self.rates.append((measured - self._last_bytes) / (now - self._last_t))
+            self._last_t, self._last_bytes = now, measured
+            width = self.relative_ci()
+            if width is not None and width <= self.ci:
+                return "converged"
+        if now - self._t0 >= self.max_seconds:
+            return "time"
+        return None
+
+    def relative_ci(self) -> Optional[float]:
+        """Half-width of the 95% interval of the recent slice rates, relative to their mean."""
+        recent = self.rates[-_CI_WINDOW:]
+        if len(recent) < _CI_MIN_SLICES:
+            return None
+        mean = statistics.fmean(recent)
+        if mean <= 0:
+            return None
+        return _T95[len(recent)] * statistics.stdev(recent) / math.sqrt(len(recent)) / mean
+
+
+class _SharedWindow:
+    """Byte accounting shared by all streams of one attempt: common warmup, then one timed window."""
+
+    def __init__(
+        self,
+        warmup_bytes: int,
+        measure_bytes: int,
+        streams: int,
+        convergence: Optional[_Convergence] = None,
+    ):
+        self._lock = threading.Lock()
+        self.warmup_left = warmup_bytes
+        self.measure_left = measure_bytes
+        self.per_stream = [0] * streams
+        self.measured = 0
+        self.received = 0  # everything read, including warmup and reads that overshoot the window
+        self.convergence = convergence
+        self.read_size = _ADAPTIVE_CHUNK if convergence is not None else _CHUNK
+        self.t_first: Optional[float] = None
+        self.t0: Optional[float] = None
+        self.t_end: Optional[float] = None
+        self.stop_reason: Optional[str] = None  # "size" | "converged" | "time" | "ended"
+        self.done = threading.Event()
+        self.file_size: Optional[int] = None  # from stream 0's response, for the other offsets
+        self.file_size_known = threading.Event()
+
+    def set_file_size(self, size: Optional[int]) -> None:
+        """First call wins; None (unknown, or stream 0 failed) still releases waiting streams."""
+        if not self.file_size_known.is_set():
+            self.file_size = size
+            self.file_size_known.set()
+
+    def add(self, stream: int, n: int) -> bool:
+        """Count ``n`` bytes received by ``stream``; False once the window is complete."""
+        with self._lock:
+            self.received += n
+            if self.done.is_set():
+                return False
+            now = time.perf_counter()
+            if self.t_first is None:
+                self.t_first = now
+            if self.warmup_left > 0:
+                if self.convergence is not None and now - self.t_first >= _ADAPTIVE_MAX_WARMUP_S:
+                    self.warmup_left = 0
+                else:
+                    use = min(self.warmup_left, n)
+                    self.warmup_left -= use
+                    n -= use
+                    if n == 0:
+                        return True
+            if self.t0 is None:
+                self.t0 = now
+                if self.convergence is not None:
+                    self.convergence.start(now)
+            use = min(self.measure_left, n)
+            self.per_stream[stream] += use
+            self.measured += use
+            self.measure_left -= use
+            if self.measure_left <= 0:
+                reason = "size"
+            elif self.convergence is not None:
+                reason = self.convergence.update(now, self.measured)
+            else:
+                reason = None
+            if reason is None:
+                return True
+            self.t_end = now
+            self.stop_reason = reason
+            self.done.set()
+            return False
+
+    def finish(self) -> None:
+        """All streams ended (file shorter than the budget, errors): close the window now."""
+        with self._lock:
+            if self.t_end is None:
+                self.t_end = time.perf_counter()
+                self.stop_reason = "ended"
+            self.done.set()
+
+
+def _raw_body(r: requests.Response):
+    """
+    The ``http.client`` response under ``r`` when its body can be read undecoded with
+    ``readinto`` (it still handles Content-Length and chunked framing); None otherwise.
+    """
+    encoding = (r.headers.get("Content-Encoding") or "identity").strip().lower()
+    if encoding != "identity":
+        return None
+    fp = getattr(r.raw, "_fp", None)
+    return fp if hasattr(fp, "readinto") else None
+
+
+def _body_size(r: requests.Response) -> Optional[int]:
+    """Full size of the resource: ``Content-Range: bytes a-b/<size>``, else a 200's Content-Length."""
+    total = (r.headers.get("Content-Range") or "").rpartition("/")[2]
+    if total.isdigit():
+        return int(total)
+    length = r.headers.get("Content-Length") or ""
+    return int(length) if r.status_code == 200 and length.isdigit() else None
+
+
+def _download_stream(
+    url: str,
+    stream: int,
+    offset: int,
+    window: _SharedWindow,
+    req_timeout: tuple[float, float],
+    pool: Optional["HttpPool"],
+) -> None:
+    headers = _SPEED_HEADERS
+    if offset > 0:
+        # Open-ended range: a faster stream may read past its share of the budget.
+        headers = dict(_SPEED_HEADERS, Range=f"bytes={offset}-")
+    if pool is not None:
+        response, _ = pool.get(url, stream=True, timeout=req_timeout, headers=headers)
+    else:
+        response = requests.get(url, stream=True, timeout=req_timeout, headers=headers)
+    with response as r:
+        r.raise_for_status()
+        window.set_file_size(_body_size(r))
+        body = _raw_body(r)
+        if body is None:
+            for chunk in r.iter_content(chunk_size=window.read_size):
+                if chunk and not window.add(stream, len(chunk)):
+                    break
+            return
+        buf = memoryview(bytearray(window.read_size))
+        while True:
+            n = body.readinto(buf)
+            if not n or not window.add(stream, n):
+                break
+
+
 def _run_speed_test_one_url(
     url: str,
     measure_bytes: int,
     warmup_left: int,
     req_timeout: tuple[float, float],
-) -> Optional[float]:
-    """Single URL attempt; returns Mbps or None."""
-    measure_left = measure_bytes
-    t0: Optional[float] = None
-    bytes_measured = 0
-    warmup_remaining = warmup_left
+    pool: Optional["HttpPool"] = None,
+    streams: int = 1,
+    convergence: Optional[_Convergence] = None,
+    windows: Optional[List[_SharedWindow]] = None,
+) -> Optional[SpeedTestResult]:
+    """
+    Single URL attempt over ``streams`` connections; None if nothing was measured.
+    Streams after the first wait for its response headers so their offsets stay inside the
+    file (a budget larger than the file spreads them evenly over it instead). Streams that fail
+    are listed in ``stream_errors`` and have None in ``stream_mbps``. The attempt's window is
+    appended to ``windows`` first, so its traffic can be counted even if the attempt fails.
+    """
+    window = _SharedWindow(warmup_left, measure_bytes, streams, convergence)
+    if windows is not None:
+        windows.append(window)
+    errors: Dict[int, str] = {}
+    if streams == 1:
+        try:
+            _download_stream(url, 0, 0, window, req_timeout, pool)
+        finally:
+            window.finish()
+    else:
+        share = (warmup_left + measure_bytes) // streams
+        first_error: List[Exception] = []
 
-    with requests.get(url, stream=True, timeout=req_timeout, headers=_SPEED_HEADERS) as r:
-        r.raise_for_status()
-        for chunk in r.iter_content(chunk_size=_CHUNK):
-            if not chunk:
-                continue
-            i = 0
-            while i < len(chunk):
-                if warmup_remaining > 0:
-                    use = min(warmup_remaining, len(chunk) - i)
-                    warmup_remaining -= use
-                    i += use
-                    continue
-                if measure_left <= 0:
-                    break
-                if t0 is None:
-                    t0 = time.perf_counter()
-                use = min(measure_left, len(chunk) - i)
-                bytes_measured += use
-                measure_left -= use
-                i += use
-            if measure_left <= 0:
-                break
+        def worker(i: int) -> None:
+            try:
+                offset = 0
+                if i > 0:
+                    window.file_size_known.wait(sum(req_timeout))
+                    size = window.file_size
+                    offset = i * (min(share, size // streams) if size else share)
+                _download_stream(url, i, offset, window, req_timeout, pool)
+            except Exception as e:
+                errors[i] = str(e)
+                first_error.append(e)
+            finally:
+                if i == 0:
+                    window.set_file_size(None)
 
-    if t0 is None or bytes_measured <= 0:
+        threads = [
+            threading.Thread(target=worker, args=(i,), name=f"ami-speed-{i}", daemon=True)
+            for i in range(streams)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        window.finish()
+        if len(errors) == streams:
+            raise first_error[0]
+
+    if window.t0 is None:
+        return None
+    measured = window.measured
+    elapsed = window.t_end - window.t0
+    if measured <= 0 or elapsed <= 0:
+        return None
+    ci = convergence.relative_ci() if convergence is not None else None
+    return SpeedTestResult(
+        download_mbps=round(measured * 8 / (elapsed * 1_000_000), 2),
+        url=url,
+        streams=streams,
+        stream_mbps=[
+            None if i in errors else round(b * 8 / (elapsed * 1_000_000), 2)
+            for i, b in enumerate(window.per_stream)
+        ],
+        stream_errors=dict(sorted(errors.items())),
+        bytes_measured=measured,
+        bytes_consumed=window.received,
+        window_s=round(elapsed, 3),
+        stop_reason=window.stop_reason,
+        ci_percent=round(ci * 100, 2) if ci is not None else None,
+    )
+
+
+def _get_upload_buffer() -> memoryview:
+    global _upload_buffer
+    with _upload_buffer_lock:
+        if _upload_buffer is None:
+            _upload_buffer = memoryview(os.urandom(_CHUNK))
+        return _upload_buffer
+
+
+class _UploadBody:
+    """
+    Request body of ``warmup + measure`` bytes, yielded as slices of one shared buffer
+    (no per-chunk allocation). Has ``__len__`` so it goes out with Content-Length, not chunked.
+    ``t0`` is set when the first measured byte is handed to the socket; ``sent`` counts the
+    bytes the socket has accepted so far (traffic spent, even if the request then fails).
+    """
+
+    def __init__(self, warmup_bytes: int, measure_bytes: int):
+        self.warmup_bytes = warmup_bytes
+        self.measure_bytes = measure_bytes
+        self.t0: Optional[float] = None
+        self.sent = 0
+        self._buf = _get_upload_buffer()
+
+    def __len__(self) -> int:
+        return self.warmup_bytes + self.measure_bytes
+
+    def __iter__(self):
+        buf = self._buf
+        left = self.warmup_bytes
+        while left > 0:
+            n = min(left, len(buf))
+            yield buf[:n]
+            self.sent += n
+            left -= n
+        # Generator resumes only after the socket accepted the previous slice.
+        self.t0 = time.perf_counter()
+        left = self.measure_bytes
+        while left > 0:
+            n = min(left, len(buf))
+            yield buf[:n]
+            self.sent += n
+            left -= n
+
+
+def _run_upload_one_url(
+    url: str,
+    body: _UploadBody,
+    req_timeout: tuple[float, float],
+    pool: Optional["HttpPool"] = None,
+) -> Optional[float]:
+    """Single upload attempt; returns Mbps or None."""
+    headers = dict(_SPEED_HEADERS, **{"Content-Type": "application/octet-stream"})
+    if pool is not None:
+        response, _ = pool.request("POST", url, data=body, stream=True, timeout=req_timeout, headers=headers)
+    else:
+        response = requests.post(url, data=body, stream=True, timeout=req_timeout, headers=headers)
+    t_end = time.perf_counter()
+    with response as r:
+        r.raise_for_status()
+    if body.t0 is None:
         return None
-    elapsed = time.perf_counter() - t0
+    elapsed = t_end - body.t0
     if elapsed <= 0:
         return None
-    speed_mbps = (bytes_measured * 8) / (elapsed * 1_000_000)
-    return round(speed_mbps, 2)
+    return round(body.measure_bytes * 8 / (elapsed * 1_000_000), 2)
 
 
-def run_speed_test(
+def _tier(speed_mbps: float, tier_low_mbps: float, tier_high_mbps: float) -> str:
+    if speed_mbps < tier_low_mbps:
+        return "slow"
+    if speed_mbps < tier_high_mbps:
+        return "medium"
+    return "fast"
+
+
+def measure_speed(
     test_url: str,
     download_size_mb: float,
     timeout_seconds: int,
@@ -90,18 +412,37 @@ def run_speed_test(
     tier_high_mbps: float,
     warmup_mb: float = 0.0,
     fallback_urls: Optional[List[str]] = None,
-) -> Tuple[Optional[float], Optional[str]]:
+    pool: Optional["HttpPool"] = None,
+    streams: int = 1,
+    upload_url: Optional[str] = None,
+    upload_size_mb: float = 0.0,
+    on_phase: Optional[Callable[[Optional[str]], None]] = None,
+    adaptive: bool = False,
+    max_seconds: float = 10.0,
+    max_mb: float = 80.0,
+    ci_percent: float = 5.0,
+) -> Optional[SpeedTestResult]:
     """
-    Download: first warmup_mb (not timed), then download_size_mb (timed from first byte).
-    Tries test_url, then built-in fallbacks (unless fallback_urls is an empty list).
-    Returns (speed_mbps, tier) or (None, None) if every URL fails.
+    Download: first warmup_mb (not timed), then download_size_mb (timed from first byte), over
+    ``streams`` concurrent connections (1 = a single plain GET, >1 = ranged GETs at staggered
+    offsets sharing the budget). Tries test_url, then built-in fallbacks (unless fallback_urls
+    is an empty list). ``pool``: shared keep-alive HttpPool (e.g. ``NetworkMonitor.http_pool``);
+    default: plain requests. If every URL fails the result has ``download_mbps`` None and only
+    ``bytes_consumed`` (traffic of all attempts) set; None only when nothing was attempted.
+    With ``upload_url`` and ``upload_size_mb`` > 0, an upload of warmup_mb + upload_size_mb
+    follows the download; ``upload_mbps`` stays None if it fails.
+    ``on_phase`` is called with ``"download"`` / ``"upload"`` as each phase starts and with None
+    when the test ends (e.g. ``LoadLatencyProbe.set_phase``).
+    ``adaptive``: the timed download stops on convergence (``ci_percent``), after ``max_seconds``
+    or at ``max_mb`` (which replaces download_size_mb); the upload keeps its fixed size.
     """
     if not test_url or not test_url.strip():
-        return None, None
-    measure_bytes = int(download_size_mb * 1024 * 1024)
+        return None
+    measure_bytes = int((max_mb if adaptive else download_size_mb) * 1024 * 1024)
     if measure_bytes <= 0:
-        return None, None
+        return None
     warmup_left = max(0, int(round(warmup_mb * 1024 * 1024)))
+    streams = max(1, min(MAX_STREAMS, int(streams)))
     connect_timeout = min(10, max(1, int(timeout_seconds)))
     read_timeout = int(timeout_seconds)
     req_timeout = (float(connect_timeout), float(read_timeout))
@@ -117,18 +458,58 @@ def run_speed_test(
             if u and u not in candidates:
                 candidates.append(u)
 
-    for url in candidates:
-        try:
-            speed_mbps = _run_speed_test_one_url(url, measure_bytes, warmup_left, req_timeout)
-            if speed_mbps is None:
+    phase = on_phase or (lambda _name: None)
+    windows: List[_SharedWindow] = []
+    try:
+        phase("download")
+        for url in candidates:
+            try:
+                convergence = _Convergence(max_seconds, ci_percent) if adaptive else None
+                result = _run_speed_test_one_url(
+                    url, measure_bytes, warmup_left, req_timeout, pool, streams, convergence, windows
+                )
+                if result is None:
+                    continue
+                result.tier = _tier(result.download_mbps, tier_low_mbps, tier_high_mbps)
+                break
+            except Exception:
                 continue
-            if speed_mbps < tier_low_mbps:
-                tier = "slow"
-            elif speed_mbps < tier_high_mbps:
-                tier = "medium"
-            else:
-                tier = "fast"
-            return speed_mbps, tier
-        except Exception:
-            continue
-    return None, None
+        else:
+            return SpeedTestResult(download_mbps=None, bytes_consumed=sum(w.received for w in windows))
+        result.bytes_consumed = sum(w.received for w in windows)
+
+        upload_bytes = int(upload_size_mb * 1024 * 1024)
+        if upload_url and upload_url.strip() and upload_bytes > 0:
+            phase("upload")
+            body = _UploadBody(warmup_left, upload_bytes)
+            try:
+                result.upload_mbps = _run_upload_one_url(upload_url.strip(), body, req_timeout, pool)
+                if result.upload_mbps is not None:
+                    result.upload_bytes = upload_bytes
+            except Exception:
+                pass
+            result.bytes_consumed += body.sent
+        return result
+    finally:
+        phase(None)
+
+
+def run_speed_test(
+    test_url: str,
+    download_size_mb: float,
+    timeout_seconds: int,
+    tier_low_mbps: float,
+    tier_high_mbps: float,
+    warmup_mb: float = 0.0,
+    fallback_urls: Optional[List[str]] = None,
+    pool: Optional["HttpPool"] = None,
+    streams: int = 1,
+) -> Tuple[Optional[float], Optional[str]]:
+    """``measure_speed`` reduced to (speed_mbps, tier), or (None, None) if every URL fails."""
+    result = measure_speed(
+        test_url, download_size_mb, timeout_seconds, tier_low_mbps, tier_high_mbps,
+        warmup_mb=warmup_mb, fallback_urls=fallback_urls, pool=pool, streams=streams,
+    )
+    if result is None or result.download_mbps is None:
+        return None, None
+    return result.download_mbps, result.tier
@@ -0,0 +1,295 @@
+"""
+AMI 3.0 - Incremental rolling and per-host statistics for the monitor.
+Each check is folded in O(1) into time-bucketed windows (1 min, 15 min, 1 h, 24 h; 60 buckets
+each). Latency goes into log-binned histogram sketches (~1% relative error), so p50/p95/p99
+never require sorting the history. Windows report the mean |D| between consecutive RTTs of a
+host (``mean_abs_delta_ms``); the RFC 3550 jitter (J += (|D| - J) / 16) is kept per host.
+An outage is the start of a run of offline checks, including one the app starts in.
+HostStatistics keeps a bounded ring and counters per ping target so a degrading host can be
+singled out from the cycle average.
+"""
+
+import math
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ami.core.history import HostHistory
+from ami.core.models import ConnectionStatus, PingResult
+
+# (name, span seconds); every window keeps _BUCKETS buckets of span / _BUCKETS seconds.
+WINDOWS: Tuple[Tuple[str, int], ...] = (("1m", 60), ("15m", 900), ("1h", 3600), ("24h", 86400))
+QUANTILES = (0.5, 0.95, 0.99)
+HOST_RECENT_SAMPLES = 60  # samples behind the per-host "recent" figures
+
+_BUCKETS = 60
+_ALPHA = 0.01  # sketch relative accuracy
+_GAMMA = (1 + _ALPHA) / (1 - _ALPHA)
+_LOG_GAMMA = math.log(_GAMMA)
+_MIN_MS = 0.05
+_MAX_MS = 120_000.0
+_OFFSET = math.floor(math.log(_MIN_MS) / _LOG_GAMMA)
+_BINS = math.ceil(math.log(_MAX_MS) / _LOG_GAMMA) - _OFFSET + 1
+# Bin i covers (γ^(k-1), γ^k] with k = i + _OFFSET; its midpoint has ≤ _ALPHA relative error.
+_BIN_VALUES = 2 * _GAMMA ** (np.arange(_BINS) + _OFFSET) / (_GAMMA + 1)
+
+
+def _bin(latency_ms: float) -> int:
+    if latency_ms <= _MIN_MS:
+        return 0
+    return min(_BINS - 1, math.ceil(math.log(latency_ms) / _LOG_GAMMA) - _OFFSET)
+
+
+def sketch_quantiles(counts: np.ndarray, qs: Sequence[float] = QUANTILES) -> List[Optional[float]]:
+    """Quantiles (ms) from a latency histogram; None when it is empty."""
+    total = int(counts.sum())
+    if total == 0:
+        return [None] * len(qs)
+    cum = np.cumsum(counts)
+    out = []
+    for q in qs:
+        rank = min(total, max(1, math.ceil(q * total)))
+        out.append(round(float(_BIN_VALUES[int(np.searchsorted(cum, rank))]), 2))
+    return out
+
+
+class _Window:
+    """One rolling window; bucket rows are recycled in place when time moves on."""
+
+    _FIELDS = (
+        "checks", "up", "offline", "outages", "lat_count", "lat_sum",
+        "jit_count", "jit_sum", "sent", "received",
+    )
+
+    def __init__(self, span_s: int):
+        self.span_s = span_s
+        self.width = span_s / _BUCKETS
+        self.bucket_ids = np.full(_BUCKETS, -1, dtype=np.int64)
+        self.sketch = np.zeros((_BUCKETS, _BINS), dtype=np.int32)
+        self.scalars = {f: np.zeros(_BUCKETS, dtype=np.float64) for f in self._FIELDS}
+        self.host_sent: Dict[str, np.ndarray] = {}
+        self.host_received: Dict[str, np.ndarray] = {}
+
+    def slot(self, now: float) -> int:
+        bid = int(now // self.width)
+        i = bid % _BUCKETS
+        if self.bucket_ids[i] != bid:
+            self.bucket_ids[i] = bid
+            self.sketch[i] = 0
+            for arr in self.scalars.values():
+                arr[i] = 0
+            for arr in self.host_sent.values():
+                arr[i] = 0
+            for arr in self.host_received.values():
+                arr[i] = 0
+        return i
+
+    def host_rows(self, host: str) -> Tuple[np.ndarray, np.ndarray]:
+        if host not in self.host_sent:
+            self.host_sent[host] = np.zeros(_BUCKETS, dtype=np.int64)
+            self.host_received[host] = np.zeros(_BUCKETS, dtype=np.int64)
+        return self.host_sent[host], self.host_received[host]
+
+    def live(self, now: float) -> np.ndarray:
+        bid = int(now // self.width)
+        return (self.bucket_ids > bid - _BUCKETS) & (self.bucket_ids <= bid)
+
+    def summary(self, now: float) -> Dict:
+        mask = self.live(now)
+        s = {f: float(arr[mask].sum()) for f, arr in self.scalars.items()}
+        p50, p95, p99 = sketch_quantiles(self.sketch[mask].sum(axis=0))
+        hosts = {}
+        for host, sent_row in self.host_sent.items():
+            sent = int(sent_row[mask].sum())
+            if sent:
+                received = int(self.host_received[host][mask].sum())
+                hosts[host] = {
+                    "sent": sent,
+                    "received": received,
+                    "loss_percent": round((sent - received) / sent * 100, 2),
+                }
+        return {
+            "checks": int(s["checks"]),
+            "uptime_percentage": round(s["up"] / s["checks"] * 100, 2) if s["checks"] else None,
+            "offline_checks": int(s["offline"]),
+            "outages": int(s["outages"]),
+            "latency_ms": {
+                "mean": round(s["lat_sum"] / s["lat_count"], 2) if s["lat_count"] else None,
+                "p50": p50,
+                "p95": p95,
+                "p99": p99,
+            },
+            "mean_abs_delta_ms": round(s["jit_sum"] / s["jit_count"], 2) if s["jit_count"] else None,
+            "loss_percent": round((s["sent"] - s["received"]) / s["sent"] * 100, 2) if s["sent"] else None,
+            "hosts": hosts,
+        }
+
+
+class RollingStatistics:
+    """Thread-safe: ``record`` runs on the monitor worker, ``snapshot`` on UI/API threads."""
+
+    def __init__(self, windows: Sequence[Tuple[str, int]] = WINDOWS):
+        self._windows = {name: _Window(span) for name, span in windows}
+        self._lock = threading.Lock()
+        self._last_rtt: Dict[str, float] = {}
+        self._jitter: Dict[str, float] = {}
+        self._prev_status: Optional[str] = None
+
+    def record(self, status: ConnectionStatus, ping_results: Sequence[PingResult] = ()) -> None:
+        """Fold one check into every window (cost independent of history length)."""
+        now = status.epoch
+        new_outage = status.status == "offline" and self._prev_status != "offline"
+        rtts: List[Tuple[str, bool, Optional[float], Optional[float]]] = []
+        with self._lock:
+            for r in ping_results:
+                delta = None
+                if r.success and r.latency_ms is not None:
+                    prev = self._last_rtt.get(r.host)
+                    if prev is not None:
+                        delta = abs(r.latency_ms - prev)
+                        j = self._jitter.get(r.host, 0.0)
+                        self._jitter[r.host] = j + (delta - j) / 16
+                    self._last_rtt[r.host] = r.latency_ms
+                rtts.append((r.host, r.success, r.latency_ms if r.success else None, delta))
+            self._prev_status = status.status
+
+            for w in self._windows.values():
+                i = w.slot(now)
+                sc = w.scalars
+                sc["checks"][i] += 1
+                if status.status in ("online", "unstable"):
+                    sc["up"][i] += 1
+                else:
+                    sc["offline"][i] += 1
+                if new_outage:
+                    sc["outages"][i] += 1
+                for host, ok, latency, delta in rtts:
+                    sent, received = w.host_rows(host)
+                    sent[i] += 1
+                    sc["sent"][i] += 1
+                    if ok:
+                        received[i] += 1
+                        sc["received"][i] += 1
+                    if latency is not None:
+                        w.sketch[i, _bin(latency)] += 1
+                        sc["lat_count"][i] += 1
+                        sc["lat_sum"][i] += latency
+                    if delta is not None:
+                        sc["jit_count"][i] += 1
+                        sc["jit_sum"][i] += delta
+
+    def snapshot(self, now: Optional[float] = None) -> Dict:
+        """Per-window aggregates plus current RFC 3550 jitter per host."""
+        now = time.time() if now is None else now
+        with self._lock:
+            out: Dict = {name: w.summary(now) for name, w in self._windows.items()}
+            out["jitter_rfc3550_ms"] = {h: round(j, 2) for h, j in self._jitter.items()}
+        return out
+
+    def reset(self) -> None:
+        with self._lock:
+            self._windows = {name: _Window(w.span_s) for name, w in self._windows.items()}
+            self._last_rtt.clear()
+            self._jitter.clear()
+            self._prev_status = None
+
+
+class _HostEntry:
+    __slots__ = (
+        "history", "sent", "received", "consecutive_failures",
+        "last_latency_ms", "last_error", "last_success_epoch",
+    )
+
+    def __init__(self, history_size: int):
+        self.history = HostHistory(history_size)
+        self.sent = 0
+        self.received = 0
+        self.consecutive_failures = 0
+        self.last_latency_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.last_success_epoch: Optional[float] = None
+
+
+class HostStatistics:
+    """Per-target ring history (``history_size`` samples each) plus lifetime counters."""
+
+    def __init__(self, history_size: int = 600):
+        self.history_size = max(1, int(history_size))
+        self._hosts: Dict[str, _HostEntry] = {}
+        self._lock = threading.Lock()
+
+    def record(self, ping_results: Sequence[PingResult]) -> None:
+        with self._lock:
+            for r in ping_results:
+                e = self._hosts.get(r.host)
+                if e is None:
+                    e = self._hosts[r.host] = _HostEntry(self.history_size)
+                e.history.append_result(r)
+                e.sent += 1
+                if r.success:
+                    e.received += 1
+                    e.consecutive_failures = 0
+                    e.last_latency_ms = r.latency_ms
+                    e.last_error = None
+                    e.last_success_epoch = r.epoch
+                else:
+                    e.consecutive_failures += 1
+                    e.last_latency_ms = None
+                    e.last_error = r.error
+
+    def retain(self, hosts: Iterable[str]) -> None:
+        """Drop targets no longer in ``monitoring.ping_hosts`` (keeps memory bounded)."""
+        keep = set(hosts)
+        with self._lock:
+            for host in [h for h in self._hosts if h not in keep]:
+                del self._hosts[host]
+
+    def history(self, host: str, last: Optional[int] = None) -> Optional[Dict[str, np.ndarray]]:
+        """Zero-copy column views (ts, latency_ms, success) for one host, or None."""
+        with self._lock:
+            e = self._hosts.get(host)
+        return e.history.views(last) if e is not None else None
+
+    def summary(self, recent: int = HOST_RECENT_SAMPLES) -> List[Dict]:
+        """One row per host, worst first: failing hosts, then by recent p95 latency."""
+        with self._lock:
+            entries = list(self._hosts.items())
+        rows = []
+        for host, e in entries:
+            cols = e.history.views(recent)
+            lat = cols["latency_ms"]
+            ok = lat[~np.isnan(lat)]
+            n = len(cols["success"])
+            rows.append({
+                "host": host,
+                "last_latency_ms": None if e.last_latency_ms is None else round(e.last_latency_ms, 2),
+                "last_error": e.last_error,
+                "last_success": (
+                    datetime.fromtimestamp(e.last_success_epoch).isoformat()
+                    if e.last_success_epoch is not None else None
+                ),
+                "consecutive_failures": e.consecutive_failures,
+                "sent": e.sent,
+                "received": e.received,
+                "loss_percent": round((e.sent - e.received) / e.sent * 100, 2) if e.sent else None,
+                "recent": {
+                    "samples": n,
+                    "mean_ms": round(float(ok.mean()), 2) if len(ok) else None,
+                    "p95_ms": round(float(np.percentile(ok, 95)), 2) if len(ok) else None,
+                    "max_ms": round(float(ok.max()), 2) if len(ok) else None,
+                    "loss_percent": round((n - int(cols["success"].sum())) / n * 100, 2) if n else None,
+                },
+            })
+        rows.sort(key=lambda r: (
+            -r["consecutive_failures"],
+            -(r["recent"]["loss_percent"] or 0.0),
+            -(r["recent"]["p95_ms"] if r["recent"]["p95_ms"] is not None else math.inf),
+        ))
+        return rows
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hosts.clear()
@@ -14,9 +14,12 @@ from PyQt6.QtWidgets import (
     QGraphicsDropShadowEffect,
     QGridLayout,
     QHBoxLayout,
+    QHeaderView,
     QLabel,
     QMainWindow,
     QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
     QVBoxLayout,
     QWidget,
 )
@@ -35,6 +38,12 @@ GITHUB_STAR_TOOLTIP = (
 
 _matplotlib_canvas = None
 
+# Newest samples drawn in the charts (history itself may hold hours of 1 s samples).
+_CHART_POINTS = 100
+_HOST_COLUMNS = ("Target", "Last", "Mean", "p95", "Loss", "Fails")
+_HISTORY_WINDOW_S = 7 * 24 * 3600
+_HISTORY_REFRESH_S = 60.0
+
 
 class _GitHubStarsBridge(QObject):
     """Carries stargazers_count from worker thread to GUI thread."""
@@ -185,6 +194,9 @@ class EnterpriseDashboard(QMainWindow):
         self._compact_mode = False
         self._github_stars_last_fetch: Optional[float] = None
         self._github_stars_cached: Optional[int] = None
+        self.history_store = None  # HistoryStore (logging.backend sqlite/both), set by the tray app
+        self._history_summary: Optional[dict] = None
+        self._history_summary_ts = 0.0
         theme = config.get("ui", {}).get("theme", "auto")
         self._dark = resolve_theme(theme) == "dark"
         self.setWindowTitle("AMI — Network Monitor")
@@ -390,6 +402,30 @@ class EnterpriseDashboard(QMainWindow):
         cw_lay.addWidget(self.canvas)
         content_layout.addWidget(chart_wrap, 1)
         self._setup_matplotlib_axes()
+
+        hosts_wrap = QWidget()
+        hosts_wrap.setObjectName("HostsShell")
+        hosts_wrap.setAttribute(Qt.WidgetAttribute.WA_StyledBackground, True)
+        hosts_wrap.setStyleSheet(
+            f"QWidget#HostsShell {{ background-color: {cw_bg}; border: none; border-radius: 22px; }}"
+        )
+        hw_lay = QVBoxLayout(hosts_wrap)
+        hw_lay.setContentsMargins(14, 10, 14, 10)
+        self.hosts_table = QTableWidget(0, len(_HOST_COLUMNS))
+        self.hosts_table.setHorizontalHeaderLabels(list(_HOST_COLUMNS))
+        self.hosts_table.verticalHeader().setVisible(False)
+        self.hosts_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.hosts_table.setSelectionMode(QTableWidget.SelectionMode.NoSelection)
+        self.hosts_table.setShowGrid(False)
+        self.hosts_table.setMaximumHeight(170)
+        self.hosts_table.setStyleSheet("QTableWidget { background: transparent; border: none; }")
+        header = self.hosts_table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        for col in range(1, len(_HOST_COLUMNS)):
+            header.setSectionResizeMode(col, QHeaderView.ResizeMode.ResizeToContents)
+        self.hosts_table.setToolTip("Per-target probes, worst first (last 60 samples)")
+        hw_lay.addWidget(self.hosts_table)
+        content_layout.addWidget(hosts_wrap)
         main_layout.addWidget(self.content_widget, 1)
 
         # —— Compact mode (narrow / short window) ——
@@ -740,10 +776,17 @@ class EnterpriseDashboard(QMainWindow):
 
         self._update_compact_chips(status.status)
 
+        window = (statistics.get("windows") or {}).get("1h") or {}
+        p95 = (window.get("latency_ms") or {}).get("p95")
+        delta = window.get("mean_abs_delta_ms")
         if getattr(status, "avg_latency_ms", None) is not None:
             ms = status.avg_latency_ms
             self.card_latency.set_value(f"{ms:.0f} ms")
-            self.card_latency.set_footnote("Round-trip estimate" if ms < 200 else "Elevated delay")
+            if p95 is not None:
+                delta_s = f" · Δ {delta:.1f}" if delta is not None else ""
+                self.card_latency.set_footnote(f"1 h p95 {p95:.0f}{delta_s} ms")
+            else:
+                self.card_latency.set_footnote("Round-trip estimate" if ms < 200 else "Elevated delay")
             self.compact_ping.setText(f"{ms:.0f} ms")
         else:
             self.card_latency.set_value("—")
@@ -754,11 +797,20 @@ class EnterpriseDashboard(QMainWindow):
         if uptime_pct is None:
             uptime_pct = getattr(self.monitor, "get_uptime_percentage", lambda: None)()
         self.card_uptime.set_value(f"{uptime_pct:.1f} %" if uptime_pct is not None else "—")
-        self.card_uptime.set_footnote("Session availability" if uptime_pct is not None else "")
+        history_foot = self._history_footnote()
+        if history_foot:
+            self.card_uptime.set_footnote(history_foot)
+        else:
+            self.card_uptime.set_footnote("Session availability" if uptime_pct is not None else "")
 
         success_pct = (status.successful_pings / status.total_pings * 100) if getattr(status, "total_pings", 0) > 0 else None
         self.card_success.set_value(f"{success_pct:.1f} %" if success_pct is not None else "—")
-        self.card_success.set_footnote("Last probe window" if success_pct is not None else "")
+        loss_1h = window.get("loss_percent")
+        if success_pct is not None and loss_1h is not None:
+            outages = window.get("outages", 0)
+            self.card_success.set_footnote(f"1 h loss {loss_1h:.1f}% · {outages} outage{'s' if outages != 1 else ''}")
+        else:
+            self.card_success.set_footnote("Last probe window" if success_pct is not None else "")
 
         speed_mbps = getattr(status, "speed_mbps", None)
         speed_tier = getattr(status, "speed_tier", None)
@@ -773,7 +825,14 @@ class EnterpriseDashboard(QMainWindow):
             tier_colors = {"fast": "#2dd4bf", "medium": "#fbbf24", "slow": "#fb7185"}
             tier_labels = {"fast": "Fast tier", "medium": "Mid tier", "slow": "Slow tier"}
             self.card_speed.set_accent_color(tier_colors.get(speed_tier, "#94a3b8"))
-            self.card_speed.set_footnote(tier_labels.get(speed_tier, ""))
+            footnote = tier_labels.get(speed_tier, "")
+            upload_mbps = getattr(status, "upload_mbps", None)
+            if upload_mbps is not None:
+                up = f"{upload_mbps / 1000:.2f} Gbps" if upload_mbps >= 1000 else f"{upload_mbps:.0f} Mbps"
+                footnote += f" · ↑ {up}"
+            if getattr(status, "bufferbloat_grade", None) is not None:
+                footnote += f" · Bloat {status.bufferbloat_grade}"
+            self.card_speed.set_footnote(footnote)
             speed_compact += f" · {speed_tier.capitalize()}"
         else:
             self.card_speed.set_value("—")
@@ -790,23 +849,68 @@ class EnterpriseDashboard(QMainWindow):
         )
 
         self.update_graphs()
+        self.update_hosts_table()
+
+    def _history_footnote(self) -> str:
+        """7-day availability / outages from the history store (re-queried at most once a minute)."""
+        store = self.history_store
+        if store is None:
+            return ""
+        now = time.time()
+        if self._history_summary is None or now - self._history_summary_ts >= _HISTORY_REFRESH_S:
+            try:
+                self._history_summary = store.summary(start=now - _HISTORY_WINDOW_S, end=now)
+            except Exception:
+                self._history_summary = None
+            self._history_summary_ts = now
+        summary = self._history_summary or {}
+        avail = summary.get("availability_percent")
+        if avail is None:
+            return ""
+        outages = summary.get("outages", 0)
+        return f"7 d {avail:.2f}% · {outages} outage{'s' if outages != 1 else ''}"
+
+    def update_hosts_table(self) -> None:
+        get_rows = getattr(self.monitor, "get_host_statistics", None)
+        rows = get_rows() if get_rows else []
+
+        def ms(v) -> str:
+            return f"{v:.0f} ms" if v is not None else "—"
+
+        self.hosts_table.setRowCount(len(rows))
+        for i, r in enumerate(rows):
+            recent = r["recent"]
+            loss = recent["loss_percent"]
+            cells = (
+                r["host"],
+                ms(r["last_latency_ms"]),
+                ms(recent["mean_ms"]),
+                ms(recent["p95_ms"]),
+                f"{loss:.0f} %" if loss is not None else "—",
+                str(r["consecutive_failures"]),
+            )
+            for col, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                if r["consecutive_failures"]:
+                    item.setForeground(QColor("#fb7185"))
+                if col == 0 and r["last_error"]:
+                    item.setToolTip(r["last_error"])
+                self.hosts_table.setItem(i, col, item)
 
     def update_graphs(self) -> None:
-        history = getattr(self.monitor, "status_history", [])
-        if not history:
+        history = getattr(self.monitor, "status_history", None)
+        if history is None or not len(history):
             return
-        status_values = [{"online": 2, "unstable": 1, "offline": 0}.get(h.status, 0) for h in history]
-        latencies = [h.avg_latency_ms if h.avg_latency_ms else 0 for h in history]
-        idx = np.arange(len(history), dtype=float)
-        sv = np.array(status_values, dtype=float)
-        lat = np.array(latencies, dtype=float)
-        c_on = self._chart_colors["on"]
-        colors = [
-            c_on if v == 2 else self._chart_colors["unstable"] if v == 1 else self._chart_colors["off"]
-            for v in status_values
-        ]
+        cols = history.views(last=_CHART_POINTS)
+        sv = cols["status"]
+        lat = np.nan_to_num(cols["latency_ms"], nan=0.0)
+        idx = np.arange(len(sv), dtype=float)
+        palette = np.array(
+            [self._chart_colors["off"], self._chart_colors["unstable"], self._chart_colors["on"]],
+            dtype=object,
+        )
         self._scatter1.set_offsets(np.c_[idx, sv])
-        self._scatter1.set_facecolors(colors)
+        self._scatter1.set_facecolors(list(palette[sv]))
         self._line1.set_data(idx, sv)
         self._line2.set_data(idx, lat)
         if self._fill2 is not None:
@@ -206,6 +206,52 @@ class SettingsDialog(QDialog):
         self.speed_test_size_mb.setSuffix(" MB")
         self.speed_test_size_mb.setToolTip("Timed download size after warmup (total traffic = warmup + this).")
         layout.addRow("Timed download size:", self.speed_test_size_mb)
+        self.speed_test_adaptive = QCheckBox("Adaptive size (stop when the rate is stable)")
+        self.speed_test_adaptive.setChecked(bool(st.get("adaptive", False)))
+        self.speed_test_adaptive.setToolTip(
+            "Ignore the timed download size: stop once the measured rate converges, "
+            "or at the time / data limits below."
+        )
+        layout.addRow("", self.speed_test_adaptive)
+        self.speed_test_max_seconds = QSpinBox()
+        self.speed_test_max_seconds.setRange(1, 60)
+        self.speed_test_max_seconds.setValue(int(st.get("max_seconds", 10)))
+        self.speed_test_max_seconds.setSuffix(" s")
+        layout.addRow("Adaptive time limit:", self.speed_test_max_seconds)
+        self.speed_test_max_mb = QDoubleSpinBox()
+        self.speed_test_max_mb.setRange(1, 1000)
+        self.speed_test_max_mb.setDecimals(0)
+        self.speed_test_max_mb.setValue(float(st.get("max_mb", 80)))
+        self.speed_test_max_mb.setSuffix(" MB")
+        self.speed_test_max_mb.setToolTip("Most data one adaptive download may time (test URL must serve warmup + this).")
+        layout.addRow("Adaptive data limit:", self.speed_test_max_mb)
+        self.speed_test_streams = QSpinBox()
+        self.speed_test_streams.setRange(1, 16)
+        self.speed_test_streams.setValue(int(st.get("streams", 4)))
+        self.speed_test_streams.setToolTip(
+            "Parallel connections sharing the same warmup + download budget. "
+            "One TCP stream rarely fills a 1 Gbps+ link."
+        )
+        layout.addRow("Parallel streams:", self.speed_test_streams)
+        self.speed_test_upload_url = QLineEdit(st.get("upload_url", "https://speed.cloudflare.com/__up"))
+        self.speed_test_upload_url.setPlaceholderText("Endpoint accepting POST (body is discarded)")
+        layout.addRow("Upload URL:", self.speed_test_upload_url)
+        self.speed_test_upload_mb = QDoubleSpinBox()
+        self.speed_test_upload_mb.setRange(0, 50)
+        self.speed_test_upload_mb.setDecimals(1)
+        self.speed_test_upload_mb.setValue(float(st.get("upload_size_mb", 5)))
+        self.speed_test_upload_mb.setSuffix(" MB")
+        self.speed_test_upload_mb.setToolTip(
+            "Timed upload size after the download (warmup applies too). 0 disables the upload test."
+        )
+        layout.addRow("Timed upload size:", self.speed_test_upload_mb)
+        self.speed_test_loaded_latency = QCheckBox("Measure latency under load (bufferbloat)")
+        self.speed_test_loaded_latency.setChecked(bool(st.get("latency_under_load", True)))
+        self.speed_test_loaded_latency.setToolTip(
+            "Probe the monitored hosts every 100 ms (ICMP, else TCP connect) before and during the test "
+            "and grade the latency increase."
+        )
+        layout.addRow("", self.speed_test_loaded_latency)
         self.speed_test_tier_low = QSpinBox()
         self.speed_test_tier_low.setRange(1, 10000)
         self.speed_test_tier_low.setValue(int(st.get("tier_low_mbps", 100)))
@@ -282,6 +328,13 @@ class SettingsDialog(QDialog):
         cfg["speed_test"]["test_url"] = self.speed_test_url.text().strip()
         cfg["speed_test"]["download_size_mb"] = float(self.speed_test_size_mb.value())
         cfg["speed_test"]["warmup_mb"] = float(self.speed_test_warmup_mb.value())
+        cfg["speed_test"]["adaptive"] = bool(self.speed_test_adaptive.isChecked())
+        cfg["speed_test"]["max_seconds"] = int(self.speed_test_max_seconds.value())
+        cfg["speed_test"]["max_mb"] = float(self.speed_test_max_mb.value())
+        cfg["speed_test"]["streams"] = int(self.speed_test_streams.value())
+        cfg["speed_test"]["upload_url"] = self.speed_test_upload_url.text().strip()
+        cfg["speed_test"]["upload_size_mb"] = float(self.speed_test_upload_mb.value())
+        cfg["speed_test"]["latency_under_load"] = bool(self.speed_test_loaded_latency.isChecked())
         cfg["speed_test"]["tier_low_mbps"] = int(self.speed_test_tier_low.value())
         cfg["speed_test"]["tier_high_mbps"] = int(self.speed_test_tier_high.value())
         cfg.setdefault("ui", {})
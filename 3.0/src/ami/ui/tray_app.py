@@ -8,6 +8,7 @@ import sys
 import threading
 import time
 from pathlib import Path
+from typing import Optional
 
 from PyQt6.QtCore import QObject, QTimer, Qt, QThread, pyqtSignal
 from PyQt6.QtGui import QAction, QColor, QCursor, QIcon, QImage, QPainter, QPixmap
@@ -22,10 +23,11 @@ from ami import __version__
 from ami.core.config import get_config_path_for_ui, load_config, save_config
 from ami.core.paths import get_base_path, get_user_data_dir
 from ami.services.api_server import APIServer
+from ami.services.log_writer import AsyncLogWriter
 from ami.services.logger import EventLogger
 from ami.services.network_monitor import NetworkMonitor
 from ami.services.notifier import Notifier
-from ami.services.speed_test import run_speed_test
+from ami.services.speed_test import measure_speed
 from ami.services.updater import UpdateManager
 from ami.ui.compact_status import CompactStatusWindow
 from ami.ui.settings_dialog import SettingsDialog
@@ -99,6 +101,17 @@ def _effective_app_version(config: dict) -> str:
         return __version__
 
 
+def _speed_text(download_mbps: float, upload_mbps: Optional[float] = None) -> str:
+    """"850 Mbps", "1.20 Gbps", with " ↑ 40 Mbps" when an upload result exists."""
+    def fmt(mbps: float) -> str:
+        return f"{mbps / 1000:.2f} Gbps" if mbps >= 1000 else f"{mbps:.0f} Mbps"
+
+    text = fmt(download_mbps)
+    if upload_mbps is not None:
+        text += f" ↑ {fmt(upload_mbps)}"
+    return text
+
+
 class _SpeedTestDoneBridge(QObject):
     """Emit from background thread; slot runs on GUI thread (QueuedConnection)."""
 
@@ -226,6 +239,13 @@ class SystemTrayApp:
         splash_msg("Starting logger...")
         self.app.processEvents()
         self.logger = EventLogger(self.config)
+        log_cfg = self.config["logging"]
+        # Disk I/O (appends, rotation) runs on the writer thread, never on the GUI thread.
+        self.log_writer = AsyncLogWriter(
+            lambda status: self.logger.log_status(status),
+            max_queue=log_cfg.get("queue_size", 1000),
+            policy=log_cfg.get("overflow_policy", "drop_oldest"),
+        )
         splash_msg("Preparing notifications...")
         self.app.processEvents()
         self.notifier = Notifier(self.config)
@@ -233,6 +253,8 @@ class SystemTrayApp:
         splash_msg("Starting API server...")
         self.app.processEvents()
         self.api_server = APIServer(self.config, self.monitor)
+        self.api_server.log_writer = self.log_writer
+        self.api_server.history_store = self.logger.store
         self.current_status = None
         self.monitor_thread = None
         splash_msg("Finalizing...")
@@ -355,6 +377,8 @@ class SystemTrayApp:
         self.config = new_config
         mon = self.monitor
         mon.hosts = new_config["monitoring"]["ping_hosts"]
+        mon.host_stats.retain(mon.hosts)
+        mon.metrics.retain(mon.hosts)
         mon.http_test_url = new_config["monitoring"].get("http_test_url", mon.http_test_url)
         mon.http_test_urls = new_config["monitoring"].get("http_test_urls") or []
         mon.timeout = new_config["monitoring"]["timeout"]
@@ -374,14 +398,25 @@ class SystemTrayApp:
         n.notify_on_disconnect = nc.get("notify_on_disconnect", n.notify_on_disconnect)
         n.notify_on_reconnect = nc.get("notify_on_reconnect", n.notify_on_reconnect)
         n.notify_on_unstable = nc.get("notify_on_unstable", n.notify_on_unstable)
+        # Build the new logger first, so a failure keeps the old one; records already queued
+        # go to the new one. The old one is closed on the writer thread, after any record it is
+        # still writing, so the GUI thread never waits on its disk I/O.
         try:
-            self.logger = EventLogger(new_config)
-        except Exception:
-            pass
+            logger = EventLogger(new_config)
+        except Exception as e:
+            print(f"Error reloading logger: {e}")
+        else:
+            old, self.logger = self.logger, logger
+            self.log_writer.call(old.close)
+        self.api_server.history_store = self.logger.store
+        if self.dashboard:
+            self.dashboard.history_store = self.logger.store
         self.api_server.stop()
         self.api_server.enabled = new_config["api"].get("enabled", False)
         self.api_server.port = new_config["api"].get("port", 7212)
         self.api_server.auth_token = (new_config["api"].get("auth_token") or "").strip()
+        self.api_server.threaded = new_config["api"].get("threaded", True)
+        self.api_server.events.max_subscribers = max(1, int(new_config["api"].get("max_stream_clients", 32)))
         self.api_server.start()
         use_compact = _effective_compact_status_window(new_config)
         if use_compact and not getattr(self, "compact_status", None):
@@ -645,12 +680,11 @@ class SystemTrayApp:
         speed_mbps = getattr(status, "speed_mbps", None)
         speed_tier = getattr(status, "speed_tier", None)
         if speed_tier is not None and speed_mbps is not None:
-            if speed_mbps >= 1000:
-                parts.append(f"Speed: {speed_mbps / 1000:.2f} Gbps ({speed_tier.capitalize()})")
-            else:
-                parts.append(f"Speed: {speed_mbps:.0f} Mbps ({speed_tier.capitalize()})")
+            parts.append(f"Speed: {_speed_text(speed_mbps, getattr(status, 'upload_mbps', None))} ({speed_tier.capitalize()})")
         else:
             parts.append("Speed: —")
+        if getattr(status, "bufferbloat_grade", None) is not None:
+            parts.append(f"Under load: {status.loaded_latency_ms:.0f}ms (bufferbloat {status.bufferbloat_grade})")
         self.tray_icon.setToolTip("\n".join(parts))
 
     def update_menu_info(self, status) -> None:
@@ -668,10 +702,8 @@ class SystemTrayApp:
         speed_mbps = getattr(status, "speed_mbps", None)
         speed_tier = getattr(status, "speed_tier", None)
         if speed_tier is not None and speed_mbps is not None:
-            if speed_mbps >= 1000:
-                self.speed_action.setText(f"Speed: {speed_mbps / 1000:.2f} Gbps ({speed_tier.capitalize()})")
-            else:
-                self.speed_action.setText(f"Speed: {speed_mbps:.0f} Mbps ({speed_tier.capitalize()})")
+            speed = _speed_text(speed_mbps, getattr(status, "upload_mbps", None))
+            self.speed_action.setText(f"Speed: {speed} ({speed_tier.capitalize()})")
         else:
             self.speed_action.setText("Speed: —")
 
@@ -706,7 +738,8 @@ class SystemTrayApp:
         self.update_icon(status.status)
         self.update_tooltip(status)
         self.update_menu_info(status)
-        self.logger.log_status(status)
+        self.log_writer.submit(status)
+        self.api_server.publish(status)
         self.notifier.notify_status_change(status)
         if self.dashboard and self.dashboard.isVisible():
             self.dashboard.update_data(status, self.monitor.get_statistics())
@@ -729,7 +762,7 @@ class SystemTrayApp:
             return
         self.tray_icon.showMessage(
             "AMI",
-            "Running download speed test…",
+            "Running speed test…",
             QSystemTrayIcon.MessageIcon.Information,
             2000,
         )
@@ -752,13 +785,36 @@ class SystemTrayApp:
         timeout = int(st_cfg.get("timeout_seconds", 30))
         low = float(st_cfg.get("tier_low_mbps", 100))
         high = float(st_cfg.get("tier_high_mbps", 1000))
+        streams = int(st_cfg.get("streams", 4))
+        upload_url = (st_cfg.get("upload_url") or "").strip() or None
+        upload_mb = float(st_cfg.get("upload_size_mb", 0))
+        adaptive = bool(st_cfg.get("adaptive", False))
+        max_seconds = float(st_cfg.get("max_seconds", 10))
+        max_mb = float(st_cfg.get("max_mb", 80))
+        ci_percent = float(st_cfg.get("ci_percent", 5))
         monitor = self.monitor
         bridge = self._speed_test_bridge
+        probe = None
+        if st_cfg.get("latency_under_load", True):
+            probe = monitor.load_latency_probe(float(st_cfg.get("latency_probe_interval_ms", 100)))
 
         def run() -> None:
             try:
-                mbps, tier = run_speed_test(url, size_mb, timeout, low, high, warmup_mb=warmup_mb)
-                monitor.set_speed_result(mbps, tier)
+                if probe is not None:
+                    probe.start()
+                try:
+                    result = measure_speed(
+                        url, size_mb, timeout, low, high,
+                        warmup_mb=warmup_mb, pool=monitor.http_pool, streams=streams,
+                        upload_url=upload_url, upload_size_mb=upload_mb,
+                        on_phase=probe.set_phase if probe is not None else None,
+                        adaptive=adaptive, max_seconds=max_seconds, max_mb=max_mb, ci_percent=ci_percent,
+                    )
+                finally:
+                    latency = probe.stop() if probe is not None else None
+                if result is not None:
+                    result.latency = latency
+                monitor.set_speed_test(result)
             finally:
                 bridge.finished.emit()
 
@@ -782,6 +838,7 @@ class SystemTrayApp:
         if self.dashboard is None:
             from ami.ui.dashboard import EnterpriseDashboard
             self.dashboard = EnterpriseDashboard(self.config, self.monitor, self.tray_icon)
+            self.dashboard.history_store = self.logger.store
         if self.current_status:
             self.dashboard.update_data(self.current_status, self.monitor.get_statistics())
         self.dashboard.show()
@@ -885,6 +942,9 @@ class SystemTrayApp:
                 pass
             self.monitor_thread = None
         self.api_server.stop()
+        self.monitor.close()
+        self.log_writer.close()
+        self.logger.close()
         self.tray_icon.hide()
         if getattr(self, "compact_status", None):
             self.compact_status.close()
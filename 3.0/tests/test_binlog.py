@@ -0,0 +1,139 @@
+"""Binary status log: writer -> memmap reader round-trip, partial records, rotation, CSV conversion."""
+
+import csv
+import math
+import os
+import time
+
+import numpy as np
+import pytest
+
+from ami.core.history import STATUS_CODES
+from ami.core.models import ConnectionStatus
+from ami.services.binlog import (
+    FLAG_HTTP_OK,
+    FLAG_INTERNET_OK,
+    FLAG_LOCAL_OK,
+    HEADER_SIZE,
+    RECORD_SIZE,
+    BinaryLogError,
+    BinaryLogWriter,
+    convert_csv,
+    read_records,
+    record_rows,
+)
+
+
+def _statuses(n, t0=None):
+    t0 = time.time() - n if t0 is None else t0
+    out = []
+    for i in range(n):
+        offline = i % 5 == 4
+        out.append(ConnectionStatus(
+            status="offline" if offline else ("unstable" if i % 5 == 3 else "online"),
+            avg_latency_ms=None if offline else 10.0 + i * 0.25,
+            successful_pings=0 if offline else 3,
+            total_pings=3,
+            local_network_ok=True,
+            internet_ok=not offline,
+            http_test_ok=not offline,
+            speed_mbps=250.5 if i == 0 else None,
+            wall=t0 + i,
+        ))
+    return out
+
+
+def _write(path, statuses, **kwargs):
+    writer = BinaryLogWriter(str(path), flush_interval_s=1e9, flush_max_rows=1000, **kwargs)
+    for s in statuses:
+        writer.add(s)
+    writer.close()
+
+
+def test_round_trip_through_memmap(tmp_path):
+    path = tmp_path / "ami.bin"
+    statuses = _statuses(20)
+    _write(path, statuses)
+    assert os.path.getsize(path) == HEADER_SIZE + 20 * RECORD_SIZE
+
+    rec = read_records(str(path))
+    assert len(rec) == 20
+    assert np.array_equal(rec["ts"], [s.epoch for s in statuses])
+    assert list(rec["status"]) == [STATUS_CODES[s.status] for s in statuses]
+    for r, s in zip(rec, statuses):
+        if s.avg_latency_ms is None:
+            assert math.isnan(r["latency_ms"])
+        else:
+            assert r["latency_ms"] == pytest.approx(s.avg_latency_ms, rel=1e-6)
+        assert bool(r["flags"] & FLAG_LOCAL_OK) == s.local_network_ok
+        assert bool(r["flags"] & FLAG_INTERNET_OK) == s.internet_ok
+        assert bool(r["flags"] & FLAG_HTTP_OK) == s.http_test_ok
+    assert rec["speed_mbps"][0] == pytest.approx(250.5)
+    assert math.isnan(rec["speed_mbps"][1])
+
+    last = read_records(str(path), last=3)
+    assert np.array_equal(last["ts"], rec["ts"][-3:])
+
+
+def test_partial_record_is_ignored_then_truncated_on_reopen(tmp_path):
+    path = tmp_path / "ami.bin"
+    statuses = _statuses(6)
+    _write(path, statuses[:5])
+    with open(path, "ab") as f:
+        f.write(b"\x01" * (RECORD_SIZE // 2))  # interrupted write
+    assert len(read_records(str(path))) == 5
+
+    _write(path, statuses[5:])
+    assert os.path.getsize(path) == HEADER_SIZE + 6 * RECORD_SIZE
+    assert np.array_equal(read_records(str(path))["ts"], [s.epoch for s in statuses])
+
+
+def test_foreign_file_is_rejected(tmp_path):
+    path = tmp_path / "ami.bin"
+    path.write_bytes(b"Timestamp,Status\n" + b"x" * 64)
+    with pytest.raises(BinaryLogError):
+        read_records(str(path))
+
+
+def test_rotation_hands_the_full_file_to_on_rotate(tmp_path):
+    path = tmp_path / "ami.bin"
+    rotated = []
+
+    def on_rotate(p):
+        dest = f"{p}.{len(rotated) + 1}"
+        os.replace(p, dest)
+        rotated.append(dest)
+
+    statuses = _statuses(30)
+    writer = BinaryLogWriter(
+        str(path), flush_interval_s=1e9, flush_max_rows=10,
+        max_bytes=HEADER_SIZE + 12 * RECORD_SIZE, on_rotate=on_rotate,
+    )
+    for s in statuses:
+        writer.add(s)
+    writer.close()
+
+    assert len(rotated) == 2
+    parts = [read_records(p)["ts"] for p in rotated] + [read_records(str(path))["ts"]]
+    assert [len(p) for p in parts] == [10, 10, 10]
+    assert np.array_equal(np.concatenate(parts), [s.epoch for s in statuses])
+
+
+def test_csv_conversion_matches_the_csv_rows(tmp_path):
+    src = tmp_path / "ami.bin"
+    statuses = _statuses(12, t0=float(int(time.time()) - 100))  # whole seconds: CSV has no fraction
+    _write(src, statuses)
+    rows = record_rows(read_records(str(src)))
+
+    csv_path = tmp_path / "ami.csv"
+    with open(csv_path, "w", encoding="utf-8", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=list(rows[0]))
+        w.writeheader()
+        w.writerows(rows)
+        w.writerow(dict(rows[0], Timestamp="not a time"))  # malformed: skipped
+
+    out = tmp_path / "converted.bin"
+    assert convert_csv(str(csv_path), str(out)) == 12
+    converted = read_records(str(out))
+    assert record_rows(converted) == rows
+    assert np.array_equal(converted["ts"], [s.epoch for s in statuses])
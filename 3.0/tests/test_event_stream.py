@@ -0,0 +1,89 @@
+"""EventHub: long-poll wake-up and timeout, lagging readers, subscriber limit, close()."""
+
+import json
+import threading
+import time
+
+from ami.services.event_stream import EventHub
+
+
+def _ids(events):
+    return [ev.seq for ev in events]
+
+
+def test_long_poll_wakes_on_publish():
+    hub = EventHub()
+    got = []
+    t = threading.Thread(target=lambda: got.append(hub.wait(0, timeout=5)))
+    t.start()
+    time.sleep(0.05)
+    assert t.is_alive()
+    seq = hub.publish("status", {"status": "online"})
+    t.join(5)
+    events, cursor, lagged = got[0]
+    assert (_ids(events), cursor, lagged) == ([seq], seq, False)
+    assert json.loads(events[0].json) == {"id": seq, "event": "status", "data": {"status": "online"}}
+    assert events[0].sse == f'id: {seq}\nevent: status\ndata: {{"status":"online"}}\n\n'.encode()
+
+
+def test_long_poll_timeout_keeps_the_cursor():
+    hub = EventHub()
+    hub.publish("status", {"n": 1})
+    t0 = time.monotonic()
+    events, cursor, lagged = hub.wait(1, timeout=0.1)
+    assert time.monotonic() - t0 >= 0.09
+    assert (events, cursor, lagged) == ([], 1, False)
+
+
+def test_reader_within_the_ring_gets_every_event_in_order():
+    hub = EventHub(backlog=8)
+    for i in range(5):
+        hub.publish("status" if i % 2 else "speed", {"n": i})
+    events, cursor, lagged = hub.wait(2, timeout=0)
+    assert (_ids(events), cursor, lagged) == ([3, 4, 5], 5, False)
+
+
+def test_lagging_reader_gets_newest_event_per_kind():
+    hub = EventHub(backlog=4)
+    for i in range(10):
+        hub.publish("speed" if i == 6 else "status", {"n": i})
+    # Ring holds 7..10; a reader at 2 missed 3..6 and is told so.
+    events, cursor, lagged = hub.wait(2, timeout=0)
+    assert lagged is True and cursor == 10
+    assert [(ev.kind, ev.seq) for ev in events] == [("speed", 7), ("status", 10)]
+    assert hub.stats()["lagged"] == 1
+    # Having caught up, the next read is normal again.
+    hub.publish("status", {"n": 10})
+    events, cursor, lagged = hub.wait(cursor, timeout=0)
+    assert (_ids(events), cursor, lagged) == ([11], 11, False)
+
+
+def test_cursor_from_before_a_restart_starts_over():
+    hub = EventHub()
+    hub.publish("status", {"n": 0})
+    events, cursor, _ = hub.wait(500, timeout=0)
+    assert (_ids(events), cursor) == ([1], 1)
+
+
+def test_subscriber_limit():
+    hub = EventHub(max_subscribers=2)
+    assert hub.subscribe() and hub.subscribe()
+    assert hub.subscribe() is False
+    hub.unsubscribe(disconnected=True)
+    assert hub.subscribe() is True
+    stats = hub.stats()
+    assert (stats["subscribers"], stats["rejected"], stats["disconnected"]) == (2, 1, 1)
+
+
+def test_close_releases_blocked_readers():
+    hub = EventHub()
+    generation = hub.generation
+    got = []
+    t = threading.Thread(target=lambda: got.append(hub.wait(0, timeout=10, generation=generation)))
+    t.start()
+    time.sleep(0.05)
+    t0 = time.monotonic()
+    hub.close()
+    t.join(5)
+    assert time.monotonic() - t0 < 1
+    assert got == [([], 0, False)]
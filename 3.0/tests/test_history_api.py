@@ -0,0 +1,66 @@
+"""/history over HTTP: bad time ranges are a 400, cursor pages end."""
+
+import time
+
+import pytest
+import requests
+
+from ami.core.models import ConnectionStatus
+from ami.services.api_server import APIServer
+from ami.services.history_store import HistoryStore
+
+
+@pytest.fixture(scope="module")
+def api(tmp_path_factory):
+    store = HistoryStore(
+        str(tmp_path_factory.mktemp("api") / "history.db"), flush_interval_s=1e9, compact_interval_s=1e9
+    )
+    now = time.time()
+    for i in range(60):
+        store.add(ConnectionStatus(
+            status="online", avg_latency_ms=20.0, successful_pings=3, total_pings=3, wall=now - 600 + i * 10,
+        ))
+    store.flush()
+    server = APIServer({"api": {"enabled": True, "port": 0, "threaded": True}}, None)
+    server.history_store = store
+    server.start()
+    yield f"http://127.0.0.1:{server.server.server_address[1]}"
+    server.server.shutdown()
+    server.server.server_close()
+    store.close()
+
+
+@pytest.mark.parametrize("query", [
+    "step=60&from=inf",
+    "step=60&from=-inf",
+    "step=60&to=inf",
+    "step=60&from=nan",
+    "step=60&since=inf",
+    "from=inf",
+    "to=-inf",
+])
+def test_non_finite_range_is_rejected(api, query):
+    r = requests.get(f"{api}/history?{query}", timeout=5)
+    assert r.status_code == 400
+    assert "error" in r.json()
+
+
+def test_forged_cursor_with_infinite_end_is_rejected(api):
+    from ami.services.history_query import encode_cursor
+
+    r = requests.get(f"{api}/history", params={"cursor": encode_cursor(0.0, float("inf"), 60.0, None)}, timeout=5)
+    assert r.status_code == 400
+
+
+def test_cursor_pages_end_and_cover_every_sample(api):
+    params = {"step": "60", "since": "900", "limit": "4"}
+    total, pages = 0.0, 0
+    while True:
+        body = requests.get(f"{api}/history", params=params, timeout=5).json()
+        total += sum(b["samples"] for b in body["buckets"])
+        pages += 1
+        if body["next_cursor"] is None:
+            break
+        params = {"cursor": body["next_cursor"]}
+        assert pages < 10
+    assert round(total) == 60
@@ -0,0 +1,72 @@
+"""HistoryStore.series + history_query.bucketize: tier hand-over must not lose or double-count samples."""
+
+import math
+import time
+
+from ami.core.models import ConnectionStatus
+from ami.services.history_query import bucketize, concat, from_rollup_rows, from_sample_rows
+from ami.services.history_store import HistoryStore
+
+DAYS = 3
+STEP_S = 10
+SAMPLES = DAYS * 86400 // STEP_S
+
+
+def _store(tmp_path):
+    store = HistoryStore(
+        str(tmp_path / "history.db"),
+        flush_max_rows=10_000,
+        flush_interval_s=1e9,
+        compact_interval_s=1e9,
+        raw_retention_s=86400,
+        retention_s={"1m": 2 * 86400},
+    )
+    now = time.time()
+    mono_now = time.monotonic()
+    first = now - DAYS * 86400 + 7.5  # not aligned to a minute or an hour
+    for i in range(SAMPLES):
+        epoch = first + i * STEP_S
+        store.add(ConnectionStatus(
+            status="online", avg_latency_ms=20.0, successful_pings=3, total_pings=3,
+            ts=mono_now - (now - epoch),
+            wall=epoch,
+        ))
+    store.flush()
+    while any(store.compact(now + 3600).values()):
+        pass
+    return store, first, now
+
+
+def _partials(series):
+    return concat([
+        from_rollup_rows(series.get("1h", [])),
+        from_rollup_rows(series.get("1m", [])),
+        from_sample_rows(series.get("raw", [])),
+    ])
+
+
+def test_series_covers_every_sample_from_unaligned_start(tmp_path):
+    store, first, now = _store(tmp_path)
+    try:
+        series = store.series(first, now)
+        assert set(series) == {"raw", "1m", "1h"}
+        buckets = bucketize(_partials(series), first, now, 300)
+        assert round(sum(b["samples"] for b in buckets)) == SAMPLES
+    finally:
+        store.close()
+
+
+def test_paged_series_counts_each_sample_once(tmp_path):
+    store, first, now = _store(tmp_path)
+    try:
+        step = 300
+        start = math.floor(first / step) * step
+        total, page_start, straddle = 0.0, start, True
+        while page_start < now:
+            page_end = min(now, page_start + 100 * step)
+            partials = _partials(store.series(page_start, page_end, straddle=straddle))
+            total += sum(b["samples"] for b in bucketize(partials, page_start, page_end, step))
+            page_start, straddle = page_end, False
+        assert round(total) == SAMPLES
+    finally:
+        store.close()
@@ -0,0 +1,55 @@
+"""LoadLatencyProbe: per-phase medians and the bufferbloat grade, with a scripted RTT source."""
+
+import time
+
+import pytest
+
+from ami.core.models import PingResult
+from ami.services.load_latency import LoadLatencyProbe, grade
+from ami.services.probe_engine import ProbeEngine
+
+RTT_MS = {"idle": 10.0, "download": 60.0, "upload": 250.0}
+
+
+@pytest.mark.parametrize(
+    "increase, expected",
+    [(0, "A+"), (4.9, "A+"), (5, "A"), (29.9, "A"), (30, "B"), (60, "C"), (199, "C"), (200, "D"), (400, "F")],
+)
+def test_grade_scale(increase, expected):
+    assert grade(increase) == expected
+
+
+@pytest.fixture
+def engine():
+    eng = ProbeEngine()
+    yield eng
+    eng.stop()
+
+
+def test_probe_reports_phase_medians_and_grade(engine):
+    probe = LoadLatencyProbe(engine, ["h1", "h2"], interval_s=0.02, timeout_s=0.5)
+
+    async def rtt(host, timeout):
+        if host == "h2" and probe._phase == "upload":
+            return PingResult(host=host, success=False, error="timeout"), "tcp"
+        return PingResult(host=host, success=True, latency_ms=RTT_MS[probe._phase or "idle"]), "tcp"
+
+    engine.rtt = rtt
+    probe.start(idle_s=0.2)
+    probe.set_phase("download")
+    time.sleep(0.2)
+    probe.set_phase("upload")
+    time.sleep(0.2)
+    out = probe.stop()
+
+    assert out.method == "tcp"
+    assert (out.idle_ms, out.download_ms, out.upload_ms) == (10.0, 60.0, 250.0)
+    assert out.increase_ms == 240.0 and out.grade == "D"
+    assert all(out.samples[p] > 0 for p in RTT_MS)
+    assert out.lost["upload"] > 0 and out.lost["idle"] == 0
+
+
+def test_probe_without_hosts_has_no_summary(engine):
+    probe = LoadLatencyProbe(engine, [])
+    probe.start(idle_s=0)
+    assert probe.stop() is None
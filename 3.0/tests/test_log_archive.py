@@ -0,0 +1,67 @@
+"""LogArchiver: pruning removes every form of an archive; limits of 0 (migrated configs) keep all."""
+
+import csv
+import gzip
+
+from ami.core.config import DEFAULT_CONFIG, _migrate_from_2x
+from ami.services.log_archive import LogArchiver, iter_log_records, list_archives
+
+HEADER = ["Timestamp", "Status"]
+
+
+def _write_bak(log, stamp, rows, gz_copy=False):
+    path = log.parent / f"{log.name}.{stamp}.bak"
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(HEADER)
+        w.writerows(rows)
+    if gz_copy:  # compressed before a crash, original not yet removed
+        with open(path, "rb") as fin, gzip.open(str(path) + ".gz", "wb") as fout:
+            fout.write(fin.read())
+    return path
+
+
+def _archives(log):
+    return sorted(p.name for p in log.parent.iterdir() if p.name != log.name)
+
+
+def test_prune_removes_bak_and_compressed_copy_together(tmp_path):
+    log = tmp_path / "ami_log.csv"
+    _write_bak(log, "20260101_000000", [["2026-01-01 00:00:00", "online"]], gz_copy=True)
+    _write_bak(log, "20260102_000000", [["2026-01-02 00:00:00", "online"]])
+    _write_bak(log, "20260103_000000", [["2026-01-03 00:00:00", "offline"]])
+
+    LogArchiver(str(log), compression="none", max_archives=2, max_bytes=0).close()
+
+    assert _archives(log) == ["ami_log.csv.20260102_000000.bak", "ami_log.csv.20260103_000000.bak"]
+
+
+def test_byte_budget_counts_every_form(tmp_path):
+    log = tmp_path / "ami_log.csv"
+    rows = [["2026-01-01 00:00:00", "online"]] * 200
+    old = _write_bak(log, "20260101_000000", rows, gz_copy=True)
+    new = _write_bak(log, "20260102_000000", rows)
+    budget = new.stat().st_size + old.stat().st_size  # fits both .bak, not the extra .gz
+
+    LogArchiver(str(log), compression="none", max_archives=0, max_bytes=budget).close()
+
+    assert _archives(log) == ["ami_log.csv.20260102_000000.bak"]
+
+
+def test_no_limits_keep_every_archive_and_compress_it(tmp_path):
+    log = tmp_path / "ami_log.csv"
+    for day in range(1, 13):
+        _write_bak(log, f"202601{day:02d}_000000", [[f"2026-01-{day:02d} 00:00:00", "online"]])
+
+    LogArchiver(str(log), compression="gzip", max_archives=0, max_bytes=0).close()
+
+    archives = list_archives(str(log))
+    assert len(archives) == 12 and all(p.name.endswith(".bak.gz") for p in archives)
+    days = [r["Timestamp"][:10] for r in iter_log_records(str(log))]
+    assert days == [f"2026-01-{d:02d}" for d in range(1, 13)]
+
+
+def test_migrated_configs_do_not_prune_new_installs_do():
+    migrated = _migrate_from_2x({"logging": {"log_file": "ami_log.csv"}})["logging"]
+    assert (migrated["max_archives"], migrated["max_archive_mb"]) == (0, 0)
+    assert (DEFAULT_CONFIG["logging"]["max_archives"], DEFAULT_CONFIG["logging"]["max_archive_mb"]) == (10, 50)
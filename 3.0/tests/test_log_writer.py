@@ -0,0 +1,140 @@
+"""AsyncLogWriter: overflow policies while the sink is stuck, drain and close."""
+
+import threading
+
+from ami.services.log_writer import AsyncLogWriter
+
+
+class _GatedSink:
+    """Blocks inside the first call until ``gate`` is set, so the queue can be filled."""
+
+    def __init__(self, fail_on=()):
+        self.gate = threading.Event()
+        self.entered = threading.Event()
+        self.records = []
+        self.fail_on = set(fail_on)
+
+    def __call__(self, record):
+        self.entered.set()
+        self.gate.wait(5)
+        if record in self.fail_on:
+            raise OSError("disk full")
+        self.records.append(record)
+
+
+def _stuck_writer(policy, max_queue=3, **kwargs):
+    sink = _GatedSink(**kwargs)
+    writer = AsyncLogWriter(sink, max_queue=max_queue, policy=policy, block_timeout_s=0.05)
+    writer.submit(0)
+    assert sink.entered.wait(5)  # record 0 is in the sink, the queue is empty
+    return writer, sink
+
+
+def test_drop_oldest_keeps_the_newest_records():
+    writer, sink = _stuck_writer("drop_oldest")
+    results = [writer.submit(i) for i in range(1, 6)]
+    assert results == [True] * 5
+    assert writer.stats()["depth"] == 3
+    sink.gate.set()
+    assert writer.drain(5)
+    assert sink.records == [0, 3, 4, 5]
+    stats = writer.stats()
+    assert (stats["dropped"], stats["written"], stats["max_depth"]) == (2, 4, 3)
+    writer.close()
+
+
+def test_coalesce_replaces_the_newest_queued_record():
+    writer, sink = _stuck_writer("coalesce")
+    for i in range(1, 6):
+        assert writer.submit(i)
+    sink.gate.set()
+    assert writer.drain(5)
+    assert sink.records == [0, 1, 2, 5]
+    stats = writer.stats()
+    assert (stats["coalesced"], stats["dropped"]) == (2, 0)
+    writer.close()
+
+
+def test_block_waits_for_room_then_drops():
+    writer, sink = _stuck_writer("block")
+    assert [writer.submit(i) for i in (1, 2, 3)] == [True] * 3
+    assert writer.submit(4) is False  # no room within block_timeout_s
+    writer.block_timeout_s = 5.0
+    done = []
+    t = threading.Thread(target=lambda: done.append(writer.submit(6)))
+    t.start()
+    t.join(0.1)
+    assert t.is_alive()  # still waiting for room
+    sink.gate.set()
+    t.join(5)
+    assert done == [True]
+    assert writer.drain(5)
+    assert sink.records == [0, 1, 2, 3, 6]
+    assert writer.stats()["dropped"] == 1
+    writer.close()
+
+
+def test_drain_waits_for_the_record_in_the_sink():
+    writer, sink = _stuck_writer("drop_oldest")
+    assert writer.drain(0.05) is False  # queue empty, but record 0 is still being written
+    sink.gate.set()
+    assert writer.drain(5) is True
+    assert sink.records == [0]
+    writer.close()
+
+
+def test_sink_errors_are_counted_and_writing_goes_on():
+    writer, sink = _stuck_writer("drop_oldest", fail_on={1})
+    writer.submit(1)
+    writer.submit(2)
+    sink.gate.set()
+    assert writer.drain(5)
+    assert sink.records == [0, 2]
+    assert (writer.stats()["errors"], writer.stats()["written"]) == (1, 2)
+    writer.close()
+
+
+def test_close_writes_queued_records_then_refuses_new_ones():
+    writer, sink = _stuck_writer("drop_oldest")
+    writer.submit(1)
+    writer.submit(2)
+    sink.gate.set()
+    writer.close()
+    assert sink.records == [0, 1, 2]
+    assert writer.submit(3) is False
+
+
+def test_call_runs_on_the_writer_after_queued_records_without_blocking():
+    writer, sink = _stuck_writer("drop_oldest")
+    writer.submit(1)
+    ran = []
+    writer.call(lambda: ran.append((threading.current_thread().name, list(sink.records))))
+    assert ran == []  # returned at once although the sink is stuck
+    writer.submit(2)
+    sink.gate.set()
+    assert writer.drain(5)
+    assert ran == [("ami-log-writer", [0, 1])]
+    assert sink.records == [0, 1, 2]
+    writer.close()
+
+
+def test_calls_survive_overflow_policies():
+    for policy in ("drop_oldest", "coalesce"):
+        writer, sink = _stuck_writer(policy, max_queue=2)
+        ran = []
+        writer.submit(1)
+        writer.call(lambda: ran.append("call"))
+        for i in range(2, 6):
+            writer.submit(i)
+        sink.gate.set()
+        assert writer.drain(5)
+        assert ran == ["call"], policy
+        writer.close()
+
+
+def test_call_after_close_runs_inline():
+    writer = AsyncLogWriter(lambda record: None)
+    writer.close()
+    ran = []
+    writer.call(lambda: ran.append(threading.current_thread().name))
+    assert ran == [threading.current_thread().name]
@@ -0,0 +1,31 @@
+"""Model timestamps: wall-clock ``epoch`` must not drift with the monotonic clock (suspend, NTP)."""
+
+import time
+
+from ami.core.models import ConnectionStatus, PingResult
+from ami.services.statistics import RollingStatistics
+
+SUSPEND_S = 3600
+
+
+def test_epoch_is_wall_clock_not_shifted_monotonic():
+    # After a suspend the monotonic clock is behind wall time by the sleep length.
+    before = time.time()
+    status = ConnectionStatus(status="online", ts=time.monotonic() - SUSPEND_S)
+    ping = PingResult(host="1.1.1.1", success=True, latency_ms=10.0, ts=time.monotonic() - SUSPEND_S)
+    after = time.time()
+    assert before <= status.epoch <= after
+    assert before <= ping.epoch <= after
+    assert abs(status.timestamp.timestamp() - status.epoch) < 1e-3
+
+
+def test_rolling_windows_see_samples_taken_after_suspend():
+    stats = RollingStatistics()
+    status = ConnectionStatus(
+        status="online", avg_latency_ms=10.0, successful_pings=1, total_pings=1,
+        ts=time.monotonic() - SUSPEND_S,
+    )
+    stats.record(status, [PingResult(host="1.1.1.1", success=True, latency_ms=10.0)])
+    snap = stats.snapshot()
+    assert snap["1m"]["checks"] == 1
+    assert snap["1m"]["latency_ms"]["p50"] is not None
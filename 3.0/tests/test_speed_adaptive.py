@@ -0,0 +1,86 @@
+"""Adaptive speed test: _Convergence stop rule on a synthetic clock, and end to end on the local server."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+from ami.services import speed_test
+from ami.services.speed_test import _Convergence, _SharedWindow, measure_speed
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+from speed_test_server import start_server  # noqa: E402
+
+MB = 1024 * 1024
+SLICE_S = 0.25
+
+
+def _feed(conv, rates, max_slices=1000):
+    """Call update() once per slice at the given byte rates (cycled); returns (reason, slices)."""
+    conv.start(0.0)
+    measured = 0
+    for k in range(1, max_slices + 1):
+        measured += int(rates[(k - 1) % len(rates)] * SLICE_S)
+        reason = conv.update(k * SLICE_S, measured)
+        if reason is not None:
+            return reason, k
+    return None, max_slices
+
+
+def test_steady_rate_converges_after_the_minimum_slices():
+    conv = _Convergence(max_seconds=10, ci_percent=5)
+    assert _feed(conv, [10e6]) == ("converged", 6)
+    assert conv.relative_ci() == pytest.approx(0.0, abs=1e-9)
+
+
+def test_small_noise_converges_within_the_target():
+    conv = _Convergence(max_seconds=10, ci_percent=5)
+    reason, slices = _feed(conv, [10e6, 10.4e6, 9.7e6, 10.2e6, 9.9e6])
+    assert reason == "converged" and slices <= 8
+    assert conv.relative_ci() <= 0.05
+
+
+def test_noisy_rate_falls_back_to_the_time_limit():
+    conv = _Convergence(max_seconds=3, ci_percent=5)
+    assert _feed(conv, [5e6, 15e6]) == ("time", 12)
+    assert conv.relative_ci() > 0.05
+
+
+def test_size_budget_ends_the_window_before_convergence(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(speed_test.time, "perf_counter", lambda: clock[0])
+    window = _SharedWindow(0, 4 * MB, 1, _Convergence(max_seconds=10, ci_percent=5))
+    # 64 KiB every 10 ms: the 4 MB budget is spent in 0.64 s, before the 6 slices convergence needs.
+    while window.add(0, 64 * 1024):
+        clock[0] += 0.01
+    assert window.stop_reason == "size"
+    assert window.convergence.rates and len(window.convergence.rates) < 6
+    assert window.measured == 4 * MB
+
+
+@pytest.fixture
+def base():
+    srv = start_server(0, size_mb=400, per_conn_mbps=400)
+    yield f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_adaptive_run_stops_on_convergence(base):
+    r = measure_speed(
+        f"{base}/file.bin", 0, 10, 10, 100, warmup_mb=1, fallback_urls=[],
+        adaptive=True, max_seconds=10, max_mb=300, ci_percent=5,
+    )
+    assert r.stop_reason == "converged"
+    assert r.ci_percent is not None and r.ci_percent <= 5
+    assert r.window_s < 5 and r.bytes_measured < 300 * MB
+    assert 300 <= r.download_mbps <= 460
+
+
+def test_adaptive_run_stops_at_max_mb(base):
+    r = measure_speed(
+        f"{base}/file.bin", 0, 10, 10, 100, warmup_mb=1, fallback_urls=[],
+        adaptive=True, max_seconds=10, max_mb=2, ci_percent=5,
+    )
+    assert r.stop_reason == "size"
+    assert r.bytes_measured == 2 * MB
@@ -0,0 +1,92 @@
+"""measure_speed against scripts/speed_test_server.py on an ephemeral port: streams, Range, Mbps, traffic."""
+
+import sys
+from pathlib import Path
+
+import pytest
+import requests
+
+from ami.services.speed_test import measure_speed
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+from speed_test_server import start_server  # noqa: E402
+
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def server():
+    servers = []
+
+    def start(**kwargs):
+        srv = start_server(0, **kwargs)
+        servers.append(srv)
+        return f"http://127.0.0.1:{srv.server_address[1]}"
+
+    yield start
+    for srv in servers:
+        srv.shutdown()
+        srv.server_close()
+
+
+def _measure(url, download_mb, warmup_mb=1, streams=1, fallback_urls=(), **kwargs):
+    return measure_speed(
+        url, download_mb, 10, 10, 100, warmup_mb=warmup_mb, fallback_urls=list(fallback_urls),
+        streams=streams, **kwargs,
+    )
+
+
+def test_ranged_streams_split_a_file_shorter_than_the_budget(server):
+    # 40 MB file, 102 MB budget, 4 streams: offsets 0/10/20/30 MB, every stream reads to EOF.
+    base = server(size_mb=40)
+    r = _measure(f"{base}/file.bin", 100, warmup_mb=2, streams=4)
+    assert r.download_mbps > 0
+    assert r.streams == 4 and len(r.stream_mbps) == 4
+    assert all(m is not None and m > 0 for m in r.stream_mbps)
+    assert r.stream_errors == {}
+    assert r.stop_reason == "ended"
+    assert r.bytes_consumed == (40 + 30 + 20 + 10) * MB
+    assert r.bytes_measured == r.bytes_consumed - 2 * MB
+
+
+def test_rate_capped_streams_add_up(server):
+    base = server(size_mb=200, per_conn_mbps=80)
+    one = _measure(f"{base}/file.bin", 4)
+    four = _measure(f"{base}/file.bin", 12, streams=4)
+    assert 56 <= one.download_mbps <= 92
+    assert one.stop_reason == "size" and one.bytes_measured == 4 * MB
+    assert 224 <= four.download_mbps <= 368
+    assert four.bytes_measured == 12 * MB
+
+
+def test_receive_path_reads_into_buffer_not_iter_content(server, monkeypatch):
+    def no_iter_content(*args, **kwargs):
+        raise AssertionError("iter_content used for an identity body")
+
+    monkeypatch.setattr(requests.Response, "iter_content", no_iter_content)
+    base = server(size_mb=40)
+    r = _measure(f"{base}/file.bin", 8, streams=2)
+    assert r.download_mbps is not None and r.stream_errors == {}
+    # Whole reads only: at most one buffer (512 KiB) per stream past warmup + window.
+    assert 9 * MB <= r.bytes_consumed < 9 * MB + 2 * 512 * 1024
+
+
+def test_upload_posts_warmup_plus_size_and_counts_it(server):
+    base = server(size_mb=40)
+    r = _measure(f"{base}/file.bin", 8, upload_url=f"{base}/up", upload_size_mb=4)
+    assert r.upload_mbps is not None and r.upload_mbps > 0
+    assert r.upload_bytes == 4 * MB
+    download = r.bytes_consumed - 5 * MB  # upload body: 1 MB warmup + 4 MB
+    assert 9 * MB <= download < 9 * MB + 512 * 1024
+
+
+def test_failed_mirrors_count_towards_bytes_consumed(server):
+    # /cut/... drops after 0.5 MB, inside the 1 MB warmup: nothing is measured there.
+    base = server(size_mb=40, cut_mb=0.5)
+    r = _measure(f"{base}/cut/a.bin", 8, streams=2, fallback_urls=[f"{base}/file.bin"])
+    assert r.url.endswith("/file.bin")
+    assert r.bytes_consumed >= 1 * MB + 9 * MB
+
+    failed = _measure(f"{base}/cut/a.bin", 8, streams=2, fallback_urls=[f"{base}/cut/b.bin"])
+    assert failed.download_mbps is None
+    assert failed.bytes_consumed == 2 * MB
@@ -0,0 +1,44 @@
+"""RollingStatistics: outage counting from the first check, mean |ΔRTT| vs RFC 3550 jitter."""
+
+import time
+
+import pytest
+
+from ami.core.models import ConnectionStatus, PingResult
+from ami.services.metrics import MonitorMetrics
+from ami.services.statistics import RollingStatistics
+
+
+def _check(status, latency=None, wall=None):
+    s = ConnectionStatus(status=status, avg_latency_ms=latency, wall=time.time() if wall is None else wall)
+    pings = [PingResult(host="h", success=latency is not None, latency_ms=latency)]
+    return s, pings
+
+
+@pytest.mark.parametrize("states, outages", [
+    (["offline", "offline", "online"], 1),  # app starts offline
+    (["online", "offline", "offline", "online", "offline"], 2),
+    (["online", "unstable", "online"], 0),
+])
+def test_outages_count_offline_runs_including_the_first_check(states, outages):
+    stats, metrics = RollingStatistics(), MonitorMetrics()
+    for state in states:
+        status, pings = _check(state, None if state == "offline" else 20.0)
+        stats.record(status, pings)
+        metrics.record(status, pings)
+    assert stats.snapshot()["1h"]["outages"] == outages
+    assert f"ami_outages_total {outages}" in metrics.render()
+
+
+def test_window_reports_mean_abs_delta_next_to_rfc3550_jitter():
+    stats = RollingStatistics()
+    rtts = [10.0, 30.0, 10.0, 30.0, 10.0]
+    for rtt in rtts:
+        stats.record(*_check("online", rtt))
+    snap = stats.snapshot()
+    assert "jitter_ms" not in snap["1h"]
+    assert snap["1h"]["mean_abs_delta_ms"] == 20.0
+    j = 0.0
+    for _ in rtts[1:]:
+        j += (20.0 - j) / 16
+    assert snap["jitter_rfc3550_ms"]["h"] == round(j, 2)
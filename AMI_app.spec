@@ -33,6 +33,7 @@ a = Analysis(
         'core.models',
         'services',
         'services.network_monitor',
+        'services.probe_engine',
         'services.logger',
         'services.notifier',
         'services.api_server',
@@ -107,6 +107,7 @@ def build_executable():
             '--hidden-import=core.models',
             '--hidden-import=services',
             '--hidden-import=services.network_monitor',
+            '--hidden-import=services.probe_engine',
             '--hidden-import=services.logger',
             '--hidden-import=services.notifier',
             '--hidden-import=services.api_server',
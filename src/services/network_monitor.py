@@ -3,7 +3,7 @@ AMI - Active Monitor of Internet
 Network Monitoring Engine
 
 This module handles the core network monitoring functionality:
-- Multi-host ping testing
+- Multi-host ping testing (asyncio probe engine)
 - HTTP connectivity tests
 - Connection status detection
 - Statistics tracking
@@ -17,10 +17,10 @@ from typing import List, Dict, Tuple, Optional
 from datetime import datetime
 import re
 import psutil
-import threading
 import requests
 
 from core.models import PingResult, ConnectionStatus
+from services.probe_engine import ProbeEngine
 
 
 class NetworkMonitor:
@@ -58,7 +58,13 @@ class NetworkMonitor:
         self._last_isp_check_ts: float = 0.0
         self._last_vpn_status: Optional[Tuple[bool, str]] = None
         self._last_vpn_check_ts: float = 0.0
-        
+        # Shared event loop thread for all probes (no per-host thread churn)
+        self._probes = ProbeEngine()
+
+    def close(self):
+        """Stop the probe loop thread (call on app exit)"""
+        self._probes.stop()
+
     def ping_host(self, host: str, timeout: int = 5) -> PingResult:
         """
         Ping a single host using ICMP or TCP fallback
@@ -70,84 +76,7 @@ class NetworkMonitor:
         Returns:
             PingResult with success status and latency
         """
-        try:
-            # On macOS/Linux, use system ping command (more reliable, no sudo needed)
-            # Linux (iputils): -W is in seconds. macOS (BSD): -W is in seconds (use seconds for both)
-            if sys.platform in ['darwin', 'linux']:
-                try:
-                    param = '-n' if sys.platform == 'win32' else '-c'
-                    timeout_param = '-W'
-                    timeout_seconds = str(timeout)  # Both Linux and macOS use seconds
-                    
-                    # Run ping command
-                    kwargs = {
-                        'capture_output': True,
-                        'text': True,
-                    }
-                    if sys.platform == 'win32':
-                        kwargs['creationflags'] = subprocess.CREATE_NO_WINDOW
-                    result = subprocess.run(
-                        ['ping', param, '1', timeout_param, timeout_seconds, host],
-                        **kwargs,
-                        timeout=timeout + 1
-                    )
-                    
-                    if result.returncode == 0:
-                        # Parse ping output for latency
-                        output = result.stdout
-                        # Look for time= in output
-                        if 'time=' in output:
-                            time_str = output.split('time=')[1].split()[0]
-                            latency = float(time_str.replace('ms', ''))
-                            return PingResult(host=host, success=True, latency_ms=latency)
-                except (subprocess.TimeoutExpired, subprocess.SubprocessError, ValueError):
-                    # System ping failed, try ping3 or TCP fallback
-                    pass
-            
-            # Try ICMP ping using ping3 library (requires root on some systems)
-            try:
-                import ping3
-                ping3.EXCEPTIONS = True
-                delay = ping3.ping(host, timeout=timeout, unit='ms')
-                
-                if delay is not None and delay is not False:
-                    latency = delay
-                    return PingResult(host=host, success=True, latency_ms=latency)
-                else:
-                    # ICMP failed, try TCP fallback
-                    pass
-            except (ImportError, Exception) as e:
-                # ping3 not available or failed, use TCP fallback
-                pass
-            
-            # TCP fallback: try to connect to port 80 or 443
-            # IMPORTANT: Reset timer for TCP test to avoid inflated latency
-            tcp_start = time.time()
-            
-            port = 443 if 'https' in host or not any(c.isdigit() for c in host) else 80
-            
-            # Resolve hostname if needed
-            try:
-                ip = socket.gethostbyname(host.replace('https://', '').replace('http://', '').split('/')[0])
-            except socket.gaierror:
-                return PingResult(host=host, success=False, error="DNS resolution failed")
-            
-            # Try TCP connection
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(timeout)
-            
-            try:
-                sock.connect((ip, port))
-                latency = (time.time() - tcp_start) * 1000  # Convert to ms - only TCP time
-                sock.close()
-                return PingResult(host=host, success=True, latency_ms=latency)
-            except (socket.timeout, socket.error) as e:
-                return PingResult(host=host, success=False, error=f"Connection failed: {str(e)}")
-            finally:
-                sock.close()
-                
-        except Exception as e:
-            return PingResult(host=host, success=False, error=str(e))
+        return self._probes.run(self._probes.ping(host, timeout))
     
     def test_http_connectivity(self) -> bool:
         """
@@ -159,16 +88,7 @@ class NetworkMonitor:
         if not self.enable_http_test:
             return True
         
-        try:
-            response = requests.get(
-                self.http_test_url,
-                timeout=self.timeout,
-                allow_redirects=False
-            )
-            # Google's generate_204 returns 204 No Content
-            return response.status_code in [200, 204]
-        except Exception:
-            return False
+        return self._probes.run(self._probes.http_ok(self.http_test_url, self.timeout))
     
     def check_local_network(self) -> bool:
         """
@@ -209,29 +129,12 @@ class NetworkMonitor:
     
     def ping_all_hosts(self) -> List[PingResult]:
         """
-        Ping all configured hosts in parallel using threading
+        Ping all configured hosts concurrently on the probe event loop
         
         Returns:
             List of PingResult objects
         """
-        results = []
-        threads = []
-        
-        def ping_worker(host):
-            result = self.ping_host(host, self.timeout)
-            results.append(result)
-        
-        # Create and start threads
-        for host in self.hosts:
-            thread = threading.Thread(target=ping_worker, args=(host,))
-            thread.start()
-            threads.append(thread)
-        
-        # Wait for all threads to complete
-        for thread in threads:
-            thread.join(timeout=self.timeout + 1)
-        
-        return results
+        return self._probes.run(self._probes.ping_all(list(self.hosts), self.timeout))
     
     def analyze_connection(self, ping_results: List[PingResult], http_ok: bool, local_ok: bool) -> ConnectionStatus:
         """
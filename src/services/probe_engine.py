@@ -0,0 +1,251 @@
+"""
+AMI - Active Monitor of Internet
+Asyncio Probe Engine
+
+Runs all ICMP/TCP/HTTP probes of a monitoring cycle concurrently on one
+long-lived event loop thread, instead of creating a new OS thread per host
+on every poll. Blocking fallbacks (ping3, requests) run on a small bounded
+executor owned by the loop.
+"""
+
+import asyncio
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Coroutine, List, Optional, Sequence, Tuple
+
+import requests
+
+from core.models import PingResult
+
+ICMP_SHARE = 0.5  # fraction of a host's budget ICMP may use before the TCP fallback
+MIN_STAGE_S = 0.05
+
+
+def _tcp_target(host: str) -> Tuple[str, int]:
+    """Hostname and port for the TCP connect fallback"""
+    port = 443 if 'https' in host or not any(c.isdigit() for c in host) else 80
+    name = host.replace('https://', '').replace('http://', '').split('/')[0]
+    return name, port
+
+
+def _ping3_ms(host: str, timeout: float) -> Optional[float]:
+    """ICMP ping using ping3 (requires root on some systems)"""
+    try:
+        import ping3
+        ping3.EXCEPTIONS = True
+        delay = ping3.ping(host, timeout=timeout, unit='ms')
+        if delay is not None and delay is not False:
+            return float(delay)
+    except Exception:
+        pass
+    return None
+
+
+def _http_get_ok(url: str, timeout: float) -> bool:
+    response = requests.get(url, timeout=timeout, allow_redirects=False)
+    # Google's generate_204 returns 204 No Content
+    return response.status_code in [200, 204]
+
+
+class ProbeEngine:
+    """
+    Background asyncio loop shared by all probes.
+    run() is thread-safe and blocks the calling thread until the coroutine is done.
+    """
+
+    def __init__(self, blocking_workers: int = 8):
+        self._blocking_workers = blocking_workers
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the event loop thread (idempotent)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            loop = asyncio.new_event_loop()
+            loop.set_default_executor(
+                ThreadPoolExecutor(max_workers=self._blocking_workers, thread_name_prefix='ami-probe')
+            )
+            ready = threading.Event()
+
+            def serve():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                try:
+                    loop.run_forever()
+                finally:
+                    try:
+                        loop.run_until_complete(loop.shutdown_default_executor())
+                    except Exception:
+                        pass
+                    loop.close()
+
+            thread = threading.Thread(target=serve, name='ami-probe-loop', daemon=True)
+            thread.start()
+            ready.wait()
+            self._loop = loop
+            self._thread = thread
+
+    def stop(self):
+        """Stop the event loop thread"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = None
+            self._thread = None
+        if loop is None or thread is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=2)
+
+    def run(self, coro: Coroutine[Any, Any, Any], timeout: Optional[float] = None) -> Any:
+        """
+        Run a coroutine on the probe loop from another thread
+
+        Args:
+            coro: Coroutine to execute
+            timeout: Max seconds to wait for the result (None = no limit)
+
+        Returns:
+            The coroutine result
+        """
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        return future.result(timeout)
+
+    async def ping(self, host: str, timeout: float = 5) -> PingResult:
+        """
+        Ping a single host: system ping, then ping3, then TCP connect fallback.
+        All stages share one timeout budget; ICMP may use at most half of it so
+        hosts that drop ICMP still get a TCP attempt inside the same budget.
+
+        Args:
+            host: IP address or hostname to ping
+            timeout: Timeout in seconds for all stages together
+
+        Returns:
+            PingResult with success status and latency
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        deadline = start + timeout
+        icmp_deadline = start + timeout * ICMP_SHARE
+
+        def left(until: float) -> float:
+            return max(0.0, until - loop.time())
+
+        try:
+            # On macOS/Linux, use system ping command (more reliable, no sudo needed)
+            if sys.platform in ['darwin', 'linux']:
+                latency = await self._system_ping(host, left(icmp_deadline))
+                if latency is not None:
+                    return PingResult(host=host, success=True, latency_ms=latency)
+
+            budget = left(icmp_deadline)
+            if budget >= MIN_STAGE_S:
+                try:
+                    latency = await asyncio.wait_for(
+                        loop.run_in_executor(None, _ping3_ms, host, budget), budget
+                    )
+                except asyncio.TimeoutError:
+                    latency = None
+                if latency is not None:
+                    return PingResult(host=host, success=True, latency_ms=latency)
+
+            return await self._tcp_ping(host, left(deadline))
+        except Exception as e:
+            return PingResult(host=host, success=False, error=str(e))
+
+    async def ping_all(self, hosts: Sequence[str], timeout: float) -> List[PingResult]:
+        """
+        Probe every host concurrently under one cycle deadline of timeout seconds.
+        Each host has a preallocated slot (same order as hosts); probes still
+        running at the deadline are cancelled and get an explicit timeout result.
+        """
+        if not hosts:
+            return []
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        slots: List[Optional[PingResult]] = [None] * len(hosts)
+
+        async def probe(i: int, host: str):
+            slots[i] = await self.ping(host, max(0.0, deadline - loop.time()))
+
+        tasks = [loop.create_task(probe(i, h)) for i, h in enumerate(hosts)]
+        _, pending = await asyncio.wait(tasks, timeout=max(0.0, deadline - loop.time()))
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        return [
+            r if r is not None
+            else PingResult(host=h, success=False, error=f"Timed out after {timeout:g}s")
+            for h, r in zip(hosts, slots)
+        ]
+
+    async def http_ok(self, url: str, timeout: float) -> bool:
+        """True if GET url answers 200/204"""
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(None, _http_get_ok, url, timeout)
+        except Exception:
+            return False
+
+    async def _system_ping(self, host: str, timeout: float) -> Optional[float]:
+        # Linux (iputils) and macOS (BSD): -W is in seconds (use seconds for both)
+        if timeout < MIN_STAGE_S:
+            return None
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                'ping', '-c', '1', '-W', str(max(1, int(timeout))), host,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except (OSError, ValueError):
+            return None
+        try:
+            out, _ = await asyncio.wait_for(proc.communicate(), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
+            await proc.wait()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            return None
+        output = out.decode(errors='ignore')
+        if proc.returncode != 0 or 'time=' not in output:
+            return None
+        try:
+            return float(output.split('time=')[1].split()[0].replace('ms', ''))
+        except (IndexError, ValueError):
+            return None
+
+    async def _tcp_ping(self, host: str, timeout: float) -> PingResult:
+        # TCP fallback: try to connect to port 80 or 443
+        loop = asyncio.get_running_loop()
+        tcp_start = time.time()
+        name, port = _tcp_target(host)
+        try:
+            infos = await loop.getaddrinfo(name, port, family=socket.AF_INET, type=socket.SOCK_STREAM)
+            ip = infos[0][4][0]
+        except (socket.gaierror, IndexError):
+            return PingResult(host=host, success=False, error="DNS resolution failed")
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), timeout)
+        except (asyncio.TimeoutError, OSError) as e:
+            reason = 'timed out' if isinstance(e, asyncio.TimeoutError) else str(e)
+            return PingResult(host=host, success=False, error=f"Connection failed: {reason}")
+        latency = (time.time() - tcp_start) * 1000  # Convert to ms
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return PingResult(host=host, success=True, latency_ms=latency)
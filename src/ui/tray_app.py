@@ -772,6 +772,8 @@ class SystemTrayApp:
             self.monitor_thread = None
         # Stop API server
         self.api_server.stop()
+        # Stop probe event loop
+        self.monitor.close()
         self.tray_icon.hide()
         if getattr(self, 'compact_status', None):
             self.compact_status.close()